@@ -0,0 +1,14 @@
+"""Lean settings for the web process.
+
+Everything from `MoodJournal.settings`, minus apps the site never uses:
+no social login is offered, so `allauth.socialaccount` is not loaded.
+Select with `DJANGO_SETTINGS_MODULE=MoodJournal.settings_web`; measure
+the effect with `python manage.py startup_time`.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS
+
+UNUSED_APPS = {"allauth.socialaccount"}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in UNUSED_APPS]
@@ -0,0 +1,24 @@
+"""Lean settings for the background job worker and one-off commands.
+
+The worker never serves HTTP, so on top of what `settings_web` drops it
+does not load the admin, messages, static files or form rendering apps,
+and it routes only the journal URLs (jobs reverse them for links). The
+middleware list is kept as it is: the worker never builds it, but
+allauth checks that its middleware is listed. Migrations must still run
+with the full settings, which know every app's tables.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings_web import INSTALLED_APPS, UNUSED_APPS
+
+UNUSED_APPS = UNUSED_APPS | {
+    "django.contrib.admin",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "crispy_forms",
+    "crispy_bootstrap5",
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in UNUSED_APPS]
+
+ROOT_URLCONF = "MoodJournal.urls_worker"
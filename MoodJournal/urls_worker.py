@@ -0,0 +1,6 @@
+"""URL configuration for the worker (see `MoodJournal.settings_worker`)."""
+from django.urls import include, path
+
+urlpatterns = [
+    path("", include("journal.urls")),
+]
@@ -0,0 +1,57 @@
+"""Gunicorn configuration for the web process (see Procfile).
+
+Every setting can be overridden with an environment variable, so dynos
+can be tuned with config vars rather than code changes:
+
+- WEB_CONCURRENCY: worker processes (Heroku sets this per dyno size).
+- GUNICORN_THREADS: threads per worker; above 1 the threaded `gthread`
+  worker is used instead of the default sync worker.
+- GUNICORN_PRELOAD: import the app once in the master before forking
+  (default True).
+- GUNICORN_MAX_REQUESTS / GUNICORN_MAX_REQUESTS_JITTER: recycle a worker
+  after this many requests, plus a random jitter so workers do not all
+  restart at once.
+- GUNICORN_TIMEOUT: seconds before a silent worker is killed.
+"""
+
+import os
+
+wsgi_app = "MoodJournal.wsgi:application"
+
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+worker_class = "gthread" if threads > 1 else "sync"
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True").lower() == "true"
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+
+accesslog = "-"
+
+
+def when_ready(server):
+    # Runs in the master once the app is loaded and before any worker is
+    # forked, so with preload_app the workers inherit a warm process.
+    if server.cfg.preload_app:
+        from journal import warmup
+
+        warmup.warm_process()
+        # Workers must open their own connections, not share the master's.
+        warmup.close_connections()
+
+
+def post_worker_init(worker):
+    from journal import warmup
+
+    if not worker.cfg.preload_app:
+        warmup.warm_process()
+    # Django keeps one connection per thread. The sync worker serves
+    # requests on this thread, so its first request finds the connection
+    # open; threaded and async workers serve them elsewhere, where a
+    # connection opened here would never be used.
+    # (gunicorn also runs "sync" as gthread when threads > 1.)
+    if worker.cfg.worker_class_str == "sync" and worker.cfg.threads == 1:
+        warmup.warm_connections()
@@ -1,37 +1,155 @@
 """Admin model registrations for the journal app.
 
-Register the Entry, GratitudeItem, and Quote models with
+Register the Entry, GratitudeItem, Quote and Job models with
 list displays and search fields for the Django admin site.
+
+The Entry and GratitudeItem tables can hold millions of rows, so their
+changelists join related rows up front, never run an unbounded COUNT(*),
+use raw-id or autocomplete widgets instead of full `<select>` lists, and
+search only columns with an index behind them (trigram GIN indexes on
+PostgreSQL, see migration 0013).
 """
 
 from django.contrib import admin
-from .models import Entry, GratitudeItem, Quote
+from django.contrib.admin.views.main import PAGE_VAR
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
+from django.utils.http import urlencode
+
+from .models import Entry, GratitudeItem, Job, Quote, QuoteMood
+from .pagination import EstimatedCountPaginator
+
+# Rows counted on a changelist before the total is shown as an estimate.
+ADMIN_COUNT_LIMIT = 10000
+
+
+class EstimatedCountAdminMixin:
+    """Bound the changelist row count instead of counting the whole table.
+
+    Also hides the "N total" full-table count next to filtered results.
+    """
+
+    show_full_result_count = False
+
+    def get_paginator(
+        self, request, queryset, per_page, orphans=0, allow_empty_first_page=True
+    ):
+        try:
+            page = int(request.GET.get(PAGE_VAR, 1))
+        except ValueError:
+            page = 1
+        # Always count far enough for the next page to exist.
+        limit = max(ADMIN_COUNT_LIMIT, (page + 1) * per_page)
+        return EstimatedCountPaginator(
+            queryset,
+            per_page,
+            count_limit=limit,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+        )
+
+
+class UsernameFilter(admin.SimpleListFilter):
+    """Filter entries by exact username (`?username=alice`).
+
+    Listing every user as a choice would not scale, so only the active
+    username is shown; the user column links to it. Kept out of
+    `search_fields`, where an OR across the join to `auth_user` stops
+    PostgreSQL from combining the title and content trigram indexes.
+    """
+
+    title = "user"
+    parameter_name = "username"
+
+    def lookups(self, request, model_admin):
+        value = self.value()
+        return [(value, value)] if value else []
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(user__username=self.value())
+        return queryset
 
 
 @admin.register(Entry)
-class EntryAdmin(admin.ModelAdmin):
+class EntryAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """Admin options for Entry.
 
-    Shows id, user, title, date and rating in the list view and allows
-    filtering by date and mood.
+    Shows id, user, title, date and rating in the list view, drills down
+    by date and filters by mood or username. Search matches title or
+    content (trigram-indexed).
     """
 
-    list_display = ("id", "user", "title", "date", "mood_rating")
-    list_filter = ("date", "mood")
-    search_fields = ("title", "content", "user__username")
+    list_display = ("id", "user_link", "title", "date", "mood_rating")
+    list_filter = ("mood", UsernameFilter)
+    list_select_related = ("user",)
+    date_hierarchy = "date"
+    search_fields = ("title", "content")
+    autocomplete_fields = ("user",)
+
+    @admin.display(description="user", ordering="user__username")
+    def user_link(self, entry):
+        url = reverse("admin:journal_entry_changelist")
+        query = urlencode({UsernameFilter.parameter_name: entry.user.username})
+        return format_html('<a href="{}?{}">{}</a>', url, query, entry.user)
 
 
 @admin.register(GratitudeItem)
-class GratitudeItemAdmin(admin.ModelAdmin):
-    """Admin options for GratitudeItem."""
+class GratitudeItemAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
+    """Admin options for GratitudeItem.
+
+    `entry` is a raw id input rather than a `<select>` of every entry.
+    """
 
     list_display = ("id", "entry", "item_text")
+    list_select_related = ("entry__user",)
+    raw_id_fields = ("entry",)
     search_fields = ("item_text",)
 
 
+class QuoteMoodInline(admin.TabularInline):
+    model = QuoteMood
+    extra = 0
+
+
 @admin.register(Quote)
 class QuoteAdmin(admin.ModelAdmin):
-    """Admin options for Quote."""
+    """Admin options for Quote, with its mood tags inline."""
 
     list_display = ("id", "author")
+    list_filter = ("moods__mood",)
     search_fields = ("text", "author")
+    inlines = [QuoteMoodInline]
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Admin options for background jobs.
+
+    Failed jobs can be put back in the queue with the "Retry" action;
+    it leaves jobs in any other state alone.
+    """
+
+    list_display = (
+        "id", "name", "status", "attempts", "user", "created_at", "finished_at"
+    )
+    list_filter = ("status", "name")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+    readonly_fields = (
+        "created_at", "started_at", "heartbeat_at", "finished_at", "worker"
+    )
+    actions = ["retry_jobs"]
+
+    @admin.action(description="Retry selected failed jobs")
+    def retry_jobs(self, request, queryset):
+        updated = queryset.filter(status=Job.FAILED).update(
+            status=Job.QUEUED,
+            attempts=0,
+            run_at=timezone.now(),
+            last_error="",
+            result=None,
+            finished_at=None,
+        )
+        self.message_user(request, f"Queued {updated} failed job(s) again.")
@@ -0,0 +1,635 @@
+"""JSON API for journal entries.
+
+A small, dependency-free API intended for the mobile client, so it does not
+have to scrape the HTML pages. Entries embed their gratitude items as a
+list of strings (read from the denormalised `Entry.gratitude` column).
+
+Endpoints:
+    GET    /api/entries/            list, newest first, cursor paginated
+    POST   /api/entries/            create
+    GET    /api/entries/<pk>/       detail
+    PUT    /api/entries/<pk>/       replace (all entry fields required)
+    PATCH  /api/entries/<pk>/       partial update
+    DELETE /api/entries/<pk>/       delete
+    POST   /api/entries/batch/      many creates/updates/deletes at once
+    GET    /api/changes/            entries changed or deleted since a token
+    GET    /api/jobs/<pk>/          status of a background job
+
+Query parameters on GET:
+    fields   comma-separated subset of `ENTRY_FIELDS` to return; only those
+             columns are loaded from the database
+    limit    page size for the list (default 20, max 100)
+    cursor   opaque `next_cursor` value from the previous list page
+
+Request bodies are JSON objects using the `EntryForm` field names plus an
+optional `gratitude` list of strings; validation is delegated to
+`EntryForm` and `GratitudeItemForm`. See `EntryBatchApiView` for the batch
+body format, and `EntryChangesApiView` for delta sync. Authentication uses the normal session
+cookie (and CSRF token for writes); anonymous requests get a 401.
+Responses are gzip-compressed when the client accepts it.
+"""
+
+import base64
+import binascii
+import json
+
+from django.db import transaction
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.gzip import gzip_page
+
+from .forms import EntryForm, GratitudeItemForm
+from .models import (
+    ChangeSequence,
+    Entry,
+    EntryCounter,
+    EntryTombstone,
+    GratitudeItem,
+    Job,
+    StreakRun,
+)
+from .signals import bulk_write
+
+# Fields a client may request via `fields=`.
+ENTRY_FIELDS = (
+    "id",
+    "date",
+    "mood",
+    "mood_rating",
+    "title",
+    "content",
+    "excerpt",
+    "word_count",
+    "gratitude",
+    "created_at",
+)
+# Returned when `fields` is omitted; lists favour the short excerpt.
+DEFAULT_LIST_FIELDS = tuple(f for f in ENTRY_FIELDS if f != "content")
+DEFAULT_DETAIL_FIELDS = ENTRY_FIELDS
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MAX_BATCH_OPERATIONS = 500
+# Entry columns rewritten by a batch update.
+BATCH_UPDATE_FIELDS = [
+    *EntryForm.Meta.fields,
+    "excerpt",
+    "word_count",
+    "gratitude",
+    "change_seq",
+]
+
+
+class ApiError(Exception):
+    """Raised inside API views to short-circuit with a JSON error body."""
+
+    def __init__(self, status, payload):
+        super().__init__(payload)
+        self.status = status
+        self.payload = payload
+
+
+def serialize_entry(entry, fields):
+    """Return a dict of the requested `fields` of `entry`."""
+    return {field: getattr(entry, field) for field in fields}
+
+
+def parse_fields(request, default):
+    """Return the tuple of fields requested via `?fields=`, or `default`."""
+    raw = request.GET.get("fields")
+    if not raw:
+        return default
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in ENTRY_FIELDS]
+    if unknown or not fields:
+        raise ApiError(
+            400,
+            {
+                "error": "Unknown field(s): " + ", ".join(unknown),
+                "allowed": list(ENTRY_FIELDS),
+            },
+        )
+    return fields
+
+
+def encode_cursor(entry):
+    raw = f"{entry.date.isoformat()}|{entry.pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(value):
+    """Return `(date, pk)` from a cursor string, or raise ApiError."""
+    try:
+        raw = base64.urlsafe_b64decode(value.encode()).decode()
+        date_text, pk_text = raw.split("|")
+        date = parse_datetime(date_text)
+        pk = int(pk_text)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        date = None
+    if date is None:
+        raise ApiError(400, {"error": "Invalid cursor."})
+    return date, pk
+
+
+def parse_body(request):
+    """Return the JSON object in the request body, or raise ApiError."""
+    try:
+        data = json.loads(request.body or b"{}")
+    except (UnicodeDecodeError, ValueError):
+        raise ApiError(400, {"error": "Invalid JSON body."})
+    if not isinstance(data, dict):
+        raise ApiError(400, {"error": "Request body must be a JSON object."})
+    return data
+
+
+def clean_gratitude(items):
+    """Validate a list of gratitude strings with GratitudeItemForm.
+
+    Blank strings are skipped, as blank formset rows are. Returns the list
+    of cleaned texts or raises ApiError with per-item errors.
+    """
+    if not isinstance(items, list):
+        raise ApiError(400, {"errors": {"gratitude": ["Must be a list."]}})
+    texts, errors = [], {}
+    for index, item in enumerate(items):
+        if not isinstance(item, str):
+            errors[str(index)] = ["Must be a string."]
+            continue
+        if not item.strip():
+            continue
+        form = GratitudeItemForm(data={"item_text": item})
+        if form.is_valid():
+            texts.append(form.cleaned_data["item_text"])
+        else:
+            errors[str(index)] = form.errors["item_text"]
+    if errors:
+        raise ApiError(400, {"errors": {"gratitude": errors}})
+    return texts
+
+
+def entry_form_data(data, instance=None):
+    """Build `EntryForm` data from a JSON payload.
+
+    With an `instance` (PATCH), fields missing from the payload keep their
+    stored values.
+    """
+    form_data = {}
+    for name in EntryForm.Meta.fields:
+        if name in data:
+            form_data[name] = data[name]
+        elif instance is not None:
+            value = getattr(instance, name)
+            if name == "date":
+                value = timezone.localtime(value).isoformat()
+            form_data[name] = value
+    return form_data
+
+
+@method_decorator(gzip_page, name="dispatch")
+class EntryApiMixin:
+    """Session authentication, JSON errors and gzip for API views."""
+
+    http_method_names = ["get", "post", "put", "patch", "delete"]
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({"error": "Authentication required."}, status=401)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as exc:
+            return JsonResponse(exc.payload, status=exc.status)
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        response = JsonResponse({"error": "Method not allowed."}, status=405)
+        response["Allow"] = ", ".join(
+            m.upper() for m in self.http_method_names if hasattr(self, m)
+        )
+        return response
+
+    def get_queryset(self):
+        return Entry.objects.filter(user=self.request.user)
+
+    def save_entry(self, form, gratitude):
+        """Save a valid EntryForm and optional gratitude list atomically."""
+        with transaction.atomic():
+            entry = form.save(commit=False)
+            if entry.user_id is None:
+                entry.user = self.request.user
+            entry.save()
+            if gratitude is not None:
+                entry.replace_gratitude(gratitude)
+        return entry
+
+
+class EntryListApiView(EntryApiMixin, View):
+    """List (GET) and create (POST) the current user's entries."""
+
+    def get(self, request):
+        fields = parse_fields(request, DEFAULT_LIST_FIELDS)
+        try:
+            limit = int(request.GET.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            raise ApiError(400, {"error": "limit must be an integer."})
+        limit = max(1, min(limit, MAX_LIMIT))
+        # Keyset pagination on (date, id) so deep pages stay cheap.
+        queryset = (
+            self.get_queryset()
+            .only(*{"id", "date", *fields})
+            .order_by("-date", "-id")
+        )
+        cursor = request.GET.get("cursor")
+        if cursor:
+            date, pk = decode_cursor(cursor)
+            queryset = queryset.filter(Q(date__lt=date) | Q(date=date, id__lt=pk))
+        entries = list(queryset[: limit + 1])
+        next_cursor = None
+        if len(entries) > limit:
+            entries = entries[:limit]
+            next_cursor = encode_cursor(entries[-1])
+        return JsonResponse(
+            {
+                "results": [serialize_entry(e, fields) for e in entries],
+                "next_cursor": next_cursor,
+            }
+        )
+
+    def post(self, request):
+        data = parse_body(request)
+        gratitude = clean_gratitude(data.get("gratitude", []))
+        form = EntryForm(entry_form_data(data))
+        if not form.is_valid():
+            raise ApiError(400, {"errors": form.errors})
+        entry = self.save_entry(form, gratitude)
+        return JsonResponse(
+            serialize_entry(entry, DEFAULT_DETAIL_FIELDS), status=201
+        )
+
+
+class EntryDetailApiView(EntryApiMixin, View):
+    """Retrieve, update or delete one of the current user's entries."""
+
+    def get_object(self, pk, fields=None):
+        queryset = self.get_queryset()
+        if fields is not None:
+            queryset = queryset.only(*{"id", *fields})
+        entry = queryset.filter(pk=pk).first()
+        if entry is None:
+            raise ApiError(404, {"error": "Entry not found."})
+        return entry
+
+    def get(self, request, pk):
+        fields = parse_fields(request, DEFAULT_DETAIL_FIELDS)
+        return JsonResponse(serialize_entry(self.get_object(pk, fields), fields))
+
+    def put(self, request, pk):
+        return self.update(request, pk, partial=False)
+
+    def patch(self, request, pk):
+        return self.update(request, pk, partial=True)
+
+    def update(self, request, pk, partial):
+        entry = self.get_object(pk)
+        data = parse_body(request)
+        gratitude = None
+        if "gratitude" in data:
+            gratitude = clean_gratitude(data["gratitude"])
+        form = EntryForm(
+            entry_form_data(data, instance=entry if partial else None),
+            instance=entry,
+        )
+        if not form.is_valid():
+            raise ApiError(400, {"errors": form.errors})
+        entry = self.save_entry(form, gratitude)
+        return JsonResponse(serialize_entry(entry, DEFAULT_DETAIL_FIELDS))
+
+    def delete(self, request, pk):
+        self.get_object(pk).delete()
+        return HttpResponse(status=204)
+
+
+class EntryBatchApiView(EntryApiMixin, View):
+    """Apply many entry creates, updates and deletes in one request.
+
+    Body::
+
+        {
+            "atomic": false,
+            "operations": [
+                {"op": "create", "client_id": "a1", "data": {...}},
+                {"op": "update", "id": 12, "data": {...}},
+                {"op": "delete", "id": 13}
+            ]
+        }
+
+    `data` uses the same shape as the single-entry endpoints; updates are
+    partial (PATCH semantics) and replace gratitude items only when
+    `gratitude` is given. Every operation is validated first, then all
+    valid ones are written in a single transaction using bulk statements,
+    so the query count does not grow with the batch size.
+
+    The response lists one result per operation, in order, with a
+    `status` of `created`, `updated`, `deleted`, `error` or `not_found`
+    (plus `skipped` when `atomic` is true and another operation failed,
+    in which case nothing is written and the response is a 400).
+    """
+
+    http_method_names = ["post"]
+
+    def post(self, request):
+        data = parse_body(request)
+        operations = data.get("operations")
+        if not isinstance(operations, list) or not operations:
+            raise ApiError(400, {"error": "operations must be a non-empty list."})
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            raise ApiError(
+                400,
+                {"error": f"At most {MAX_BATCH_OPERATIONS} operations per batch."},
+            )
+
+        ids = {
+            op.get("id")
+            for op in operations
+            if isinstance(op, dict) and isinstance(op.get("id"), int)
+        }
+        existing = self.get_queryset().in_bulk(ids)
+        self.creates, self.updates, self.deletes = [], [], []
+        self.seen_ids = set()
+        results = []
+        for index, op in enumerate(operations):
+            try:
+                result = self.plan(op, existing)
+            except ApiError as exc:
+                result = {"status": "error", **exc.payload}
+                if exc.status == 404:
+                    result["status"] = "not_found"
+            result["index"] = index
+            if isinstance(op, dict) and "client_id" in op:
+                result["client_id"] = op["client_id"]
+            results.append(result)
+
+        failed = any(r["status"] in ("error", "not_found") for r in results)
+        if failed and data.get("atomic"):
+            for result in results:
+                if result["status"] == "pending":
+                    del result["entry"], result["done"]
+                    result["status"] = "skipped"
+            return JsonResponse({"results": results}, status=400)
+
+        self.apply()
+        for result in results:
+            if result["status"] == "pending":
+                entry = result.pop("entry")
+                result["status"] = result.pop("done")
+                result["id"] = entry.pk
+        return JsonResponse({"results": results})
+
+    def plan(self, op, existing):
+        """Validate one operation and queue it; return its pending result."""
+        if not isinstance(op, dict):
+            raise ApiError(400, {"error": "Operation must be an object."})
+        kind = op.get("op")
+        if kind not in ("create", "update", "delete"):
+            raise ApiError(400, {"error": "op must be create, update or delete."})
+        payload = op.get("data", {})
+        if not isinstance(payload, dict):
+            raise ApiError(400, {"error": "data must be an object."})
+
+        if kind == "create":
+            gratitude = clean_gratitude(payload.get("gratitude", []))
+            form = EntryForm(entry_form_data(payload))
+            if not form.is_valid():
+                raise ApiError(400, {"errors": form.errors})
+            entry = form.save(commit=False)
+            entry.user = self.request.user
+            entry.refresh_excerpt()
+            entry.gratitude = gratitude
+            self.creates.append(entry)
+            return {"status": "pending", "done": "created", "entry": entry}
+
+        entry = existing.get(op.get("id"))
+        if entry is None:
+            raise ApiError(404, {"error": "Entry not found."})
+        if entry.pk in self.seen_ids:
+            raise ApiError(400, {"error": "Entry already used in this batch."})
+        self.seen_ids.add(entry.pk)
+
+        if kind == "delete":
+            self.deletes.append(entry)
+            return {"status": "pending", "done": "deleted", "entry": entry}
+
+        previous = (entry.mood, len(entry.gratitude), entry.date)
+        gratitude = None
+        if "gratitude" in payload:
+            gratitude = clean_gratitude(payload["gratitude"])
+        form = EntryForm(entry_form_data(payload, instance=entry), instance=entry)
+        if not form.is_valid():
+            raise ApiError(400, {"errors": form.errors})
+        entry = form.save(commit=False)
+        entry.refresh_excerpt()
+        if gratitude is not None:
+            entry.gratitude = gratitude
+        self.updates.append((entry, previous, gratitude is not None))
+        return {"status": "pending", "done": "updated", "entry": entry}
+
+    def apply(self):
+        """Write all queued operations and maintain derived data."""
+        deltas = {}
+
+        def count(mood, entries, items):
+            delta = deltas.setdefault(mood, [0, 0])
+            delta[0] += entries
+            delta[1] += items
+
+        with transaction.atomic(), bulk_write():
+            user_id = self.request.user.pk
+            changed = self.creates + [e for e, _, _ in self.updates]
+            total = len(changed) + len(self.deletes)
+            seq = ChangeSequence.reserve(user_id, count=total) - total
+            for entry in changed:
+                seq += 1
+                entry.change_seq = seq
+            tombstones = []
+            for entry in self.deletes:
+                seq += 1
+                tombstones.append(
+                    EntryTombstone(
+                        user_id=user_id, entry_id=entry.pk, change_seq=seq
+                    )
+                )
+
+            if self.creates:
+                Entry.objects.bulk_create(self.creates, batch_size=200)
+            updated = [entry for entry, _, _ in self.updates]
+            if updated:
+                Entry.objects.bulk_update(
+                    updated, BATCH_UPDATE_FIELDS, batch_size=200
+                )
+            replaced = [e.pk for e, _, has_items in self.updates if has_items]
+            if replaced:
+                GratitudeItem.objects.filter(entry_id__in=replaced).delete()
+            items = [
+                GratitudeItem(entry=entry, item_text=text)
+                for entry in self.creates
+                + [e for e, _, has_items in self.updates if has_items]
+                for text in entry.gratitude
+            ]
+            if items:
+                GratitudeItem.objects.bulk_create(items, batch_size=500)
+            if self.deletes:
+                Entry.objects.filter(
+                    pk__in=[entry.pk for entry in self.deletes]
+                ).delete()
+                EntryTombstone.objects.bulk_create(tombstones)
+
+            for entry in self.creates:
+                count(entry.mood, 1, len(entry.gratitude))
+            for entry, (mood, item_count, _), _ in self.updates:
+                count(mood, -1, -item_count)
+                count(entry.mood, 1, len(entry.gratitude))
+            for entry in self.deletes:
+                count(entry.mood, -1, -len(entry.gratitude))
+            for mood, (entries, item_count) in deltas.items():
+                EntryCounter.adjust(
+                    user_id,
+                    mood,
+                    entries=entries,
+                    gratitude_items=item_count,
+                )
+
+            day_of = StreakRun.day_of
+            added = {day_of(entry.date) for entry in self.creates}
+            vacated = {day_of(entry.date) for entry in self.deletes}
+            for entry, (_, _, old_date), _ in self.updates:
+                if day_of(old_date) != day_of(entry.date):
+                    added.add(day_of(entry.date))
+                    vacated.add(day_of(old_date))
+            StreakRun.update_days(user_id, added, vacated)
+
+
+class EntryChangesApiView(EntryApiMixin, View):
+    """Entries created, updated or deleted since a sync token.
+
+    Every entry write (including gratitude item changes) stamps the entry
+    with the next value of the user's `ChangeSequence`; deletes leave an
+    `EntryTombstone` with its own value. A client stores `next_token` and
+    passes it back as `since` to receive only what changed::
+
+        {
+            "entries": [{...}, ...],
+            "deleted": [13, 14],
+            "next_token": "42",
+            "has_more": false,
+            "reset": false
+        }
+
+    Call again with the new token while `has_more` is true. `since`
+    defaults to 0, which returns every entry. When `reset` is true the
+    token is too old (its tombstones were pruned, or entries were archived)
+    and the client must discard its copy and start again from
+    `next_token`, which is then "0". `fields` and `limit` work as on the
+    list endpoint.
+    """
+
+    http_method_names = ["get"]
+
+    def get(self, request):
+        fields = parse_fields(request, DEFAULT_LIST_FIELDS)
+        try:
+            since = int(request.GET.get("since", 0))
+            limit = int(request.GET.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            raise ApiError(400, {"error": "since and limit must be integers."})
+        if since < 0:
+            raise ApiError(400, {"error": "since must not be negative."})
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        current, pruned_through = ChangeSequence.current(request.user)
+        if since > current:
+            raise ApiError(400, {"error": "Unknown sync token."})
+        if since and since < pruned_through:
+            return JsonResponse(
+                {
+                    "entries": [],
+                    "deleted": [],
+                    "next_token": "0",
+                    "has_more": True,
+                    "reset": True,
+                }
+            )
+
+        # Fetch one extra row from each side to know whether more remain,
+        # then merge the two streams in sequence order.
+        entries = list(
+            self.get_queryset()
+            .filter(change_seq__gt=since)
+            .only(*{"id", "change_seq", *fields})
+            .order_by("change_seq")[: limit + 1]
+        )
+        tombstones = list(
+            EntryTombstone.objects.filter(user=request.user, change_seq__gt=since)
+            .only("entry_id", "change_seq")
+            .order_by("change_seq")[: limit + 1]
+        )
+        changes = sorted(entries + tombstones, key=lambda row: row.change_seq)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        next_token = changes[-1].change_seq if has_more else current
+        return JsonResponse(
+            {
+                "entries": [
+                    serialize_entry(row, fields)
+                    for row in changes
+                    if isinstance(row, Entry)
+                ],
+                "deleted": [
+                    row.entry_id
+                    for row in changes
+                    if isinstance(row, EntryTombstone)
+                ],
+                "next_token": str(next_token),
+                "has_more": has_more,
+                "reset": False,
+            }
+        )
+
+
+def serialize_job(job, include_error=False):
+    """Return the public status fields of a background `job`."""
+    data = {
+        "id": job.pk,
+        "name": job.name,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_at": job.run_at,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "result": job.result,
+    }
+    if include_error:
+        data["last_error"] = job.last_error
+    return data
+
+
+class JobDetailApiView(EntryApiMixin, View):
+    """Status of a background job, for clients polling until it finishes.
+
+    Users see their own jobs; staff see every job and its last error.
+    """
+
+    http_method_names = ["get"]
+
+    def get(self, request, pk):
+        jobs = Job.objects.all()
+        if not request.user.is_staff:
+            jobs = jobs.filter(user=request.user)
+        job = jobs.filter(pk=pk).first()
+        if job is None:
+            raise ApiError(404, {"error": "Job not found."})
+        return JsonResponse(
+            serialize_job(job, include_error=request.user.is_staff)
+        )
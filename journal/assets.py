@@ -0,0 +1,95 @@
+"""Static asset pipeline used by `collectstatic`.
+
+`AssetStorage` extends WhiteNoise's compressed manifest storage with two
+steps that run before files are hashed:
+
+* every stylesheet is minified in place (`minify_css`);
+* each entry in `BUNDLES` is written as one file concatenating its
+  sources, so pages load a single script instead of several.
+
+WhiteNoise then hashes every file, writes `.gz` copies (and `.br` copies
+when the `brotli` package is installed), and serves hashed names with a
+far-future, immutable `Cache-Control` header. Templates include bundles
+with the `{% script_bundle %}` tag, which falls back to the individual
+sources when the bundle has not been built (DEBUG, or tests).
+"""
+
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+# Bundle name -> sources, in load order.
+BUNDLES = {
+    "js/app.js": ["js/toast.js", "js/entries.js"],
+}
+
+# Quoted strings are kept verbatim; everything between them is minified.
+CSS_STRING = re.compile(r"""("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')""")
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+# Whitespace around these characters never carries meaning. Spaces before
+# ":" do (`a :hover`), and "+" is also an operator inside calc().
+CSS_SPACE = re.compile(r"\s*([{};,>])\s*|:\s+")
+
+
+def _minify_css_code(code):
+    code = CSS_COMMENT.sub("", code)
+    code = re.sub(r"\s+", " ", code)
+    code = CSS_SPACE.sub(lambda m: m.group(1) or ":", code)
+    return code.replace(";}", "}")
+
+
+def minify_css(css):
+    """Return `css` without comments and redundant whitespace."""
+    # Strings sit at the odd indexes of the split.
+    parts = CSS_STRING.split(css)
+    parts[::2] = [_minify_css_code(code) for code in parts[::2]]
+    return "".join(parts).strip()
+
+
+def bundle(sources):
+    """Return the concatenation of the script `sources`."""
+    # A newline and a semicolon keep a file ending in a comment or without
+    # a final semicolon from running into the next one.
+    return "\n;\n".join(source.rstrip() for source in sources) + "\n"
+
+
+def script_sources(name):
+    """Return the static paths to load for the bundle `name`."""
+    if not settings.DEBUG and isinstance(staticfiles_storage, AssetStorage):
+        return [name]
+    return BUNDLES[name]
+
+
+class AssetStorage(CompressedManifestStaticFilesStorage):
+    """Manifest storage that minifies CSS and builds `BUNDLES` first."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            self.minify(paths)
+            self.build_bundles(paths)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def read_text(self, name):
+        with self.open(name) as handle:
+            return handle.read().decode("utf-8")
+
+    def write_text(self, name, text):
+        if self.exists(name):
+            self.delete(name)
+        self.save(name, ContentFile(text.encode("utf-8")))
+
+    def minify(self, paths):
+        # The manifest storage hashes whatever each path points at, which
+        # is the source directory; point rewritten files at the copy.
+        for name in list(paths):
+            if name.endswith(".css"):
+                self.write_text(name, minify_css(self.read_text(name)))
+                paths[name] = (self, name)
+
+    def build_bundles(self, paths):
+        for name, sources in BUNDLES.items():
+            self.write_text(name, bundle(self.read_text(s) for s in sources))
+            paths[name] = (self, name)
@@ -0,0 +1,140 @@
+"""Weekly mood digest generation.
+
+A digest summarises one user's entries for one Monday-to-Sunday week:
+how many entries were written, the average `mood_rating`, and the most
+frequent moods and gratitude items. Digests are stored as `WeeklyDigest`
+rows by the `generate_digests` command.
+
+Generation works on chunks of user ids. Each chunk is summarised with
+three grouped aggregate queries (not one query per user) and written
+with a single upsert, in its own transaction. Chunks are independent, so
+the command can fan them out across worker processes, and a run that
+dies part-way can simply be restarted: users that already have a digest
+for the week are skipped (see `pending_user_ids`).
+"""
+
+import datetime
+import time
+
+from django.db import transaction
+from django.db.models import Avg, Count
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import Entry, GratitudeItem, WeeklyDigest
+
+TOP_MOODS = 3
+TOP_GRATITUDE = 3
+
+
+def last_complete_week(today=None):
+    """Return the Monday of the last full week before `today`."""
+    today = today or timezone.localdate()
+    this_monday = today - datetime.timedelta(days=today.weekday())
+    return this_monday - datetime.timedelta(days=7)
+
+
+def week_bounds(week_start):
+    """Return the aware `[start, end)` datetimes of the week."""
+    start = timezone.make_aware(
+        datetime.datetime.combine(week_start, datetime.time.min)
+    )
+    return start, start + datetime.timedelta(days=7)
+
+
+def week_entries(week_start):
+    start, end = week_bounds(week_start)
+    return Entry.objects.filter(date__gte=start, date__lt=end)
+
+
+def pending_user_ids(week_start, chunk_size, force=False):
+    """Yield lists of up to `chunk_size` user ids still needing a digest.
+
+    Only users with entries that week are considered. Ids are streamed
+    with a server-side cursor (on PostgreSQL) rather than loaded at once.
+    Without `force`, users who already have a digest for the week are
+    skipped, which is what makes an interrupted run resumable.
+    """
+    user_ids = week_entries(week_start).values_list("user_id", flat=True)
+    if not force:
+        done = WeeklyDigest.objects.filter(week_start=week_start).values(
+            "user_id"
+        )
+        user_ids = user_ids.exclude(user_id__in=done)
+    chunk = []
+    for user_id in user_ids.distinct().order_by("user_id").iterator(
+        chunk_size=chunk_size
+    ):
+        chunk.append(user_id)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def build_digests(user_ids, week_start):
+    """Return unsaved WeeklyDigest objects for `user_ids` and the week."""
+    entries = week_entries(week_start).filter(user_id__in=user_ids)
+    digests = {
+        row["user_id"]: WeeklyDigest(
+            user_id=row["user_id"],
+            week_start=week_start,
+            entries=row["n"],
+            average_rating=row["avg"],
+        )
+        for row in entries.values("user_id")
+        .annotate(n=Count("id"), avg=Avg("mood_rating"))
+        .order_by()
+    }
+
+    moods = (
+        entries.values("user_id", "mood")
+        .annotate(n=Count("id"))
+        .order_by("user_id", "-n", "mood")
+    )
+    for row in moods:
+        top = digests[row["user_id"]].top_moods
+        if len(top) < TOP_MOODS:
+            top.append([row["mood"], row["n"]])
+
+    start, end = week_bounds(week_start)
+    gratitude = (
+        GratitudeItem.objects.filter(
+            entry__user_id__in=user_ids,
+            entry__date__gte=start,
+            entry__date__lt=end,
+        )
+        .values("entry__user_id", text=Lower("item_text"))
+        .annotate(n=Count("id"))
+        .order_by("entry__user_id", "-n", "text")
+    )
+    for row in gratitude:
+        top = digests[row["entry__user_id"]].top_gratitude
+        if len(top) < TOP_GRATITUDE:
+            top.append([row["text"], row["n"]])
+    return list(digests.values())
+
+
+def generate_chunk(user_ids, week_start):
+    """Compute and store digests for one chunk; return `(count, seconds)`.
+
+    This is the unit of work run in each worker process. It opens (and
+    then reuses) that process's own database connection.
+    """
+    started = time.monotonic()
+    digests = build_digests(user_ids, week_start)
+    with transaction.atomic():
+        WeeklyDigest.objects.bulk_create(
+            digests,
+            update_conflicts=True,
+            unique_fields=["user", "week_start"],
+            update_fields=[
+                "entries",
+                "average_rating",
+                "top_moods",
+                "top_gratitude",
+                "generated_at",
+            ],
+        )
+    return len(digests), time.monotonic() - started
@@ -0,0 +1,87 @@
+"""Year-at-a-glance mood heatmap data.
+
+`year_heatmap()` returns one cell per day of a year with the number of
+entries and the average mood rating, built from a single grouped
+aggregate over `Entry` rather than a query per day.
+
+The per-day totals are cached per `(user, year)`. The cache key includes
+the user's `ChangeSequence` value, which every entry write bumps (views,
+admin, the API and its batch endpoint, partition detaches), so a write
+invalidates the cached years without each write path having to know
+about the cache. Superseded keys simply expire.
+"""
+
+import datetime
+
+from django.core.cache import cache
+from django.db.models import Avg, Count
+from django.db.models.functions import TruncDate
+
+from . import metrics
+from .models import ChangeSequence, Entry
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def cache_key(user_id, year, version):
+    return f"journal:heatmap:{user_id}:{year}:{version}"
+
+
+def daily_totals(user, year):
+    """Return `{date: (entries, average_rating)}` for days with entries."""
+    rows = (
+        Entry.objects.filter(user=user, date__year=year)
+        .annotate(day=TruncDate("date"))
+        .values("day")
+        .annotate(entries=Count("id"), average=Avg("mood_rating"))
+        .order_by()
+    )
+    return {row["day"]: (row["entries"], row["average"]) for row in rows}
+
+
+def cached_daily_totals(user, year):
+    """`daily_totals()` cached until the user's next entry write."""
+    version, _ = ChangeSequence.current(user)
+    key = cache_key(user.pk, year, version)
+    totals = cache.get(key)
+    metrics.record_cache("heatmap", totals is not None)
+    if totals is None:
+        totals = daily_totals(user, year)
+        cache.set(key, totals, CACHE_TIMEOUT)
+    return totals
+
+
+def year_heatmap(user, year):
+    """Return the heatmap context for `user` and `year`.
+
+    The result is a dict with:
+        cells: one dict per day (`date`, `entries`, `average`, `level`),
+            where `level` is the rounded average rating (0 with no entries)
+        leading_blanks: number of empty cells before 1 January so that
+            columns are Monday-to-Sunday weeks
+        days_journaled, total_entries, average: year summary figures
+    """
+    totals = cached_daily_totals(user, year)
+    day = datetime.date(year, 1, 1)
+    cells = []
+    while day.year == year:
+        entries, average = totals.get(day, (0, None))
+        cells.append(
+            {
+                "date": day,
+                "entries": entries,
+                "average": average,
+                "level": round(average) if average else 0,
+            }
+        )
+        day += datetime.timedelta(days=1)
+
+    total_entries = sum(entries for entries, _ in totals.values())
+    rating_sum = sum(entries * average for entries, average in totals.values())
+    return {
+        "cells": cells,
+        "leading_blanks": range(cells[0]["date"].weekday()),
+        "days_journaled": len(totals),
+        "total_entries": total_entries,
+        "average": rating_sum / total_entries if total_entries else None,
+    }
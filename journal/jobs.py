@@ -0,0 +1,217 @@
+"""A small database-backed job queue.
+
+Work that is too slow for a request (rebuilding rollups, imports, digests)
+is stored as a `Job` row and run by `python manage.py run_worker`, so no
+Redis or other broker is needed.
+
+Usage::
+
+    from journal import jobs
+
+    @jobs.task("journal.rebuild_counters")
+    def rebuild_counters(user_ids=None):
+        ...
+
+    jobs.enqueue("journal.rebuild_counters", {"user_ids": [1]}, user=request.user)
+
+Tasks receive the job's `payload` as keyword arguments and may return a
+JSON-serialisable result. A task that raises is retried with exponential
+backoff (`backoff * 2 ** (attempts - 1)` seconds) until `max_attempts` is
+reached, then marked failed with its traceback.
+
+Workers claim jobs with `SELECT ... FOR UPDATE SKIP LOCKED`, so any number
+of worker processes and threads can poll the same table; each queued job
+is handed to exactly one of them. On databases without row locking
+(SQLite in development) the lock clause is simply omitted.
+
+While a job runs, its worker stamps `heartbeat_at` every
+`HEARTBEAT_INTERVAL` seconds. `requeue_stale` only recovers jobs whose
+heartbeat has stopped, so a long task is never handed to a second worker
+while the first is still running it.
+"""
+
+import contextlib
+import datetime
+import logging
+import threading
+import traceback
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .slow_queries import log_slow_queries
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKOFF = 30
+HEARTBEAT_INTERVAL = 30
+_registry = {}
+
+
+def task(name):
+    """Register the decorated function as the task called `name`."""
+
+    def decorator(func):
+        if name in _registry:
+            raise ValueError(f"Task {name!r} is already registered.")
+        _registry[name] = func
+        return func
+
+    return decorator
+
+
+def registered_tasks():
+    """Return the sorted names of all registered tasks."""
+    return sorted(_registry)
+
+
+def enqueue(name, payload=None, user=None, run_at=None, max_attempts=3):
+    """Queue task `name` with keyword arguments `payload`; return the Job.
+
+    The job becomes visible to workers when the surrounding transaction
+    (if any) commits.
+    """
+    if name not in _registry:
+        raise ValueError(f"Unknown task {name!r}.")
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        user=user,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def claim(worker):
+    """Lock the next due job, mark it running and return it (or None)."""
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, run_at__lte=now)
+            .order_by("run_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.worker = worker
+        job.started_at = now
+        job.heartbeat_at = now
+        job.finished_at = None
+        job.save(
+            update_fields=[
+                "status",
+                "attempts",
+                "worker",
+                "started_at",
+                "heartbeat_at",
+                "finished_at",
+            ]
+        )
+    return job
+
+
+@contextlib.contextmanager
+def heartbeat(job, interval=HEARTBEAT_INTERVAL):
+    """Stamp `job.heartbeat_at` every `interval` seconds until exit.
+
+    The stamps come from a background thread with its own connection, so
+    they commit while the task is still running.
+    """
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                try:
+                    Job.objects.filter(
+                        pk=job.pk, status=Job.RUNNING, worker=job.worker
+                    ).update(heartbeat_at=timezone.now())
+                except DatabaseError:
+                    # A missed beat is harmless; keep trying.
+                    logger.warning("Heartbeat for job %s failed", job.pk)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"job-{job.pk}-heartbeat")
+    thread.daemon = True
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _record_failure(job, backoff, retry):
+    job.last_error = traceback.format_exc()
+    job.result = None
+    if retry:
+        job.status = Job.QUEUED
+        delay = backoff * 2 ** (job.attempts - 1)
+        job.run_at = timezone.now() + datetime.timedelta(seconds=delay)
+    else:
+        job.status = Job.FAILED
+        job.finished_at = timezone.now()
+    _save_outcome(job)
+
+
+def _save_outcome(job):
+    job.save(
+        update_fields=[
+            "status", "result", "last_error", "run_at", "finished_at"
+        ]
+    )
+
+
+def run(job, backoff=DEFAULT_BACKOFF, heartbeat_interval=HEARTBEAT_INTERVAL):
+    """Run a claimed job and record its outcome; return the final status.
+
+    If the task succeeds but its result cannot be stored (for example it
+    is not JSON-serialisable), the job is marked failed rather than
+    retried, since running it again would repeat its side effects.
+    """
+    func = _registry.get(job.name)
+    with heartbeat(job, heartbeat_interval):
+        try:
+            if func is None:
+                raise LookupError(f"Unknown task {job.name!r}.")
+            with log_slow_queries(f"job:{job.name}"):
+                result = func(**job.payload)
+        except Exception:
+            retry = func is not None and job.attempts < job.max_attempts
+            _record_failure(job, backoff, retry)
+            return job.status
+        try:
+            job.result = result
+            job.status = Job.SUCCEEDED
+            job.finished_at = timezone.now()
+            with transaction.atomic():
+                _save_outcome(job)
+        except Exception:
+            _record_failure(job, backoff, retry=False)
+    return job.status
+
+
+def requeue_stale(older_than):
+    """Put running jobs with no heartbeat since `older_than` back in the queue.
+
+    Recovers jobs whose worker died mid-run. They count as an attempt, so
+    a job that keeps killing its worker eventually fails for good.
+    """
+    stale = Job.objects.filter(
+        Q(heartbeat_at__lt=older_than)
+        | Q(heartbeat_at__isnull=True, started_at__lt=older_than),
+        status=Job.RUNNING,
+    )
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED,
+        finished_at=timezone.now(),
+        last_error="Worker stopped while running the job.",
+    )
+    queued = stale.update(status=Job.QUEUED, run_at=timezone.now())
+    return queued + failed
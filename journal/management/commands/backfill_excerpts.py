@@ -0,0 +1,50 @@
+"""Recompute Entry.excerpt and Entry.word_count from Entry.content.
+
+Excerpts are refreshed on every save; run this after changing
+`EXCERPT_WORDS` or after writes that bypassed `Entry.save()` (raw SQL,
+`QuerySet.update()`).
+
+Usage:
+    python manage.py backfill_excerpts
+    python manage.py backfill_excerpts --missing-only --batch-size 1000
+"""
+
+from django.core.management.base import BaseCommand
+
+from journal.models import Entry
+
+
+class Command(BaseCommand):
+    help = "Recompute stored excerpts and word counts for journal entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows fetched and updated per batch (default: 500).",
+        )
+        parser.add_argument(
+            "--missing-only",
+            action="store_true",
+            help="Only fill entries whose excerpt is empty.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = Entry.objects.only("pk", "content").order_by("pk")
+        if options["missing_only"]:
+            queryset = queryset.filter(excerpt="")
+        updated = 0
+        batch = []
+        for entry in queryset.iterator(chunk_size=batch_size):
+            entry.refresh_excerpt()
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                updated += Entry.objects.bulk_update(
+                    batch, ["excerpt", "word_count"]
+                )
+                batch = []
+        if batch:
+            updated += Entry.objects.bulk_update(batch, ["excerpt", "word_count"])
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} entries."))
@@ -0,0 +1,134 @@
+"""Generate WeeklyDigest rows for every user who wrote entries in a week.
+
+User ids are streamed in chunks and each chunk is summarised by
+`journal.digests.generate_chunk`, fanned out across a pool of worker
+processes (see `journal.pool`). Each worker process sets up Django
+itself and keeps its own database connection for every chunk it handles. Progress and throughput
+are reported as chunks finish.
+
+The run is resumable: chunks are committed independently and users who
+already have a digest for the week are skipped, so after a crash or a
+failed chunk simply run the command again (`--force` regenerates
+everyone).
+
+Usage:
+    python manage.py generate_digests                  # last full week
+    python manage.py generate_digests --week 2026-01-05 --workers 8
+    python manage.py generate_digests --workers 1      # in this process
+"""
+
+import argparse
+import datetime
+import os
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, wait
+
+from django.core.management.base import BaseCommand, CommandError
+
+from journal import digests
+from journal.pool import process_pool
+
+
+def parse_week(value):
+    """argparse type for a `YYYY-MM-DD` date, moved back to its Monday."""
+    try:
+        day = datetime.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid date {value!r}; expected YYYY-MM-DD"
+        )
+    return day - datetime.timedelta(days=day.weekday())
+
+
+class Command(BaseCommand):
+    help = "Precompute weekly mood digests for all users."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--week",
+            type=parse_week,
+            metavar="YYYY-MM-DD",
+            help="Any day in the week to summarise (default: last full week).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes; 1 runs in this process "
+            "(default: number of CPUs).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Users per chunk of work (default: 500).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate digests that already exist.",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["chunk_size"] < 1:
+            raise CommandError("--workers and --chunk-size must be positive.")
+        week = options["week"] or digests.last_complete_week()
+        chunks = digests.pending_user_ids(
+            week, options["chunk_size"], force=options["force"]
+        )
+        self.stdout.write(f"Generating digests for the week of {week}.")
+        self.started = time.monotonic()
+        self.done = 0
+        self.failed = 0
+
+        if options["workers"] == 1:
+            for chunk in chunks:
+                self.report(len(chunk), *digests.generate_chunk(chunk, week))
+        else:
+            self.run_pool(chunks, week, options["workers"])
+
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed else 0
+        summary = (
+            f"Wrote {self.done} digest(s) in {elapsed:.1f}s "
+            f"({rate:.0f} users/s)."
+        )
+        if self.failed:
+            raise CommandError(
+                f"{summary} {self.failed} user(s) failed; run the command "
+                "again to resume."
+            )
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def run_pool(self, chunks, week, workers):
+        """Fan chunks out to `workers` processes, a few in flight each."""
+        pending = {}
+        with process_pool(workers) as pool:
+            for chunk in chunks:
+                future = pool.submit(digests.generate_chunk, chunk, week)
+                pending[future] = len(chunk)
+                if len(pending) >= workers * 2:
+                    self.collect(pending, FIRST_COMPLETED)
+            self.collect(pending, ALL_COMPLETED)
+
+    def collect(self, pending, return_when):
+        """Wait for futures in `pending` and report the finished ones."""
+        finished, _ = wait(pending, return_when=return_when)
+        for future in finished:
+            size = pending.pop(future)
+            try:
+                written, seconds = future.result()
+            except Exception as exc:
+                self.failed += size
+                self.stderr.write(f"Chunk of {size} user(s) failed: {exc!r}")
+            else:
+                self.report(size, written, seconds)
+
+    def report(self, size, written, seconds):
+        self.done += written
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed else 0
+        self.stdout.write(
+            f"  {written}/{size} digest(s) in {seconds:.2f}s; "
+            f"{self.done} total, {rate:.0f} users/s"
+        )
@@ -0,0 +1,180 @@
+"""Bulk-load quotes from a CSV or JSON Lines file.
+
+Each record needs a `text` and may have an `author` and `moods` (mood
+keys separated by commas, semicolons or `|`; a JSON list also works in
+JSONL). Records with a blank `text`, or (in JSONL) a `text`, `author` or
+`moods` of the wrong type, are counted as skipped. `--mood` tags every
+quote in the file as well. The file is
+streamed and written in batches with `bulk_create(ignore_conflicts=True)`:
+quotes are deduplicated by the unique `Quote.text_hash`, so re-running a
+load (or loading overlapping files) inserts nothing twice. Tags on a
+quote that already exists are still added. The home page quote pools
+(`journal.quotes`) are refreshed once the load finishes.
+
+Usage:
+    python manage.py load_quotes quotes.csv
+    python manage.py load_quotes quotes.jsonl --mood calm --batch-size 5000
+"""
+
+import csv
+import json
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from journal.models import MOOD_CHOICES, Quote, QuoteMood, quote_text_hash
+from journal.quotes import invalidate_pools
+
+MOODS = {key for key, _ in MOOD_CHOICES}
+
+
+def split_moods(value):
+    """Return the mood keys in a `moods` column or JSON value."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = re.split(r"[,;|]", value)
+    return [str(mood).strip().lower() for mood in value if str(mood).strip()]
+
+
+def read_csv(handle):
+    yield from csv.DictReader(handle)
+
+
+def read_jsonl(handle):
+    for number, line in enumerate(handle, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            raise CommandError(f"Line {number}: invalid JSON ({exc}).")
+        if not isinstance(record, dict):
+            raise CommandError(f"Line {number}: expected a JSON object.")
+        yield record
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+
+class Command(BaseCommand):
+    help = "Load quotes from a CSV or JSONL file, skipping duplicates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file to load.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="File format (default: from the file extension).",
+        )
+        parser.add_argument(
+            "--mood",
+            action="append",
+            default=[],
+            choices=sorted(MOODS),
+            help="Tag every quote with this mood; may be repeated.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Quotes inserted per batch (default: 2000).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or self.guess_format(path)
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+        self.default_moods = options["mood"]
+        self.skipped = 0
+        self.unknown_moods = set()
+
+        before = Quote.objects.count()
+        read = 0
+        batch = {}
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as handle:
+                for record in READERS[fmt](handle):
+                    read += 1
+                    self.add_record(batch, record)
+                    if len(batch) >= batch_size:
+                        self.write_batch(batch)
+                        batch = {}
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        if batch:
+            self.write_batch(batch)
+        added = Quote.objects.count() - before
+        # bulk_create() sends no signals, so refresh the home page pools here.
+        invalidate_pools()
+
+        if self.unknown_moods:
+            self.stderr.write(
+                "Ignored unknown mood(s): " + ", ".join(sorted(self.unknown_moods))
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Read {read} record(s): added {added} quote(s), "
+                f"{read - added - self.skipped} duplicate(s), "
+                f"{self.skipped} skipped."
+            )
+        )
+
+    def guess_format(self, path):
+        lowered = path.lower()
+        if lowered.endswith(".csv"):
+            return "csv"
+        if lowered.endswith((".jsonl", ".ndjson")):
+            return "jsonl"
+        raise CommandError("Cannot tell the file format; pass --format.")
+
+    def add_record(self, batch, record):
+        """Add one record to `batch`, keyed by text hash."""
+        text = record.get("text")
+        author = record.get("author")
+        mood_value = record.get("moods") or record.get("mood")
+        if (
+            not isinstance(text, str)
+            or not isinstance(author, (str, type(None)))
+            or not isinstance(mood_value, (str, list, type(None)))
+            or not text.strip()
+        ):
+            self.skipped += 1
+            return
+        text = text.strip()
+        moods = set(self.default_moods)
+        for mood in split_moods(mood_value):
+            if mood in MOODS:
+                moods.add(mood)
+            else:
+                self.unknown_moods.add(mood)
+        key = quote_text_hash(text)
+        if key in batch:
+            batch[key][1].update(moods)
+            return
+        author = (author or "").strip()[:200]
+        batch[key] = (Quote(text=text, author=author, text_hash=key), moods)
+
+    @transaction.atomic
+    def write_batch(self, batch):
+        """Insert new quotes in `batch` and add their mood tags."""
+        Quote.objects.bulk_create(
+            [quote for quote, _ in batch.values()], ignore_conflicts=True
+        )
+        tagged = [key for key, (_, moods) in batch.items() if moods]
+        if not tagged:
+            return
+        ids = dict(
+            Quote.objects.filter(text_hash__in=tagged).values_list("text_hash", "pk")
+        )
+        QuoteMood.objects.bulk_create(
+            [
+                QuoteMood(quote_id=ids[key], mood=mood)
+                for key in tagged
+                for mood in batch[key][1]
+            ],
+            ignore_conflicts=True,
+        )
@@ -0,0 +1,131 @@
+"""Maintain monthly partitions of the `journal_entry` table (PostgreSQL).
+
+By default creates partitions from the current month up to
+`--months-ahead` months in the future, so new entries never land in the
+default partition. Run it from a scheduler (e.g. daily or monthly).
+
+Usage:
+    python manage.py manage_partitions
+    python manage.py manage_partitions --months-ahead 6
+    python manage.py manage_partitions --list
+    python manage.py manage_partitions --backfill-from 2019-01
+    python manage.py manage_partitions --detach-before 2020-01 --archive-schema archive
+
+`--backfill-from` creates the monthly partitions from that month up to
+the current one, moving their rows out of the default partition. Migration
+0008 only partitions recent months, so run it once before detaching older
+ones.
+
+Detaching removes entries from the application: they stay in the detached
+table, with their gratitude items in `<partition>_gratitudeitem` (both
+optionally moved to `--archive-schema`), but are no longer returned by
+`Entry` queries. Entry counters and streaks are rebuilt for the affected
+users, and their sync clients are told to resync from scratch.
+"""
+
+import argparse
+import datetime
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+
+from journal import partitions
+from journal.models import ChangeSequence, EntryCounter, StreakRun
+
+IDENTIFIER_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def parse_month(value):
+    """argparse type for `YYYY-MM` month values."""
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid month {value!r}; expected YYYY-MM"
+        )
+
+
+class Command(BaseCommand):
+    help = "Create future and detach old monthly partitions of journal_entry."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Months after the current one to create (default: 3).",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="List attached partitions and their estimated row counts.",
+        )
+        parser.add_argument(
+            "--backfill-from",
+            type=parse_month,
+            metavar="YYYY-MM",
+            help="Create monthly partitions from this month up to the "
+            "current one, moving their rows out of the default partition.",
+        )
+        parser.add_argument(
+            "--detach-before",
+            type=parse_month,
+            metavar="YYYY-MM",
+            help="Detach monthly partitions ending on or before this month.",
+        )
+        parser.add_argument(
+            "--archive-schema",
+            help="Move detached partitions (and their gratitude items) "
+            "into this schema.",
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported():
+            raise CommandError("Partitioning requires PostgreSQL.")
+        if not partitions.is_partitioned():
+            raise CommandError(
+                "journal_entry is not partitioned; run `migrate` first."
+            )
+        archive_schema = options["archive_schema"]
+        if archive_schema and not IDENTIFIER_RE.match(archive_schema):
+            raise CommandError(f"Invalid schema name {archive_schema!r}.")
+
+        if options["list"]:
+            for name, start, estimate in partitions.list_partitions():
+                label = start.strftime("%Y-%m") if start else "default"
+                self.stdout.write(f"{name}\t{label}\t~{estimate} rows")
+            return
+
+        if options["backfill_from"]:
+            created = partitions.backfill_partitions(options["backfill_from"])
+            for name in created:
+                self.stdout.write(f"Created {name}")
+            self.stdout.write(
+                self.style.SUCCESS(f"Backfilled {len(created)} partition(s).")
+            )
+            return
+
+        if options["detach_before"]:
+            detached, user_ids = partitions.detach_partitions(
+                options["detach_before"], archive_schema=archive_schema
+            )
+            if user_ids:
+                EntryCounter.rebuild(users=user_ids)
+                StreakRun.rebuild(users=user_ids)
+                ChangeSequence.force_resync(user_ids)
+            for name in detached:
+                self.stdout.write(f"Detached {name}")
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Detached {len(detached)} partition(s); recounted "
+                    f"{len(user_ids)} user(s)."
+                )
+            )
+            return
+
+        created = partitions.ensure_partitions(options["months_ahead"])
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {len(created)} partition(s).")
+        )
@@ -0,0 +1,38 @@
+"""Delete old EntryTombstone rows recorded for delta sync clients.
+
+Tombstones only need to live until every client has synced past them.
+Pruning raises the affected users' `ChangeSequence.pruned_through`, so a
+client still holding an older token gets `reset: true` from
+`/api/changes/` and resyncs from scratch instead of missing deletes.
+
+Usage:
+    python manage.py prune_tombstones
+    python manage.py prune_tombstones --older-than-days 30
+"""
+
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from journal.models import EntryTombstone
+
+
+class Command(BaseCommand):
+    help = "Delete entry tombstones older than a number of days."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=90,
+            help="Delete tombstones older than this many days (default: 90).",
+        )
+
+    def handle(self, *args, **options):
+        days = options["older_than_days"]
+        if days < 0:
+            raise CommandError("--older-than-days must not be negative.")
+        before = timezone.now() - datetime.timedelta(days=days)
+        deleted = EntryTombstone.prune(before)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstone(s)."))
@@ -0,0 +1,45 @@
+"""Rebuild StreakRun rows from entry dates.
+
+Streaks are maintained incrementally on every entry write; this command
+is the repair path for drift (e.g. after raw SQL, imports that bypass
+signals, or a change of `TIME_ZONE`).
+
+Usage:
+    python manage.py recompute_streaks
+    python manage.py recompute_streaks --user alice --user bob
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from journal.models import StreakRun
+
+
+class Command(BaseCommand):
+    help = "Recompute per-user journaling streaks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            metavar="USERNAME",
+            help="Only rebuild streaks for this user (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        usernames = options["usernames"]
+        if usernames:
+            User = get_user_model()
+            found = dict(
+                User.objects.filter(
+                    **{f"{User.USERNAME_FIELD}__in": usernames}
+                ).values_list(User.USERNAME_FIELD, "pk")
+            )
+            missing = sorted(set(usernames) - set(found))
+            if missing:
+                raise CommandError(f"Unknown user(s): {', '.join(missing)}")
+            user_ids = list(found.values())
+        written = StreakRun.rebuild(users=user_ids)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} streak runs."))
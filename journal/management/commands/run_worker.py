@@ -0,0 +1,135 @@
+"""Run background jobs from the database-backed queue (see `journal.jobs`).
+
+Each worker thread repeatedly claims the oldest due job with
+`SELECT ... FOR UPDATE SKIP LOCKED`, runs it and records the outcome;
+failed jobs are retried with exponential backoff. Start as many worker
+processes as needed (the `worker` process type in the Procfile); they
+share the queue without blocking each other.
+
+SIGTERM/SIGINT stop the worker after the jobs in progress finish. A
+running job's worker stamps its heartbeat every
+`jobs.HEARTBEAT_INTERVAL` seconds; jobs left `running` by a worker that
+died are put back in the queue when a worker starts and their heartbeat
+is more than `--stale-after` seconds old.
+
+Usage:
+    python manage.py run_worker
+    python manage.py run_worker --concurrency 4 --backoff 10
+    python manage.py run_worker --burst    # exit once the queue is empty
+"""
+
+import datetime
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from journal import jobs
+
+
+class Command(BaseCommand):
+    help = "Process queued background jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Number of worker threads (default: 1).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty (default: 1).",
+        )
+        parser.add_argument(
+            "--backoff",
+            type=float,
+            default=jobs.DEFAULT_BACKOFF,
+            help="Base retry delay in seconds, doubled after each failed "
+            f"attempt (default: {jobs.DEFAULT_BACKOFF}).",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=300,
+            help="On startup, requeue running jobs with no heartbeat for "
+            "this many seconds (default: 300).",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit when no job is due instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"]
+        if concurrency < 1:
+            raise CommandError("--concurrency must be at least 1.")
+        self.options = options
+        self.stop = threading.Event()
+        previous = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous[signum] = signal.signal(signum, self.request_stop)
+        try:
+            self.run_workers(concurrency)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def run_workers(self, concurrency):
+        """Recover stale jobs, then run `concurrency` workers until stopped."""
+        stale_before = timezone.now() - datetime.timedelta(
+            seconds=self.options["stale_after"]
+        )
+        requeued = jobs.requeue_stale(stale_before)
+        if requeued:
+            self.stdout.write(f"Recovered {requeued} stale job(s).")
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        if concurrency == 1:
+            self.work(f"{prefix}:0")
+            return
+        threads = [
+            threading.Thread(
+                target=self.work_in_thread, args=(f"{prefix}:{i}",), daemon=True
+            )
+            for i in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        # Join with a timeout so the main thread keeps handling signals.
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+
+    def request_stop(self, signum, frame):
+        self.stdout.write("Stopping after the current job(s)...")
+        self.stop.set()
+
+    def work_in_thread(self, worker):
+        try:
+            self.work(worker)
+        finally:
+            connection.close()
+
+    def work(self, worker):
+        """Claim and run jobs until stopped (or the queue drains in burst)."""
+        while not self.stop.is_set():
+            job = jobs.claim(worker)
+            if job is None:
+                if self.options["burst"]:
+                    return
+                self.stop.wait(self.options["poll_interval"])
+                continue
+            status = jobs.run(job, backoff=self.options["backoff"])
+            self.stdout.write(
+                f"[{worker}] {job.name} #{job.pk}: {status} "
+                f"(attempt {job.attempts}/{job.max_attempts})"
+            )
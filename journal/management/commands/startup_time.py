@@ -0,0 +1,123 @@
+"""Measure how long the project takes to start, and where the time goes.
+
+Each target is started in a fresh interpreter `--repeat` times to time it,
+then once more under `python -X importtime` to attribute import time to
+top-level packages.
+
+Targets are `wsgi` (importing `MoodJournal.wsgi`, which is what every
+gunicorn worker does) or any manage.py command line, quoted:
+
+Usage:
+    python manage.py startup_time
+    python manage.py startup_time wsgi "run_worker --burst" --repeat 10
+    python manage.py startup_time --profile MoodJournal.settings \\
+        --profile MoodJournal.settings_web
+"""
+
+import os
+import re
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def parse_importtime(stderr):
+    """Return `(module, self_us, cumulative_us, depth)` for each import."""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match:
+            own, cumulative, indent, module = match.groups()
+            rows.append((module, int(own), int(cumulative), len(indent) // 2))
+    return rows
+
+
+def by_package(rows):
+    """Return a Counter of self import time (us) per top-level package."""
+    totals = Counter()
+    for module, own, _cumulative, _depth in rows:
+        totals[module.split(".")[0]] += own
+    return totals
+
+
+def command_line(target):
+    if target == "wsgi":
+        return [sys.executable, "-c", "import MoodJournal.wsgi"]
+    return [sys.executable, "manage.py", *shlex.split(target)]
+
+
+class Command(BaseCommand):
+    help = "Time interpreter start-up for the WSGI app or manage.py commands."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "targets",
+            nargs="*",
+            metavar="TARGET",
+            help='"wsgi" (the default) or a quoted manage.py command line.',
+        )
+        parser.add_argument(
+            "--profile",
+            action="append",
+            dest="profiles",
+            metavar="SETTINGS_MODULE",
+            help="Settings module to start with (repeatable; default: the "
+            "current one).",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--top", type=int, default=15, help="Packages to list (default 15)."
+        )
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        profiles = options["profiles"] or [settings.SETTINGS_MODULE]
+        for target in options["targets"] or ["wsgi"]:
+            for profile in profiles:
+                self.measure(target, profile, options["repeat"], options["top"])
+
+    def run(self, argv, profile):
+        environ = {**os.environ, "DJANGO_SETTINGS_MODULE": profile}
+        started = time.perf_counter()
+        result = subprocess.run(
+            argv,
+            cwd=settings.BASE_DIR,
+            env=environ,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if result.returncode:
+            raise CommandError(
+                f"{shlex.join(argv[1:])} failed with {profile}:\n"
+                + result.stderr[-2000:]
+            )
+        return elapsed, result.stderr
+
+    def measure(self, target, profile, repeat, top):
+        argv = command_line(target)
+        timings = [self.run(argv, profile)[0] * 1000 for _ in range(repeat)]
+        _elapsed, stderr = self.run([argv[0], "-X", "importtime", *argv[1:]], profile)
+        rows = parse_importtime(stderr)
+        packages = by_package(rows)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{target} with {profile}"))
+        self.stdout.write(
+            f"  wall time: median {statistics.median(timings):.0f} ms, "
+            f"min {min(timings):.0f} ms ({repeat} run(s))"
+        )
+        self.stdout.write(
+            f"  imports: {sum(packages.values()) / 1000:.0f} ms "
+            f"in {len(rows)} modules"
+        )
+        for package, own in packages.most_common(top):
+            self.stdout.write(f"    {own / 1000:8.1f} ms  {package}")
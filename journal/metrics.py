@@ -0,0 +1,271 @@
+"""Request, database and cache metrics in the Prometheus text format.
+
+Each process keeps its counters and histograms in memory (recorded by
+`journal.middleware.MetricsMiddleware` and the cache helpers) and, when
+`settings.METRICS_DIR` is set, writes a snapshot to `<dir>/<pid>.json` at
+most every `FLUSH_INTERVAL` seconds and on exit. `/metrics` adds up the
+snapshots of every process, so a scrape of any gunicorn worker reports
+the whole server. Snapshots of processes that have exited are folded
+into `archived.json` so that totals never go backwards when workers are
+recycled. Without `METRICS_DIR` only the serving process is reported.
+
+Exposed metrics:
+
+    journal_http_requests_total{view, status}            counter
+    journal_http_request_duration_seconds{view}          histogram
+    journal_db_queries_per_request{view}                 histogram
+    journal_db_connections_opened_total                  counter
+    journal_cache_requests_total{cache, result}          counter
+
+Cache hit ratios are `result="hit"` over all requests for a cache.
+"""
+
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+FLUSH_INTERVAL = 5
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+HELP = {
+    "journal_http_requests_total": ("counter", "Requests by URL name and status."),
+    "journal_http_request_duration_seconds": (
+        "histogram",
+        "Request latency by URL name.",
+    ),
+    "journal_db_queries_per_request": (
+        "histogram",
+        "Database queries per request by URL name.",
+    ),
+    "journal_db_connections_opened_total": (
+        "counter",
+        "Database connections opened.",
+    ),
+    "journal_cache_requests_total": ("counter", "Cache lookups by result."),
+}
+BUCKETS = {
+    "journal_http_request_duration_seconds": LATENCY_BUCKETS,
+    "journal_db_queries_per_request": QUERY_BUCKETS,
+}
+
+_lock = threading.Lock()
+# {(name, ((label, value), ...)): number} for counters and
+# {(name, labels): [bucket counts..., sum, count]} for histograms.
+_counters = {}
+_histograms = {}
+_last_flush = 0.0
+
+
+def inc(name, amount=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+    maybe_flush()
+
+
+def observe(name, value, **labels):
+    buckets = BUCKETS[name]
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        series = _histograms.get(key)
+        if series is None:
+            series = _histograms[key] = [0] * (len(buckets) + 2)
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+    maybe_flush()
+
+
+def record_request(view, status, duration, queries):
+    """Record one finished request."""
+    inc("journal_http_requests_total", view=view, status=str(status))
+    observe("journal_http_request_duration_seconds", duration, view=view)
+    observe("journal_db_queries_per_request", queries, view=view)
+
+
+def record_cache(cache_name, hit):
+    result = "hit" if hit else "miss"
+    inc("journal_cache_requests_total", cache=cache_name, result=result)
+
+
+def snapshot():
+    """Return this process's metrics as JSON-serialisable lists."""
+    with _lock:
+        return to_snapshot(
+            {
+                "counters": dict(_counters),
+                "histograms": {key: list(s) for key, s in _histograms.items()},
+            }
+        )
+
+
+def metrics_dir():
+    directory = getattr(settings, "METRICS_DIR", None)
+    return Path(directory) if directory else None
+
+
+def write_json(path, data):
+    temporary = path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+    temporary.write_text(json.dumps(data))
+    os.replace(temporary, path)
+
+
+def flush():
+    """Write this process's snapshot to the metrics directory, if any."""
+    global _last_flush
+    directory = metrics_dir()
+    _last_flush = time.monotonic()
+    if directory is None:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    write_json(directory / f"{os.getpid()}.json", snapshot())
+
+
+def maybe_flush(force=False):
+    """Flush if `FLUSH_INTERVAL` has passed; errors are not fatal."""
+    if force or time.monotonic() - _last_flush >= FLUSH_INTERVAL:
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+atexit.register(maybe_flush, force=True)
+
+
+def merge(total, data):
+    """Add the snapshot `data` into the accumulator `total`."""
+    for name, labels, value in data.get("counters", []):
+        key = (name, tuple(sorted(labels.items())))
+        total["counters"][key] = total["counters"].get(key, 0) + value
+    for name, labels, series in data.get("histograms", []):
+        key = (name, tuple(sorted(labels.items())))
+        current = total["histograms"].get(key)
+        if current is None:
+            total["histograms"][key] = list(series)
+        else:
+            for index, value in enumerate(series):
+                current[index] += value
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def directory_lock(directory, operation):
+    """Hold `flock(operation)` on the directory's lock file."""
+    with open(directory / "archive.lock", "w") as lock:
+        fcntl.flock(lock, operation)
+        yield
+
+
+def archive_dead(directory):
+    """Fold snapshots of exited processes into `archived.json`."""
+    with directory_lock(directory, fcntl.LOCK_EX):
+        archive_path = directory / "archived.json"
+        archived = {"counters": {}, "histograms": {}}
+        dead = []
+        for path in directory.glob("*.json"):
+            if path.stem.isdigit() and not pid_alive(int(path.stem)):
+                dead.append(path)
+        if not dead:
+            return
+        if archive_path.exists():
+            merge(archived, json.loads(archive_path.read_text()))
+        for path in dead:
+            merge(archived, json.loads(path.read_text()))
+        write_json(archive_path, to_snapshot(archived))
+        for path in dead:
+            path.unlink()
+
+
+def to_snapshot(total):
+    """Turn an accumulator (see `merge`) back into a snapshot."""
+    return {
+        kind: [[name, dict(labels), value] for (name, labels), value in series.items()]
+        for kind, series in total.items()
+    }
+
+
+def collect():
+    """Return the metrics of every process, added together."""
+    total = {"counters": {}, "histograms": {}}
+    directory = metrics_dir()
+    if directory is None:
+        merge(total, snapshot())
+        return total
+    flush()
+    archive_dead(directory)
+    # Shared lock: no snapshot moves into the archive while reading.
+    with directory_lock(directory, fcntl.LOCK_SH):
+        for path in directory.glob("*.json"):
+            try:
+                merge(total, json.loads(path.read_text()))
+            except (OSError, ValueError):
+                # Unreadable snapshot; the next scrape will count it.
+                continue
+    return total
+
+
+def format_labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for key, value in items
+    )
+    return "{" + pairs + "}"
+
+
+def format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Return all metrics in the Prometheus text exposition format."""
+    total = collect()
+    lines = []
+    for name, (kind, text) in HELP.items():
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (metric, labels), value in sorted(total["counters"].items()):
+                if metric == name:
+                    value = format_number(value)
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+            continue
+        for (metric, labels), series in sorted(total["histograms"].items()):
+            if metric != name:
+                continue
+            for bound, count in zip(BUCKETS[name], series):
+                le = format_number(float(bound))
+                lines.append(f"{name}_bucket{format_labels(labels, le=le)} {count}")
+            lines.append(
+                f"{name}_bucket{format_labels(labels, le='+Inf')} {series[-1]}"
+            )
+            total_value = format_number(series[-2])
+            lines.append(f"{name}_sum{format_labels(labels)} {total_value}")
+            lines.append(f"{name}_count{format_labels(labels)} {series[-1]}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,211 @@
+"""Middleware for the journal app.
+
+`ServerTimingMiddleware` adds a `Server-Timing` header to every response
+(shown in the browser devtools' network timing tab) with these metrics,
+in milliseconds:
+
+    mw     request middleware, including loading the session and user
+    view   the view itself
+    tpl    rendering the response template (views returning a
+           TemplateResponse; views that call `render()` count it as view)
+    db     all database queries, with the query count in `desc`
+    total  the whole request, as seen from the top of the middleware
+
+`db` overlaps the others. The cost is a few clock reads per request and a
+wrapper call per query, so it can stay on in production; set
+`SERVER_TIMING` to False to remove it.
+
+`MetricsMiddleware` records each request's URL name, status, latency and
+query count with `journal.metrics`, exposed at `/metrics`.
+
+`SlowQueryMiddleware` logs queries slower than `SLOW_QUERY_MS` with the
+request's URL name (see `journal.slow_queries`).
+
+`ProfilingMiddleware` profiles a random sample of requests with cProfile
+and saves the results with `journal.profiling`, for staff to browse at
+`/profiles/`. It is opt-in: with `PROFILE_SAMPLE_RATE` at 0 (the default)
+Django removes it from the middleware chain at startup, so it costs
+nothing. Otherwise an unsampled request costs one `random()` call, and at
+most one request per process is profiled at a time, which bounds the
+overhead at low sample rates and keeps cProfile (a single process-wide
+profiler since Python 3.12) from being started twice.
+"""
+
+import cProfile
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics, profiling
+from .slow_queries import log_slow_queries, threshold
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    """Clock readings and query totals for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.template_started = None
+        self.template_ended = None
+        self.template_name = ""
+        self.queries = 0
+        self.query_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper counting queries and their duration."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_time += time.perf_counter() - started
+            self.queries += 1
+
+    def header(self):
+        ended = time.perf_counter()
+        metrics = []
+        view_started = self.view_started or ended
+        metrics.append(("mw", view_started - self.started, "Middleware"))
+        if self.view_started is not None:
+            view_ended = self.template_started or ended
+            metrics.append(("view", view_ended - self.view_started, "View"))
+        if self.template_ended is not None:
+            duration = self.template_ended - self.template_started
+            metrics.append(("tpl", duration, self.template_name or "Template"))
+        metrics.append(("db", self.query_time, f"{self.queries} queries"))
+        metrics.append(("total", ended - self.started, "Total"))
+        return ", ".join(
+            f'{name};dur={duration * 1000:.1f};desc="{desc}"'
+            for name, duration, desc in metrics
+        )
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = request.server_timings = RequestTimings()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+            response = self.get_response(request)
+        response["Server-Timing"] = timings.header()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Resolve the lazy session and user here so their queries count as
+        # middleware time rather than view time.
+        user = getattr(request, "user", None)
+        if user is not None:
+            user.is_authenticated
+        request.server_timings.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # Listed above every other middleware with this hook, it runs
+        # after all of them, so rendering here (the handler's own render()
+        # call then does nothing) times the template on its own.
+        timings = request.server_timings
+        timings.template_started = time.perf_counter()
+        response.render()
+        timings.template_ended = time.perf_counter()
+        name = response.template_name
+        if isinstance(name, (list, tuple)):
+            name = name[0] if name else ""
+        timings.template_name = name if isinstance(name, str) else ""
+        return response
+
+
+class QueryCounter:
+    """Database execute wrapper that only counts queries."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        queries = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        match = request.resolver_match
+        metrics.record_request(
+            match.view_name if match else "unresolved",
+            response.status_code,
+            time.perf_counter() - started,
+            queries.count,
+        )
+        return response
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        if threshold() is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        def source():
+            match = request.resolver_match
+            return match.view_name if match else "unresolved"
+
+        with log_slow_queries(source, request.path):
+            return self.get_response(request)
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.active = threading.Lock()
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        if not self.active.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self.profile(request)
+        finally:
+            self.active.release()
+
+    def profile(self, request):
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        url_name = match.view_name if match else None
+        try:
+            profiling.save_profile(profiler, url_name, duration)
+        except OSError:
+            logger.exception("Could not save the profile of %s", request.path)
+        return response
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.26 on 2026-10-19 04:22
+
+from django.db import migrations, models
+
+GIN_INDEX = "journal_entry_gratitude_gin"
+
+
+def backfill_gratitude(apps, schema_editor):
+    Entry = apps.get_model("journal", "Entry")
+    GratitudeItem = apps.get_model("journal", "GratitudeItem")
+    texts = {}
+    items = GratitudeItem.objects.order_by("entry_id", "pk").values_list(
+        "entry_id", "item_text"
+    )
+    for entry_id, item_text in items.iterator():
+        texts.setdefault(entry_id, []).append(item_text)
+    batch = []
+    for entry in Entry.objects.filter(pk__in=texts).only("pk").iterator():
+        entry.gratitude = texts[entry.pk]
+        batch.append(entry)
+        if len(batch) >= 500:
+            Entry.objects.bulk_update(batch, ["gratitude"])
+            batch = []
+    if batch:
+        Entry.objects.bulk_update(batch, ["gratitude"])
+
+
+def create_gin_index(apps, schema_editor):
+    # GIN on jsonb is PostgreSQL-only; other backends keep a plain column.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {GIN_INDEX} "
+        "ON journal_entry USING gin (gratitude jsonb_path_ops)"
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0004_add_db_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entry',
+            name='gratitude',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(backfill_gratitude, migrations.RunPython.noop),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
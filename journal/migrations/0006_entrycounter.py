@@ -0,0 +1,54 @@
+# Generated by Django 4.2.26 on 2026-10-19 04:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_counters(apps, schema_editor):
+    Entry = apps.get_model("journal", "Entry")
+    GratitudeItem = apps.get_model("journal", "GratitudeItem")
+    EntryCounter = apps.get_model("journal", "EntryCounter")
+    totals = {}
+    for row in Entry.objects.values("user_id", "mood").annotate(
+        n=models.Count("id")
+    ).order_by():
+        totals[(row["user_id"], row["mood"])] = [row["n"], 0]
+    for row in GratitudeItem.objects.values(
+        "entry__user_id", "entry__mood"
+    ).annotate(n=models.Count("id")).order_by():
+        key = (row["entry__user_id"], row["entry__mood"])
+        totals.setdefault(key, [0, 0])[1] = row["n"]
+    EntryCounter.objects.bulk_create(
+        [
+            EntryCounter(user_id=user_id, mood=mood, entries=n, gratitude_items=g)
+            for (user_id, mood), (n, g) in totals.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('journal', '0005_entry_gratitude'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntryCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mood', models.CharField(choices=[('happy', 'Happy'), ('anxious', 'Anxious'), ('sad', 'Sad'), ('neutral', 'Neutral'), ('excited', 'Excited'), ('frustrated', 'Frustrated'), ('calm', 'Calm'), ('stressed', 'Stressed')], max_length=50)),
+                ('entries', models.IntegerField(default=0)),
+                ('gratitude_items', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entry_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='entrycounter',
+            constraint=models.UniqueConstraint(fields=('user', 'mood'), name='entrycounter_unique_user_mood'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
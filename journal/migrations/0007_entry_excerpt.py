@@ -0,0 +1,39 @@
+# Generated by Django 4.2.26 on 2026-10-19 04:25
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def backfill_excerpts(apps, schema_editor):
+    Entry = apps.get_model("journal", "Entry")
+    batch = []
+    for entry in Entry.objects.only("pk", "content").iterator(chunk_size=500):
+        entry.excerpt = Truncator(entry.content).words(30, truncate=" …")
+        entry.word_count = len(entry.content.split())
+        batch.append(entry)
+        if len(batch) >= 500:
+            Entry.objects.bulk_update(batch, ["excerpt", "word_count"])
+            batch = []
+    if batch:
+        Entry.objects.bulk_update(batch, ["excerpt", "word_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0006_entrycounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entry',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,143 @@
+"""Partition journal_entry by month on `date` (PostgreSQL only).
+
+PostgreSQL requires the partition key in every unique constraint, so the
+primary key becomes `(id, date)` and `id` alone is no longer unique at the
+database level. Foreign keys cannot reference a non-unique column, so the
+GratitudeItem -> Entry constraint is dropped (`db_constraint=False`); the
+ORM still cascades deletes. GratitudeItem itself is not partitioned: list
+and detail pages read gratitude from `Entry.gratitude`, so it is off the
+hot path.
+
+Other backends only see the `db_constraint` change.
+"""
+
+import datetime
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Monthly partitions created around the current month. Rows outside the
+# window (old entries, or a mistyped year) stay in the default partition
+# until `manage_partitions --backfill-from YYYY-MM` creates partitions for
+# their months and moves them there.
+MONTHS_BACK = 24
+MONTHS_AHEAD = 3
+
+
+def _add_months(start, months):
+    index = start.year * 12 + (start.month - 1) + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_months(first, today):
+    """Return the first day of each month to create a partition for.
+
+    The window runs from the oldest entry's month, but no more than
+    `MONTHS_BACK` months before `today`, to `MONTHS_AHEAD` months after it, so a stray
+    date can never make the migration create thousands of tables.
+    """
+    current = datetime.date(today.year, today.month, 1)
+    start = current
+    if first is not None:
+        oldest = datetime.date(first.year, first.month, 1)
+        start = min(current, max(oldest, _add_months(current, -MONTHS_BACK)))
+    end = _add_months(current, MONTHS_AHEAD)
+    months = []
+    month = start
+    while month <= end:
+        months.append(month)
+        month = _add_months(month, 1)
+    return months
+
+
+def _table_objects(cursor, table):
+    """Return (index definitions, foreign key definitions) for `table`."""
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = %s "
+        "AND indexname <> %s",
+        [table, f"{table}_pkey"],
+    )
+    indexes = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+    return indexes, foreign_keys
+
+
+def _rebuild_entry_table(schema_editor, partitioned):
+    """Recreate journal_entry (partitioned or not) and copy rows across."""
+    old = "journal_entry_old"
+    with schema_editor.connection.cursor() as cursor:
+        indexes, foreign_keys = _table_objects(cursor, "journal_entry")
+        cursor.execute("SELECT min(date) FROM journal_entry")
+        [first] = cursor.fetchone()
+
+    execute = schema_editor.execute
+    execute(f"ALTER TABLE journal_entry RENAME TO {old}")
+    execute(f"ALTER TABLE {old} RENAME CONSTRAINT journal_entry_pkey TO {old}_pkey")
+    for name, _ in indexes:
+        execute(f"DROP INDEX {name}")
+    for name, _ in foreign_keys:
+        execute(f"ALTER TABLE {old} DROP CONSTRAINT {name}")
+
+    suffix = " PARTITION BY RANGE (date)" if partitioned else ""
+    execute(
+        f"CREATE TABLE journal_entry (LIKE {old} INCLUDING DEFAULTS "
+        f"INCLUDING CONSTRAINTS INCLUDING IDENTITY){suffix}"
+    )
+    if partitioned:
+        for month in _partition_months(first, datetime.date.today()):
+            following = _add_months(month, 1)
+            execute(
+                f"CREATE TABLE journal_entry_p{month.year:04d}_{month.month:02d} "
+                "PARTITION OF journal_entry FOR VALUES "
+                f"FROM ('{month.isoformat()} 00:00:00+00') "
+                f"TO ('{following.isoformat()} 00:00:00+00')"
+            )
+        execute("CREATE TABLE journal_entry_default PARTITION OF journal_entry DEFAULT")
+
+    execute(f"INSERT INTO journal_entry SELECT * FROM {old}")
+    execute(
+        "SELECT setval(pg_get_serial_sequence('journal_entry', 'id'), "
+        "COALESCE(max(id), 1), max(id) IS NOT NULL) FROM journal_entry"
+    )
+    execute(f"DROP TABLE {old}")
+
+    primary_key = "(id, date)" if partitioned else "(id)"
+    execute(f"ALTER TABLE journal_entry ADD CONSTRAINT journal_entry_pkey PRIMARY KEY {primary_key}")
+    for _, definition in indexes:
+        execute(definition)
+    for name, definition in foreign_keys:
+        execute(f"ALTER TABLE journal_entry ADD CONSTRAINT {name} {definition}")
+
+
+def partition_entry(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    _rebuild_entry_table(schema_editor, partitioned=True)
+
+
+def unpartition_entry(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    _rebuild_entry_table(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0007_entry_excerpt'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gratitudeitem',
+            name='entry',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='gratitude_items', to='journal.entry'),
+        ),
+        migrations.RunPython(partition_entry, unpartition_entry),
+    ]
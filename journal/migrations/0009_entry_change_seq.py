@@ -0,0 +1,73 @@
+# Generated by Django 4.2.26 on 2026-10-19 04:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_change_seq(apps, schema_editor):
+    """Number each user's existing entries 1..n and start sequences at n."""
+    Entry = apps.get_model("journal", "Entry")
+    ChangeSequence = apps.get_model("journal", "ChangeSequence")
+    values = {}
+    batch = []
+    for entry in Entry.objects.only("id", "user_id").order_by("user_id", "id").iterator():
+        values[entry.user_id] = entry.change_seq = values.get(entry.user_id, 0) + 1
+        batch.append(entry)
+        if len(batch) >= 500:
+            Entry.objects.bulk_update(batch, ["change_seq"])
+            batch = []
+    if batch:
+        Entry.objects.bulk_update(batch, ["change_seq"])
+    ChangeSequence.objects.bulk_create(
+        [ChangeSequence(user_id=user_id, value=n) for user_id, n in values.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('journal', '0008_partition_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='change_sequence', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('value', models.BigIntegerField(default=0)),
+                ('pruned_through', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EntryTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_id', models.BigIntegerField()),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='entry',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_change_seq, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['user', 'change_seq'], name='entry_user_change_seq_idx'),
+        ),
+        migrations.AddField(
+            model_name='entrytombstone',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entry_tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='entrytombstone',
+            index=models.Index(fields=['user', 'change_seq'], name='tombstone_user_change_seq_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.26 on 2026-10-19 04:39
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+import datetime
+
+
+def backfill_streaks(apps, schema_editor):
+    Entry = apps.get_model("journal", "Entry")
+    StreakRun = apps.get_model("journal", "StreakRun")
+    days = (
+        Entry.objects.annotate(day=TruncDate("date"))
+        .values_list("user_id", "day")
+        .distinct()
+        .order_by("user_id", "day")
+    )
+    one = datetime.timedelta(days=1)
+    rows = []
+    for user_id, day in days.iterator():
+        last = rows[-1] if rows else None
+        if last and last.user_id == user_id and last.end == day - one:
+            last.end = day
+            last.length += 1
+        else:
+            rows.append(StreakRun(user_id=user_id, start=day, end=day, length=1))
+    StreakRun.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('journal', '0009_entry_change_seq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StreakRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateField()),
+                ('end', models.DateField()),
+                ('length', models.PositiveIntegerField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='streak_runs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'end'], name='streakrun_user_end_idx'), models.Index(fields=['user', '-length'], name='streakrun_user_length_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_streaks, migrations.RunPython.noop),
+    ]
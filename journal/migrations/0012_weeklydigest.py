@@ -0,0 +1,36 @@
+# Generated by Django 4.2.26 on 2026-10-19 04:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('journal', '0011_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyDigest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField()),
+                ('entries', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.FloatField(blank=True, null=True)),
+                ('top_moods', models.JSONField(blank=True, default=list)),
+                ('top_gratitude', models.JSONField(blank=True, default=list)),
+                ('generated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_digests', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-week_start'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='weeklydigest',
+            constraint=models.UniqueConstraint(fields=('user', 'week_start'), name='weeklydigest_unique_user_week'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# Django's `icontains` compiles to `UPPER(col::text) LIKE UPPER(%s)` on
+# PostgreSQL, so the trigram indexes are built on the same expression.
+TRIGRAM_INDEXES = {
+    "journal_entry_title_trgm": ("journal_entry", "title"),
+    "journal_entry_content_trgm": ("journal_entry", "content"),
+    "journal_gratitudeitem_text_trgm": ("journal_gratitudeitem", "item_text"),
+}
+
+
+def trigram_available(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        return cursor.fetchone() is not None
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm is PostgreSQL-only (and a contrib module some builds omit);
+    # without it searches keep working, just without an index.
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql" or not trigram_available(connection):
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, (table, column) in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            f"USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0012_weeklydigest'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.26 on 2026-10-19 04:48
+
+import hashlib
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_text_hash(apps, schema_editor):
+    """Hash existing quotes, dropping any that duplicate an earlier one."""
+    Quote = apps.get_model("journal", "Quote")
+    seen = set()
+    batch = []
+    duplicates = []
+    for quote in Quote.objects.only("pk", "text").order_by("pk").iterator(chunk_size=500):
+        normalised = " ".join(quote.text.split()).casefold()
+        quote.text_hash = hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+        if quote.text_hash in seen:
+            duplicates.append(quote.pk)
+            continue
+        seen.add(quote.text_hash)
+        batch.append(quote)
+        if len(batch) >= 500:
+            Quote.objects.bulk_update(batch, ["text_hash"])
+            batch = []
+    if batch:
+        Quote.objects.bulk_update(batch, ["text_hash"])
+    Quote.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0013_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quote',
+            name='text_hash',
+            field=models.CharField(default='', editable=False, max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_text_hash, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='quote',
+            name='text_hash',
+            field=models.CharField(editable=False, max_length=64, unique=True),
+        ),
+        migrations.CreateModel(
+            name='QuoteMood',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mood', models.CharField(choices=[('happy', 'Happy'), ('anxious', 'Anxious'), ('sad', 'Sad'), ('neutral', 'Neutral'), ('excited', 'Excited'), ('frustrated', 'Frustrated'), ('calm', 'Calm'), ('stressed', 'Stressed')], max_length=50)),
+                ('quote', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='moods', to='journal.quote')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['mood'], name='quotemood_mood_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='quotemood',
+            constraint=models.UniqueConstraint(fields=('quote', 'mood'), name='quotemood_unique_quote_mood'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.26 on 2026-10-19 04:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0014_quote_text_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['user', '-date'], name='entry_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.26 on 2026-10-19 05:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0015_entry_user_date_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['user', 'mood', '-date'], name='entry_user_mood_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entry',
+            index=models.Index(fields=['user', 'mood_rating', '-date'], name='entry_user_rating_date_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# Searches match gratitude text through GratitudeItem (see journal.search),
+# and nothing queries Entry.gratitude by containment, so the jsonb_path_ops
+# index added in 0005 only slowed writes.
+GIN_INDEX = "journal_entry_gratitude_gin"
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+
+
+def create_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {GIN_INDEX} "
+        "ON journal_entry USING gin (gratitude jsonb_path_ops)"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0016_entry_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_gin_index, create_gin_index),
+    ]
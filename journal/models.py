@@ -4,18 +4,42 @@ This module defines the main persistent objects used by the app:
 - Entry: a user's journal entry containing mood and rating
 - GratitudeItem: short text items attached to an Entry
 - Quote: optional inspirational quote shown on the home page
+- QuoteMood: mood tags used to pick quotes that suit an entry
+- EntryCounter: per-user, per-mood entry and gratitude item counters
+- ChangeSequence / EntryTombstone: per-user change tokens for delta sync
+- StreakRun: runs of consecutive journaling days, for streaks
+- Job: background work queued for the `run_worker` command
+- WeeklyDigest: precomputed per-user weekly mood summaries
 
 database-level CHECK constraints validate at the DB layer. The constraints are:
 - Entry: `mood_rating` must be between 1 and 5; `mood` must be one of
     the defined `MOOD_CHOICES`; `title` and `content` must not be empty.
 - GratitudeItem: `item_text` must not be empty.
-- Quote: `text` must not be empty.
+- Quote: `text` must not be empty; `text_hash` is unique, so the same
+    quote (ignoring case and whitespace) is only stored once.
+
+`Entry.excerpt` and `Entry.word_count` are derived from `content` on every
+save so list pages can defer the full text.
+
+`Entry.change_seq` is stamped from the user's `ChangeSequence` whenever the
+entry or its gratitude items change; deletions leave an `EntryTombstone`.
+
+`Entry.gratitude` is a denormalised copy of the entry's GratitudeItem texts
+so list and detail pages can read them without a join. It is kept
+in sync by the receivers in `journal.signals`.
 """
 
-from django.db import models
-from django.db.models import Q
+import datetime
+import hashlib
+
+from django.db import models, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+from django.utils.text import Truncator
 
 
 MOOD_CHOICES = [
@@ -29,6 +53,19 @@ MOOD_CHOICES = [
     ("stressed", "Stressed"),
 ]
 
+# Number of words kept in Entry.excerpt (matches the old truncatewords:30).
+EXCERPT_WORDS = 30
+
+
+def make_excerpt(content):
+    """Return the list-card preview of `content`, as `truncatewords` would."""
+    return Truncator(content).words(EXCERPT_WORDS, truncate=" …")
+
+
+def count_words(content):
+    """Return the number of whitespace-separated words in `content`."""
+    return len(content.split())
+
 
 class Entry(models.Model):
     """A journal entry created by a user.
@@ -41,6 +78,12 @@ class Entry(models.Model):
         title (CharField): short title of the entry
         content (TextField): full text of the entry
         created_at (DateTimeField): DB timestamp when the row was created
+        gratitude (JSONField): denormalised list of gratitude item texts,
+            maintained from GratitudeItem writes (see `journal.signals`)
+        excerpt (TextField): first `EXCERPT_WORDS` words of `content`
+        word_count (PositiveIntegerField): number of words in `content`
+        change_seq (BigIntegerField): user's change sequence value at the
+            last write, used by the delta sync API
 
     Database constraints (enforced at the DB level):
         - `mood_rating` must be between 1 and 5
@@ -62,9 +105,29 @@ class Entry(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    gratitude = models.JSONField(default=list, blank=True, editable=False)
+    excerpt = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    change_seq = models.BigIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["-date"]
+        indexes = [
+            models.Index(
+                fields=["user", "change_seq"],
+                name="entry_user_change_seq_idx",
+            ),
+            models.Index(fields=["user", "-date"], name="entry_user_date_idx"),
+            # Search filters (journal.search): equality on mood or a range
+            # on mood_rating, still read newest first.
+            models.Index(
+                fields=["user", "mood", "-date"], name="entry_user_mood_date_idx"
+            ),
+            models.Index(
+                fields=["user", "mood_rating", "-date"],
+                name="entry_user_rating_date_idx",
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=Q(mood_rating__gte=1) & Q(mood_rating__lte=5),
@@ -87,6 +150,65 @@ class Entry(models.Model):
     def __str__(self):
         return f"{self.user} - {self.title} ({self.date.date()})"
 
+    def save(self, *args, **kwargs):
+        """Refresh derived fields and stamp a new `change_seq`.
+
+        `excerpt` and `word_count` are recomputed whenever `content` is
+        written. The sequence value is reserved in the same transaction as
+        the row write, so a failed write does not consume it.
+        """
+        update_fields = kwargs.get("update_fields")
+        extra = {"change_seq"}
+        if "content" not in self.get_deferred_fields() and (
+            update_fields is None or "content" in update_fields
+        ):
+            self.refresh_excerpt()
+            extra |= {"excerpt", "word_count"}
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *extra}
+        with transaction.atomic():
+            self.change_seq = ChangeSequence.reserve(self.user_id)
+            super().save(*args, **kwargs)
+
+    def refresh_excerpt(self):
+        """Recompute `excerpt` and `word_count` from `content` (no save)."""
+        self.excerpt = make_excerpt(self.content)
+        self.word_count = count_words(self.content)
+
+    def replace_gratitude(self, texts):
+        """Replace this entry's gratitude items with `texts`.
+
+        New items are written with a single `bulk_create`, which skips the
+        per-item receivers, so the denormalised list and counters are
+        updated here once instead.
+        """
+        with transaction.atomic():
+            self.gratitude_items.all().delete()
+            GratitudeItem.objects.bulk_create(
+                [GratitudeItem(entry=self, item_text=text) for text in texts]
+            )
+            self.sync_gratitude()
+            EntryCounter.adjust(
+                self.user_id, self.mood, gratitude_items=len(texts)
+            )
+
+    def sync_gratitude(self):
+        """Rebuild the denormalised `gratitude` list from GratitudeItem rows.
+
+        Uses a queryset update so the rest of the row is left untouched,
+        and stamps a new `change_seq` so sync clients see the change.
+        """
+        with transaction.atomic():
+            self.gratitude = list(
+                GratitudeItem.objects.filter(entry_id=self.pk)
+                .order_by("pk")
+                .values_list("item_text", flat=True)
+            )
+            self.change_seq = ChangeSequence.reserve(self.user_id)
+            Entry.objects.filter(pk=self.pk).update(
+                gratitude=self.gratitude, change_seq=self.change_seq
+            )
+
 
 class GratitudeItem(models.Model):
     """A short gratitude item associated with an Entry.
@@ -97,8 +219,13 @@ class GratitudeItem(models.Model):
         - `item_text` must not be an empty string
     """
 
+    # No DB-level constraint: journal_entry is partitioned on PostgreSQL and
+    # its `id` is only unique together with `date` (see migration 0008).
     entry = models.ForeignKey(
-        Entry, on_delete=models.CASCADE, related_name="gratitude_items"
+        Entry,
+        on_delete=models.CASCADE,
+        related_name="gratitude_items",
+        db_constraint=False,
     )
     item_text = models.CharField(max_length=255)
 
@@ -114,17 +241,34 @@ class GratitudeItem(models.Model):
         return self.item_text
 
 
+def quote_text_hash(text):
+    """Return the dedupe key for a quote: SHA-256 of its normalised text.
+
+    Case and runs of whitespace are ignored, so trivially different copies
+    of the same quote hash alike.
+    """
+    normalised = " ".join(text.split()).casefold()
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+
 class Quote(models.Model):
     """A short inspirational quote displayed on the home page.
 
-    The author field is optional and may be blank.
+    The author field is optional and may be blank. `text_hash` is set from
+    `text` on save; its unique index lets bulk loads skip duplicates with
+    `bulk_create(ignore_conflicts=True)` (see the `load_quotes` command),
+    which does not call `save()` and so must set it explicitly. The field
+    is not editable, so forms skip its unique check; `clean()` reports a
+    duplicate on `text` instead.
 
     Database constraints:
         - `text` must not be an empty string
+        - `text_hash` is unique
     """
 
     text = models.TextField()
     author = models.CharField(max_length=200, blank=True)
+    text_hash = models.CharField(max_length=64, unique=True, editable=False)
 
     class Meta:
         constraints = [
@@ -138,3 +282,602 @@ class Quote(models.Model):
         preview = self.text[:50]
         ellipsis = "..." if len(self.text) > 50 else ""
         return f"{preview}{ellipsis} - {self.author}"
+
+    def clean(self):
+        super().clean()
+        self.text_hash = quote_text_hash(self.text)
+        duplicates = Quote.objects.filter(text_hash=self.text_hash)
+        if self.pk is not None:
+            duplicates = duplicates.exclude(pk=self.pk)
+        if duplicates.exists():
+            raise ValidationError({"text": "This quote already exists."})
+
+    def save(self, *args, **kwargs):
+        self.text_hash = quote_text_hash(self.text)
+        super().save(*args, **kwargs)
+
+
+class QuoteMood(models.Model):
+    """Tags a quote as suitable for entries with the given mood.
+
+    A quote may carry several moods; untagged quotes suit any mood.
+    """
+
+    quote = models.ForeignKey(Quote, on_delete=models.CASCADE, related_name="moods")
+    mood = models.CharField(max_length=50, choices=MOOD_CHOICES)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["quote", "mood"], name="quotemood_unique_quote_mood"
+            ),
+        ]
+        indexes = [models.Index(fields=["mood"], name="quotemood_mood_idx")]
+
+    def __str__(self):
+        return f"{self.quote_id}: {self.mood}"
+
+
+class EntryCounter(models.Model):
+    """Running entry and gratitude item totals for one user and mood.
+
+    One row exists per `(user, mood)` pair that has ever held an entry, so
+    a user's totals are the sum of at most `len(MOOD_CHOICES)` rows. Rows
+    are adjusted by the receivers in `journal.signals` and can be rebuilt
+    from scratch with the `recount_entries` management command.
+
+    Fields:
+        user (ForeignKey): owner of the counted entries
+        mood (CharField): one of `MOOD_CHOICES`
+        entries (IntegerField): number of entries with this mood
+        gratitude_items (IntegerField): gratitude items on those entries
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="entry_counters",
+    )
+    mood = models.CharField(max_length=50, choices=MOOD_CHOICES)
+    entries = models.IntegerField(default=0)
+    gratitude_items = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "mood"],
+                name="entrycounter_unique_user_mood",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.mood}: {self.entries}"
+
+    @classmethod
+    def adjust(cls, user_id, mood, entries=0, gratitude_items=0):
+        """Atomically add the given deltas to a user's counter for `mood`.
+
+        The row is created on first increment. Decrements never create a
+        row, so cascades from a deleted user cannot resurrect counters.
+        """
+        if not entries and not gratitude_items:
+            return
+        updated = cls.objects.filter(user_id=user_id, mood=mood).update(
+            entries=F("entries") + entries,
+            gratitude_items=F("gratitude_items") + gratitude_items,
+        )
+        if updated or (entries <= 0 and gratitude_items <= 0):
+            return
+        counter, created = cls.objects.get_or_create(
+            user_id=user_id,
+            mood=mood,
+            defaults={"entries": entries, "gratitude_items": gratitude_items},
+        )
+        if not created:
+            # Lost a race with a concurrent insert; apply the delta again.
+            cls.objects.filter(pk=counter.pk).update(
+                entries=F("entries") + entries,
+                gratitude_items=F("gratitude_items") + gratitude_items,
+            )
+
+    @classmethod
+    def totals_for(cls, user):
+        """Return `{"entries": int, "gratitude_items": int, "moods": dict}`.
+
+        `moods` maps each mood value to its entry count. Reads only the
+        user's counter rows, so the cost does not grow with entry count.
+        """
+        rows = list(
+            cls.objects.filter(user=user).values_list(
+                "mood", "entries", "gratitude_items"
+            )
+        )
+        return {
+            "entries": sum(row[1] for row in rows),
+            "gratitude_items": sum(row[2] for row in rows),
+            "moods": {mood: count for mood, count, _ in rows if count},
+        }
+
+    @classmethod
+    def rebuild(cls, users=None):
+        """Recompute counters from Entry and GratitudeItem rows.
+
+        Args:
+            users: optional iterable of user ids to limit the rebuild to.
+                All users are rebuilt when omitted.
+
+        Returns the number of counter rows written.
+        """
+        entries = Entry.objects.all()
+        items = GratitudeItem.objects.all()
+        counters = cls.objects.all()
+        if users is not None:
+            users = list(users)
+            entries = entries.filter(user_id__in=users)
+            items = items.filter(entry__user_id__in=users)
+            counters = counters.filter(user_id__in=users)
+        totals = {}
+        for row in entries.values("user_id", "mood").annotate(
+            n=Count("id")
+        ).order_by():
+            key = (row["user_id"], row["mood"])
+            totals[key] = [row["n"], 0]
+        for row in items.values("entry__user_id", "entry__mood").annotate(
+            n=Count("id")
+        ).order_by():
+            key = (row["entry__user_id"], row["entry__mood"])
+            totals.setdefault(key, [0, 0])[1] = row["n"]
+        rows = [
+            cls(user_id=user_id, mood=mood, entries=n, gratitude_items=g)
+            for (user_id, mood), (n, g) in totals.items()
+        ]
+        with transaction.atomic():
+            counters.delete()
+            cls.objects.bulk_create(rows, batch_size=500)
+        return len(rows)
+
+
+class ChangeSequence(models.Model):
+    """Per-user, monotonically increasing change counter for delta sync.
+
+    Every entry write takes the next value and stores it on the entry (or
+    on a tombstone for deletes). Reserving a value updates this row, which
+    holds a row lock until the surrounding transaction ends, so one user's
+    writes commit in sequence order and a client polling with
+    `change_seq > token` never skips a row.
+
+    Fields:
+        user (OneToOneField): owner of the sequence
+        value (BigIntegerField): last value handed out
+        pruned_through (BigIntegerField): clients whose token is below this
+            value may have missed tombstones and must resync from scratch
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="change_sequence",
+    )
+    value = models.BigIntegerField(default=0)
+    pruned_through = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user}: {self.value}"
+
+    @classmethod
+    def reserve(cls, user_id, count=1):
+        """Reserve `count` consecutive values and return the last one.
+
+        The reserved block is `last - count + 1 .. last`.
+        """
+        queryset = cls.objects.filter(user_id=user_id)
+        if not queryset.update(value=F("value") + count):
+            _, created = cls.objects.get_or_create(
+                user_id=user_id, defaults={"value": count}
+            )
+            if not created:
+                queryset.update(value=F("value") + count)
+        return queryset.values_list("value", flat=True).get()
+
+    @classmethod
+    def current(cls, user):
+        """Return `(value, pruned_through)` for `user` (zeros if unused)."""
+        row = cls.objects.filter(user=user).values_list(
+            "value", "pruned_through"
+        ).first()
+        return row or (0, 0)
+
+    @classmethod
+    def force_resync(cls, user_ids):
+        """Make every existing token for these users require a full resync."""
+        cls.objects.filter(user_id__in=user_ids).update(
+            value=F("value") + 1, pruned_through=F("value") + 1
+        )
+
+
+class EntryTombstone(models.Model):
+    """Record of a deleted entry, kept so sync clients can drop it.
+
+    Fields:
+        user (ForeignKey): owner of the deleted entry
+        entry_id (BigIntegerField): primary key the entry had
+        change_seq (BigIntegerField): sequence value of the deletion
+        deleted_at (DateTimeField): when the entry was deleted
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="entry_tombstones",
+    )
+    entry_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "change_seq"],
+                name="tombstone_user_change_seq_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - entry {self.entry_id} ({self.change_seq})"
+
+    @classmethod
+    def prune(cls, before):
+        """Delete tombstones older than `before`; return the number removed.
+
+        Affected users' `ChangeSequence.pruned_through` is raised to the
+        newest pruned value so stale clients are told to resync.
+        """
+        old = cls.objects.filter(deleted_at__lt=before)
+        newest = old.values("user_id").annotate(seq=models.Max("change_seq"))
+        with transaction.atomic():
+            for row in newest.order_by():
+                ChangeSequence.objects.filter(
+                    user_id=row["user_id"], pruned_through__lt=row["seq"]
+                ).update(pruned_through=row["seq"])
+            deleted, _ = old.delete()
+        return deleted
+
+
+def day_bounds(day):
+    """Return the aware `[start, end)` datetimes of local calendar `day`."""
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    return start, start + datetime.timedelta(days=1)
+
+
+class StreakRun(models.Model):
+    """A run of consecutive days on which a user wrote at least one entry.
+
+    Runs are maintained incrementally by `journal.signals` as entries are
+    created, moved to another day or deleted: a new day extends or merges
+    neighbouring runs, and a day losing its last entry shortens or splits
+    its run. Days are local calendar dates of `Entry.date`, so back-dated
+    entries are handled like any other. Updates lock the user's row (see
+    `lock_user`), so concurrent writes for one user cannot leave
+    overlapping or unmerged runs. `rebuild()` recomputes runs from scratch
+    for repair (see the `recompute_streaks` command).
+
+    Fields:
+        user (ForeignKey): owner of the run
+        start (DateField): first day of the run
+        end (DateField): last day of the run
+        length (PositiveIntegerField): number of days in the run
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="streak_runs",
+    )
+    start = models.DateField()
+    end = models.DateField()
+    length = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "end"], name="streakrun_user_end_idx"),
+            models.Index(
+                fields=["user", "-length"], name="streakrun_user_length_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user}: {self.start} - {self.end} ({self.length} days)"
+
+    @staticmethod
+    def day_of(value):
+        """Return the local calendar day of an entry `date` value."""
+        return timezone.localdate(value)
+
+    @classmethod
+    def lock_user(cls, user_id):
+        """Lock `user_id`'s row until the surrounding transaction ends.
+
+        Locking the neighbouring runs is not enough on its own: when a day
+        has none, two concurrent `add_day` calls for adjacent days would
+        each create a run. Taking the user's row first queues them.
+        """
+        users = cls._meta.get_field("user").related_model.objects
+        list(users.select_for_update().filter(pk=user_id).values_list("pk"))
+
+    @classmethod
+    def add_day(cls, user_id, day):
+        """Record that `user_id` has at least one entry on `day`."""
+        one = datetime.timedelta(days=1)
+        with transaction.atomic():
+            cls.lock_user(user_id)
+            runs = list(
+                cls.objects.select_for_update().filter(
+                    user_id=user_id, start__lte=day + one, end__gte=day - one
+                )
+            )
+            if any(run.start <= day <= run.end for run in runs):
+                return
+            before = next((r for r in runs if r.end == day - one), None)
+            after = next((r for r in runs if r.start == day + one), None)
+            if before and after:
+                before.end = after.end
+                before.length += after.length + 1
+                after.delete()
+                before.save(update_fields=["end", "length"])
+            elif before:
+                before.end = day
+                before.length += 1
+                before.save(update_fields=["end", "length"])
+            elif after:
+                after.start = day
+                after.length += 1
+                after.save(update_fields=["start", "length"])
+            else:
+                cls.objects.create(user_id=user_id, start=day, end=day, length=1)
+
+    @classmethod
+    def remove_day(cls, user_id, day):
+        """Record that `user_id` no longer has any entry on `day`."""
+        one = datetime.timedelta(days=1)
+        with transaction.atomic():
+            cls.lock_user(user_id)
+            run = (
+                cls.objects.select_for_update()
+                .filter(user_id=user_id, start__lte=day, end__gte=day)
+                .first()
+            )
+            if run is None:
+                return
+            if run.length == 1:
+                run.delete()
+            elif day == run.start:
+                run.start = day + one
+                run.length -= 1
+                run.save(update_fields=["start", "length"])
+            elif day == run.end:
+                run.end = day - one
+                run.length -= 1
+                run.save(update_fields=["end", "length"])
+            else:
+                cls.objects.create(
+                    user_id=user_id,
+                    start=day + one,
+                    end=run.end,
+                    length=(run.end - day).days,
+                )
+                run.end = day - one
+                run.length = (run.end - run.start).days + 1
+                run.save(update_fields=["end", "length"])
+
+    @classmethod
+    def refresh_day(cls, user_id, day):
+        """Add or remove `day` depending on whether entries remain on it."""
+        start, end = day_bounds(day)
+        if Entry.objects.filter(
+            user_id=user_id, date__gte=start, date__lt=end
+        ).exists():
+            cls.add_day(user_id, day)
+        else:
+            cls.remove_day(user_id, day)
+
+    @classmethod
+    def update_days(cls, user_id, added, vacated):
+        """Apply many day changes at once (used by bulk writers).
+
+        `added` days gained an entry; `vacated` days lost one and are
+        removed unless another entry remains on them, checked with a
+        single query.
+        """
+        for day in sorted(added):
+            cls.add_day(user_id, day)
+        vacated = set(vacated) - set(added)
+        if not vacated:
+            return
+        start, _ = day_bounds(min(vacated))
+        _, end = day_bounds(max(vacated))
+        remaining = set(
+            Entry.objects.filter(user_id=user_id, date__gte=start, date__lt=end)
+            .annotate(day=TruncDate("date"))
+            .filter(day__in=vacated)
+            .values_list("day", flat=True)
+            .distinct()
+        )
+        for day in sorted(vacated - remaining):
+            cls.remove_day(user_id, day)
+
+    @classmethod
+    def summary(cls, user, today=None):
+        """Return `{"current": days, "longest": days}` for `user`.
+
+        The current streak is the run ending today or yesterday, so it is
+        not broken until a whole day passes without an entry.
+        """
+        today = today or timezone.localdate()
+        runs = cls.objects.filter(user=user)
+        current = (
+            runs.filter(end__gte=today - datetime.timedelta(days=1))
+            .order_by("-end")
+            .values_list("length", flat=True)
+            .first()
+        )
+        longest = runs.order_by("-length").values_list("length", flat=True).first()
+        return {"current": current or 0, "longest": longest or 0}
+
+    @classmethod
+    def rebuild(cls, users=None):
+        """Recompute runs from entry dates.
+
+        Args:
+            users: optional iterable of user ids to limit the rebuild to.
+                All users are rebuilt when omitted.
+
+        Returns the number of runs written.
+        """
+        entries = Entry.objects.all()
+        runs_qs = cls.objects.all()
+        if users is not None:
+            users = list(users)
+            entries = entries.filter(user_id__in=users)
+            runs_qs = runs_qs.filter(user_id__in=users)
+        days = (
+            entries.annotate(day=TruncDate("date"))
+            .values_list("user_id", "day")
+            .distinct()
+            .order_by("user_id", "day")
+        )
+        one = datetime.timedelta(days=1)
+        rows = []
+        for user_id, day in days.iterator():
+            last = rows[-1] if rows else None
+            if last and last.user_id == user_id and last.end == day - one:
+                last.end = day
+                last.length += 1
+            else:
+                rows.append(cls(user_id=user_id, start=day, end=day, length=1))
+        with transaction.atomic():
+            runs_qs.delete()
+            cls.objects.bulk_create(rows, batch_size=500)
+        return len(rows)
+
+
+class Job(models.Model):
+    """A unit of background work run by the `run_worker` command.
+
+    Jobs are claimed with `SELECT ... FOR UPDATE SKIP LOCKED` so several
+    workers can poll the table without blocking each other; see
+    `journal.jobs` for enqueueing, claiming and retry handling.
+
+    Fields:
+        name (CharField): registered task name (see `journal.tasks`)
+        payload (JSONField): keyword arguments for the task
+        user (ForeignKey): optional owner who may view the job's status
+        status (CharField): one of `STATUS_CHOICES`
+        attempts (PositiveIntegerField): number of times the job was started
+        max_attempts (PositiveIntegerField): attempts before giving up
+        run_at (DateTimeField): earliest time the job may (re)start
+        result (JSONField): JSON-serialisable return value of the task
+        last_error (TextField): traceback of the most recent failure
+        worker (CharField): identifier of the worker running the job
+        created_at / started_at / finished_at (DateTimeField): timings
+        heartbeat_at (DateTimeField): last sign of life from the worker
+            running the job (see `journal.jobs.heartbeat`)
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="jobs",
+    )
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["run_at", "id"],
+                name="job_queued_run_at_idx",
+                condition=Q(status="queued"),
+            ),
+            models.Index(fields=["user", "-created_at"], name="job_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+
+class WeeklyDigest(models.Model):
+    """Precomputed summary of one user's entries for one week.
+
+    Written by the `generate_digests` command (see `journal.digests`) so
+    pages can show it without aggregating entries on every request.
+
+    Fields:
+        user (ForeignKey): owner of the digest
+        week_start (DateField): Monday of the summarised week
+        entries (PositiveIntegerField): entries written that week
+        average_rating (FloatField): mean `mood_rating` of those entries
+        top_moods (JSONField): `[[mood, count], ...]`, most frequent first
+        top_gratitude (JSONField): `[[text, count], ...]`, most frequent
+            gratitude items (case-insensitive) first
+        generated_at (DateTimeField): when the digest was last written
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="weekly_digests",
+    )
+    week_start = models.DateField()
+    entries = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(null=True, blank=True)
+    top_moods = models.JSONField(default=list, blank=True)
+    top_gratitude = models.JSONField(default=list, blank=True)
+    generated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-week_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "week_start"],
+                name="weeklydigest_unique_user_week",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - week of {self.week_start}"
+
+    @property
+    def week_end(self):
+        return self.week_start + datetime.timedelta(days=6)
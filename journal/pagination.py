@@ -0,0 +1,49 @@
+"""Paginators that avoid an unbounded COUNT(*) on every list page.
+
+- KnownCountPaginator: the caller supplies the total (e.g. from the
+  per-user `EntryCounter` rows) so no count query is issued at all.
+- EstimatedCountPaginator: counts at most `count_limit` rows, which keeps
+  search pages cheap; totals beyond the limit are reported as estimates.
+"""
+
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+class KnownCountPaginator(Paginator):
+    """Paginator whose total row count is provided up front."""
+
+    count_is_estimate = False
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @cached_property
+    def count(self):
+        return self._known_count
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that stops counting after `count_limit` rows.
+
+    When more rows match than the limit, `count` is capped at the limit and
+    `count_is_estimate` is True so templates can render e.g. "50+".
+    """
+
+    def __init__(self, object_list, per_page, count_limit, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_limit = count_limit
+        self._raw_count = 0
+
+    @cached_property
+    def count(self):
+        # Counting one row past the limit tells us whether it was reached.
+        self._raw_count = self.object_list[: self.count_limit + 1].count()
+        return min(self._raw_count, self.count_limit)
+
+    @property
+    def count_is_estimate(self):
+        return self.count >= self.count_limit and (
+            self._raw_count > self.count_limit
+        )
@@ -0,0 +1,193 @@
+"""PostgreSQL range partitioning helpers for the `journal_entry` table.
+
+Migration 0008 turns `journal_entry` into a table partitioned by month on
+`date`, with a default partition catching anything outside the monthly
+ranges. The functions here are used by the `manage_partitions` command to
+add future months ahead of time, to backfill past months whose rows sit in
+the default partition, and to detach (and optionally archive) months that
+are no longer needed online.
+
+Partitions are named `journal_entry_pYYYY_MM` and cover
+`[first day of month, first day of next month)` in UTC. All helpers are
+no-ops outside PostgreSQL; callers should check `is_supported()` first.
+"""
+
+import datetime
+import re
+
+from django.db import connection, transaction
+
+PARENT_TABLE = "journal_entry"
+DEFAULT_PARTITION = "journal_entry_default"
+GRATITUDE_TABLE = "journal_gratitudeitem"
+PARTITION_RE = re.compile(r"^journal_entry_p(\d{4})_(\d{2})$")
+
+
+def is_supported():
+    """Return True when the default database is PostgreSQL."""
+    return connection.vendor == "postgresql"
+
+
+def is_partitioned():
+    """Return True when `journal_entry` is a partitioned table."""
+    if not is_supported():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relkind FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = %s AND n.nspname = current_schema()",
+            [PARENT_TABLE],
+        )
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def month_start(value):
+    """Return the first day of the month containing `value` as a date."""
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(start, months):
+    """Return the first day of the month `months` after `start`."""
+    index = start.year * 12 + (start.month - 1) + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(start):
+    """Return the partition table name for the month starting at `start`."""
+    return f"{PARENT_TABLE}_p{start.year:04d}_{start.month:02d}"
+
+
+def list_partitions():
+    """Return `[(name, start, estimated_rows)]` for attached monthly partitions.
+
+    `start` is None for the default partition. Row counts come from
+    `pg_class.reltuples`, so they are planner estimates, not exact counts.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, c.reltuples::bigint FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass ORDER BY c.relname",
+            [PARENT_TABLE],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, estimate in rows:
+        match = PARTITION_RE.match(name)
+        start = None
+        if match:
+            start = datetime.date(int(match[1]), int(match[2]), 1)
+        partitions.append((name, start, max(estimate, 0)))
+    return partitions
+
+
+def create_partition(start):
+    """Create and attach the monthly partition starting at `start`.
+
+    Rows already sitting in the default partition for that month are moved
+    into the new table before it is attached, so this is safe to run after
+    back-dated entries have landed in the default partition.
+
+    Returns True if a partition was created, False if it already existed.
+    """
+    name = partition_name(start)
+    end = add_months(start, 1)
+    existing = {row[0] for row in list_partitions()}
+    if name in existing:
+        return False
+    lower = f"{start.isoformat()} 00:00:00+00"
+    upper = f"{end.isoformat()} 00:00:00+00"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {name} (LIKE {PARENT_TABLE} "
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        if DEFAULT_PARTITION in existing:
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                "WHERE date >= %s AND date < %s RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved",
+                [lower, upper],
+            )
+        cursor.execute(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        )
+    return True
+
+
+def ensure_partitions(months_ahead, today=None):
+    """Create monthly partitions from this month to `months_ahead` ahead.
+
+    Returns the names of the partitions that were created.
+    """
+    start = month_start(today or datetime.date.today())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(start, offset)
+        if create_partition(month):
+            created.append(partition_name(month))
+    return created
+
+
+def backfill_partitions(first, today=None):
+    """Create monthly partitions from `first` up to the current month.
+
+    Each new partition takes its month's rows out of the default partition
+    (see `create_partition`), so entries older than the window migration
+    0008 partitioned can later be detached like any other month.
+
+    Returns the names of the partitions that were created.
+    """
+    month = month_start(first)
+    end = month_start(today or datetime.date.today())
+    created = []
+    while month < end:
+        if create_partition(month):
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def detach_partitions(before, archive_schema=None):
+    """Detach monthly partitions that end on or before `before`.
+
+    Detached tables keep their rows but are no longer visible through the
+    `Entry` model. Their entries' gratitude items are moved out of the live
+    `journal_gratitudeitem` table into `<partition>_gratitudeitem` next to
+    the detached table: `GratitudeItem.entry` has no database constraint,
+    so nothing else would remove them. With `archive_schema`, both tables
+    are moved into that schema.
+
+    Returns `(detached_names, affected_user_ids)`.
+    """
+    cutoff = month_start(before)
+    targets = [
+        name
+        for name, start, _ in list_partitions()
+        if start is not None and add_months(start, 1) <= cutoff
+    ]
+    user_ids = set()
+    with transaction.atomic(), connection.cursor() as cursor:
+        if archive_schema:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}")
+        for name in targets:
+            cursor.execute(f"SELECT DISTINCT user_id FROM {name}")
+            user_ids.update(row[0] for row in cursor.fetchall())
+            cursor.execute(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}")
+            items = f"{name}_gratitudeitem"
+            cursor.execute(
+                f"CREATE TABLE {items} AS "
+                f"SELECT g.* FROM {GRATITUDE_TABLE} g "
+                f"JOIN {name} e ON e.id = g.entry_id"
+            )
+            cursor.execute(
+                f"DELETE FROM {GRATITUDE_TABLE} g USING {name} e "
+                "WHERE e.id = g.entry_id"
+            )
+            if archive_schema:
+                cursor.execute(f"ALTER TABLE {name} SET SCHEMA {archive_schema}")
+                cursor.execute(f"ALTER TABLE {items} SET SCHEMA {archive_schema}")
+    return targets, sorted(user_ids)
@@ -0,0 +1,39 @@
+"""Helpers for running Django code in `ProcessPoolExecutor` workers.
+
+Workers are spawned rather than forked so they never share the parent's
+database sockets, and each opens its own connection on first use. This
+module deliberately imports no models: the pool imports it in the child
+before Django is set up.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.db import connections
+
+
+def init_worker(database_names):
+    """Set up Django in a fresh worker process.
+
+    `database_names` carries over the database names actually in use by
+    the parent (e.g. a test database).
+    """
+    django.setup()
+    for alias, name in database_names.items():
+        settings.DATABASES[alias]["NAME"] = name
+        connections[alias].settings_dict["NAME"] = name
+
+
+def process_pool(max_workers):
+    """Return a ProcessPoolExecutor whose workers can use the ORM."""
+    database_names = {
+        alias: connections[alias].settings_dict["NAME"] for alias in connections
+    }
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(database_names,),
+    )
@@ -0,0 +1,97 @@
+"""On-disk store for request profiles written by `ProfilingMiddleware`.
+
+Profiles are `cProfile` dumps (open them with `pstats` or snakeviz) saved
+in `settings.PROFILE_DIR`. The file name records everything the browser
+needs, so listing profiles never opens them:
+
+    <milliseconds>ms-<url name>-<timestamp>-<pid>.prof
+
+Only the newest `settings.PROFILE_KEEP` files are kept; older ones are
+removed as new profiles are written.
+"""
+
+import datetime
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+PROFILE_NAME = re.compile(
+    r"^(?P<ms>\d+)ms-(?P<url_name>[\w.]+)-(?P<stamp>\d{8}T\d{12})-(?P<pid>\d+)\.prof$"
+)
+
+
+def profile_dir():
+    return Path(settings.PROFILE_DIR)
+
+
+def profile_name(url_name, duration):
+    """Return the file name for a profile of `duration` seconds."""
+    url_name = (url_name or "unresolved").replace(":", ".")
+    url_name = re.sub(r"[^\w.]", "_", url_name)
+    stamp = timezone.now().strftime("%Y%m%dT%H%M%S%f")
+    return f"{round(duration * 1000)}ms-{url_name}-{stamp}-{os.getpid()}.prof"
+
+
+def parse_name(name):
+    """Return the details encoded in a profile file name, or None."""
+    match = PROFILE_NAME.match(name)
+    if match is None:
+        return None
+    return {
+        "name": name,
+        "milliseconds": int(match["ms"]),
+        "url_name": match["url_name"],
+        "recorded_at": datetime.datetime.strptime(
+            match["stamp"], "%Y%m%dT%H%M%S%f"
+        ).replace(tzinfo=datetime.timezone.utc),
+        "pid": int(match["pid"]),
+    }
+
+
+def list_profiles():
+    """Return details of every stored profile, in no particular order."""
+    try:
+        names = os.listdir(profile_dir())
+    except FileNotFoundError:
+        return []
+    return [info for info in map(parse_name, names) if info is not None]
+
+
+def slowest_profiles(limit):
+    """Return the `limit` slowest stored profiles, slowest first."""
+    profiles = list_profiles()
+    profiles.sort(key=lambda info: info["milliseconds"], reverse=True)
+    return profiles[:limit]
+
+
+def profile_path(name):
+    """Return the path of the stored profile `name`, or None if invalid."""
+    if PROFILE_NAME.match(name) is None:
+        return None
+    path = profile_dir() / name
+    return path if path.is_file() else None
+
+
+def save_profile(profiler, url_name, duration):
+    """Dump `profiler` to the profile directory and rotate old files."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(directory / profile_name(url_name, duration))
+    rotate(settings.PROFILE_KEEP)
+
+
+def rotate(keep):
+    """Delete all but the `keep` most recently recorded profiles."""
+    profiles = list_profiles()
+    if len(profiles) <= keep:
+        return
+    profiles.sort(key=lambda info: info["recorded_at"])
+    for info in profiles[: len(profiles) - keep]:
+        try:
+            (profile_dir() / info["name"]).unlink()
+        except FileNotFoundError:
+            # Removed by another process's rotation.
+            pass
@@ -0,0 +1,142 @@
+"""Mood-aware quote selection for the home page.
+
+Each process keeps the ids of all quotes in memory, grouped into one pool
+per mood: the quotes tagged with that mood (`QuoteMood`) plus the untagged
+quotes, which suit any mood. Pools are loaded with two queries and then
+reused until a quote or tag changes or `POOL_TTL` passes.
+
+Changes are signalled by replacing a random version token in the cache
+(`invalidate_pools()`, called by the receivers in `journal.signals` and by
+`load_quotes`). With a shared cache every process reloads on its next
+request; with the default per-process cache other processes pick the
+change up when their pools expire.
+
+`quote_of_the_day()` picks a quote from the pool for the user's most
+recent mood, deterministically for the user and day, and caches it until
+the end of the day. A cache miss costs one indexed query for the mood and
+one primary key lookup for the quote; a hit costs none. The cached pick
+outlives pool changes: after one it is fetched again by primary key, and
+a new quote is picked only if it was deleted.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from . import metrics
+from .models import Entry, Quote, QuoteMood
+
+# Seconds before a process reloads its pools even without a version change.
+POOL_TTL = 60 * 10
+CACHE_TIMEOUT = 60 * 60 * 24
+
+VERSION_KEY = "journal:quote-pools:version"
+
+_lock = threading.Lock()
+_pools = {"version": None, "loaded_at": 0.0, "all": (), "by_mood": {}}
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def pool_version():
+    """Return the current pool version token from the cache.
+
+    A token (rather than a counter) means a cleared or evicted cache also
+    invalidates the pools.
+    """
+    return cache.get_or_set(VERSION_KEY, new_version, None)
+
+
+def invalidate_pools():
+    """Mark every process's pools as stale after quotes or tags change."""
+    cache.set(VERSION_KEY, new_version(), None)
+    _pools["version"] = None
+
+
+def load_pools():
+    """Return `(all_ids, {mood: ids})` read from the database."""
+    all_ids = tuple(Quote.objects.order_by("pk").values_list("pk", flat=True))
+    tagged = {}
+    for mood, quote_id in QuoteMood.objects.values_list("mood", "quote_id"):
+        tagged.setdefault(mood, set()).add(quote_id)
+    untagged = set(all_ids).difference(*tagged.values())
+    by_mood = {
+        mood: tuple(sorted(ids | untagged)) for mood, ids in tagged.items()
+    }
+    return all_ids, by_mood
+
+
+def get_pool(mood=None):
+    """Return the sorted quote ids suitable for `mood` (any mood if None).
+
+    A mood with no tagged quotes gets every quote.
+    """
+    version = pool_version()
+    with _lock:
+        stale = time.monotonic() - _pools["loaded_at"] > POOL_TTL
+        if _pools["version"] != version or stale:
+            _pools["all"], _pools["by_mood"] = load_pools()
+            _pools["version"] = version
+            _pools["loaded_at"] = time.monotonic()
+        return _pools["by_mood"].get(mood, _pools["all"])
+
+
+def pick(pool, *seed):
+    """Pick an id from `pool`, the same one for the same seed values."""
+    digest = hashlib.sha256(":".join(map(str, seed)).encode()).digest()
+    return pool[int.from_bytes(digest[:8], "big") % len(pool)]
+
+
+def latest_mood(user):
+    """Return the mood of the user's most recent entry, or None."""
+    return (
+        Entry.objects.filter(user=user)
+        .order_by("-date")
+        .values_list("mood", flat=True)
+        .first()
+    )
+
+
+def quote_of_the_day(user=None, day=None):
+    """Return today's Quote for `user` (or for anonymous visitors), or None.
+
+    The quote is drawn from the pool for the user's latest mood and stays
+    the same for the rest of the day, even if they write another entry.
+    """
+    day = day or timezone.localdate()
+    user_id = user.pk if user is not None else "anonymous"
+    # No pool version in the key: adding or removing other quotes must not
+    # change a pick the user has already seen today.
+    key = f"journal:quote-of-the-day:{user_id}:{day}"
+    version = pool_version()
+    cached = cache.get(key)
+    fresh = cached is not None and cached[0] == version
+    metrics.record_cache("quote_of_the_day", fresh)
+    if fresh:
+        return cached[1]
+    if cached is not None:
+        # The pools changed since the pick was cached; it may have been
+        # edited or deleted.
+        quote = Quote.objects.filter(pk=cached[1].pk).first()
+        if quote is not None:
+            cache.set(key, (version, quote), CACHE_TIMEOUT)
+            return quote
+
+    mood = latest_mood(user) if user is not None else None
+    for _ in range(2):
+        pool = get_pool(mood)
+        if not pool:
+            return None
+        quote = Quote.objects.filter(pk=pick(pool, user_id, day)).first()
+        if quote is not None:
+            cache.set(key, (version, quote), CACHE_TIMEOUT)
+            return quote
+        # Deleted since this process loaded its pools: reload and retry.
+        _pools["version"] = None
+    return None
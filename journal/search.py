@@ -0,0 +1,185 @@
+"""Entry search query language.
+
+A search is a list of terms separated by spaces. Filters narrow the
+results with exact predicates the `Entry` indexes can serve; everything
+else is free text:
+
+    mood:calm               mood equals (repeat for either: mood:calm mood:sad)
+    rating:4                mood_rating equals; also >=4, >4, <=2, <2, 2..4
+    date:2025-03            date within a year, month or day; ranges are
+                            inclusive (2025-01..2025-03) and may be open
+                            (2025-01.. or ..2025-03)
+    gratitude:"coffee"      a gratitude item contains the text
+    walk "long walk"        title, content or a gratitude item contains
+                            each word or quoted phrase
+
+Every term must match. Filter values that cannot be parsed raise
+`SearchError` rather than being dropped, so a typo never widens a search.
+"""
+
+import datetime
+import re
+from dataclasses import dataclass, field
+
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import MOOD_CHOICES, GratitudeItem
+
+# An optional `key:` followed by a quoted (closing quote optional) or bare
+# value.
+TERM = re.compile(
+    r'(?:(?P<key>[a-z]+):)?(?:"(?P<quoted>[^"]*)"?|(?P<bare>\S+))', re.IGNORECASE
+)
+RATING = re.compile(r"^(?P<op>>=|<=|>|<|=)?(?P<value>[1-5])$")
+RATING_RANGE = re.compile(r"^(?P<low>[1-5])\.\.(?P<high>[1-5])$")
+PERIOD = re.compile(
+    r"^(?P<year>\d{4})(?:-(?P<month>\d{1,2})(?:-(?P<day>\d{1,2}))?)?$"
+)
+
+MOODS = {value: value for value, _label in MOOD_CHOICES} | {
+    label.lower(): value for value, label in MOOD_CHOICES
+}
+RATING_LOOKUPS = {
+    None: "exact",
+    "=": "exact",
+    ">=": "gte",
+    ">": "gt",
+    "<=": "lte",
+    "<": "lt",
+}
+
+
+class SearchError(ValueError):
+    """A filter value in the search could not be understood."""
+
+
+@dataclass
+class ParsedSearch:
+    moods: list = field(default_factory=list)
+    predicates: list = field(default_factory=list)
+    text: list = field(default_factory=list)
+
+    def to_q(self):
+        """Return a Q object matching entries that satisfy every term."""
+        q = Q()
+        if len(self.moods) == 1:
+            q &= Q(mood=self.moods[0])
+        elif self.moods:
+            q &= Q(mood__in=self.moods)
+        for predicate in self.predicates:
+            q &= predicate
+        for text in self.text:
+            q &= (
+                Q(title__icontains=text)
+                | Q(content__icontains=text)
+                | gratitude_contains(text)
+            )
+        return q
+
+
+def gratitude_contains(text):
+    """Match entries with a gratitude item containing `text`.
+
+    Items are matched one by one rather than through the serialised
+    `Entry.gratitude` list, where JSON punctuation would match every entry
+    and a phrase could span two items.
+    """
+    return Q(
+        Exists(
+            GratitudeItem.objects.filter(
+                entry_id=OuterRef("pk"), item_text__icontains=text
+            )
+        )
+    )
+
+
+def parse_mood(value):
+    try:
+        return MOODS[value.lower()]
+    except KeyError:
+        raise SearchError(
+            f'Unknown mood "{value}". Try one of: '
+            + ", ".join(value for value, _label in MOOD_CHOICES)
+            + "."
+        ) from None
+
+
+def parse_rating(value):
+    match = RATING_RANGE.match(value)
+    if match:
+        low, high = sorted((int(match["low"]), int(match["high"])))
+        return Q(mood_rating__range=(low, high))
+    match = RATING.match(value)
+    if match:
+        lookup = RATING_LOOKUPS[match["op"]]
+        return Q(**{f"mood_rating__{lookup}": int(match["value"])})
+    raise SearchError(
+        f'Cannot read rating "{value}". Use 1 to 5, e.g. rating:4, '
+        "rating:>=4 or rating:2..4."
+    )
+
+
+def parse_period(value):
+    """Return the `[start, end)` dates of a year, month or day."""
+    match = PERIOD.match(value)
+    if not match:
+        raise SearchError(
+            f'Cannot read date "{value}". Use YYYY, YYYY-MM or YYYY-MM-DD, '
+            "or a range such as 2025-01..2025-03."
+        )
+    year, month, day = (int(part) if part else None for part in match.groups())
+    try:
+        if day:
+            start = datetime.date(year, month, day)
+            return start, start + datetime.timedelta(days=1)
+        if month:
+            start = datetime.date(year, month, 1)
+            if month == 12:
+                return start, datetime.date(year + 1, 1, 1)
+            return start, datetime.date(year, month + 1, 1)
+        return datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+    except ValueError:
+        raise SearchError(f'"{value}" is not a valid date.') from None
+
+
+def start_of(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def parse_date(value):
+    if ".." not in value:
+        start, end = parse_period(value)
+        return Q(date__gte=start_of(start), date__lt=start_of(end))
+    first, _, last = value.partition("..")
+    if not first and not last:
+        raise SearchError("A date range needs at least one end.")
+    q = Q()
+    if first:
+        q &= Q(date__gte=start_of(parse_period(first)[0]))
+    if last:
+        q &= Q(date__lt=start_of(parse_period(last)[1]))
+    return q
+
+
+def parse_search(search):
+    """Parse a search string into a `ParsedSearch`."""
+    parsed = ParsedSearch()
+    for match in TERM.finditer(search):
+        key = match["key"] and match["key"].lower()
+        value = match["quoted"] if match["quoted"] is not None else match["bare"]
+        if key == "mood":
+            parsed.moods.append(parse_mood(value))
+        elif key == "rating":
+            parsed.predicates.append(parse_rating(value))
+        elif key == "date":
+            parsed.predicates.append(parse_date(value))
+        elif key == "gratitude":
+            if value:
+                parsed.predicates.append(gratitude_contains(value))
+        else:
+            # Not a filter, so "key:" is part of the text.
+            text = f"{match['key']}:{value}" if key else value
+            if text:
+                parsed.text.append(text)
+    return parsed
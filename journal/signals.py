@@ -0,0 +1,254 @@
+"""Signal receivers for the journal app.
+
+Keeps denormalised data (`Entry.gratitude`, `EntryCounter` and `StreakRun`
+rows and sync tombstones) in step with writes made through any path (views, formsets,
+admin or the shell), and marks the in-memory quote pools stale when quotes
+or their mood tags change. Database connections opened are counted for
+`journal.metrics`.
+Receivers are connected in `JournalConfig.ready()`.
+
+Bulk writers (e.g. the batch API) wrap their statements in `bulk_write()`
+to suspend these per-row receivers and maintain the same data themselves.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import metrics
+from .models import (
+    ChangeSequence,
+    Entry,
+    EntryCounter,
+    EntryTombstone,
+    GratitudeItem,
+    Quote,
+    QuoteMood,
+    StreakRun,
+)
+from .quotes import invalidate_pools
+
+_bulk_write = ContextVar("journal_bulk_write", default=False)
+
+
+@contextmanager
+def bulk_write():
+    """Suspend the receivers below for writes made inside the block.
+
+    The caller becomes responsible for `Entry.gratitude`, `EntryCounter`,
+    `StreakRun` and `EntryTombstone` rows for every row it touches.
+    """
+    token = _bulk_write.set(True)
+    try:
+        yield
+    finally:
+        _bulk_write.reset(token)
+
+
+def _is_cascade_from(origin, model):
+    """Return True when a delete was triggered by deleting `model` rows."""
+    if isinstance(origin, model):
+        return True
+    return isinstance(origin, QuerySet) and origin.model is model
+
+
+def _is_user_cascade(origin):
+    return _is_cascade_from(origin, get_user_model())
+
+
+@receiver(pre_save, sender=Entry)
+def remember_previous_entry(sender, instance, **kwargs):
+    """Snapshot the stored row before an update so receivers can diff it.
+
+    Sets `instance._previous` to a dict of the persisted `user_id`, `mood`,
+    `date` and `gratitude`, or None when the entry is being inserted.
+    """
+    instance._previous = None
+    if _bulk_write.get():
+        return
+    if instance.pk is not None and not instance._state.adding:
+        instance._previous = (
+            Entry.objects.filter(pk=instance.pk)
+            .values("user_id", "mood", "date", "gratitude")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Entry)
+def count_saved_entry(sender, instance, created, **kwargs):
+    """Count a new entry, or move its counts when its mood or user changes."""
+    if _bulk_write.get():
+        return
+    if created:
+        EntryCounter.adjust(
+            instance.user_id,
+            instance.mood,
+            entries=1,
+            gratitude_items=len(instance.gratitude),
+        )
+        return
+    previous = getattr(instance, "_previous", None)
+    if previous and (
+        previous["mood"] != instance.mood
+        or previous["user_id"] != instance.user_id
+    ):
+        moved = len(previous["gratitude"] or [])
+        EntryCounter.adjust(
+            previous["user_id"],
+            previous["mood"],
+            entries=-1,
+            gratitude_items=-moved,
+        )
+        EntryCounter.adjust(
+            instance.user_id,
+            instance.mood,
+            entries=1,
+            gratitude_items=moved,
+        )
+
+
+@receiver(post_delete, sender=Entry)
+def count_deleted_entry(sender, instance, origin=None, **kwargs):
+    """Remove a deleted entry and its gratitude items from the counters."""
+    if _bulk_write.get() or _is_user_cascade(origin):
+        return
+    EntryCounter.adjust(
+        instance.user_id,
+        instance.mood,
+        entries=-1,
+        gratitude_items=-len(instance.gratitude),
+    )
+
+
+@receiver(post_delete, sender=Entry)
+def record_entry_tombstone(sender, instance, origin=None, **kwargs):
+    """Leave a tombstone so delta sync clients learn about the delete."""
+    if _bulk_write.get() or _is_user_cascade(origin):
+        return
+    EntryTombstone.objects.create(
+        user_id=instance.user_id,
+        entry_id=instance.pk,
+        change_seq=ChangeSequence.reserve(instance.user_id),
+    )
+
+
+@receiver(post_save, sender=Entry)
+def record_reassigned_entry_tombstone(sender, instance, created, **kwargs):
+    """Tombstone an entry for its old owner when it moves to another user.
+
+    The old owner's sync clients would otherwise keep the entry forever;
+    the new owner picks it up through the `change_seq` stamped on save.
+    """
+    if _bulk_write.get() or created:
+        return
+    previous = getattr(instance, "_previous", None)
+    if previous and previous["user_id"] != instance.user_id:
+        EntryTombstone.objects.create(
+            user_id=previous["user_id"],
+            entry_id=instance.pk,
+            change_seq=ChangeSequence.reserve(previous["user_id"]),
+        )
+
+
+@receiver(post_save, sender=Entry)
+def update_streak_on_save(sender, instance, created, **kwargs):
+    """Add the entry's day to the streaks; refresh its old day if moved.
+
+    An entry moved to another user (or day) leaves its old owner's day,
+    which is dropped from their streaks unless another entry remains.
+    """
+    if _bulk_write.get():
+        return
+    day = StreakRun.day_of(instance.date)
+    previous = getattr(instance, "_previous", None)
+    if created or previous is None:
+        StreakRun.add_day(instance.user_id, day)
+        return
+    old_day = StreakRun.day_of(previous["date"])
+    if old_day != day or previous["user_id"] != instance.user_id:
+        StreakRun.add_day(instance.user_id, day)
+        StreakRun.refresh_day(previous["user_id"], old_day)
+
+
+@receiver(post_delete, sender=Entry)
+def update_streak_on_delete(sender, instance, origin=None, **kwargs):
+    """Drop the deleted entry's day from the streaks if no entry remains."""
+    if _bulk_write.get() or _is_user_cascade(origin):
+        return
+    StreakRun.refresh_day(instance.user_id, StreakRun.day_of(instance.date))
+
+
+@receiver(pre_save, sender=GratitudeItem)
+def remember_previous_item_entry(sender, instance, **kwargs):
+    """Snapshot the stored `entry_id` so a moved item can be detected.
+
+    Sets `instance._previous_entry_id`, or None when the item is being
+    inserted.
+    """
+    instance._previous_entry_id = None
+    if _bulk_write.get():
+        return
+    if instance.pk is not None and not instance._state.adding:
+        instance._previous_entry_id = (
+            GratitudeItem.objects.filter(pk=instance.pk)
+            .values_list("entry_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=GratitudeItem)
+def sync_gratitude_on_save(sender, instance, created, **kwargs):
+    """Refresh the parent entry's `gratitude` list after an item is saved.
+
+    An item moved to another entry also refreshes the entry it left and
+    moves its count across.
+    """
+    if _bulk_write.get():
+        return
+    entry = instance.entry
+    entry.sync_gratitude()
+    previous_id = getattr(instance, "_previous_entry_id", None)
+    if created:
+        EntryCounter.adjust(entry.user_id, entry.mood, gratitude_items=1)
+    elif previous_id is not None and previous_id != entry.pk:
+        old = Entry.objects.filter(pk=previous_id).first()
+        if old is not None:
+            old.sync_gratitude()
+            EntryCounter.adjust(old.user_id, old.mood, gratitude_items=-1)
+        EntryCounter.adjust(entry.user_id, entry.mood, gratitude_items=1)
+
+
+@receiver(post_delete, sender=GratitudeItem)
+def sync_gratitude_on_delete(sender, instance, origin=None, **kwargs):
+    """Refresh the parent entry's `gratitude` list after an item is deleted.
+
+    Skipped when the item is removed by a cascade from its entry, since the
+    entry row is being deleted as well and its own receiver adjusts counts.
+    """
+    if _bulk_write.get():
+        return
+    if _is_cascade_from(origin, Entry) or _is_user_cascade(origin):
+        return
+    entry = instance.entry
+    entry.sync_gratitude()
+    EntryCounter.adjust(entry.user_id, entry.mood, gratitude_items=-1)
+
+
+@receiver(post_save, sender=Quote)
+@receiver(post_delete, sender=Quote)
+@receiver(post_save, sender=QuoteMood)
+@receiver(post_delete, sender=QuoteMood)
+def invalidate_quote_pools(sender, **kwargs):
+    """Reload the quote pools after a quote or mood tag changes."""
+    invalidate_pools()
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    """Count each new database connection for the metrics endpoint."""
+    metrics.inc("journal_db_connections_opened_total")
@@ -0,0 +1,153 @@
+"""Slow query log.
+
+`log_slow_queries(source)` installs a database execute wrapper on every
+connection for the duration of a block. Queries slower than
+`settings.SLOW_QUERY_MS` are written to the `journal.slow_queries` logger
+as one JSON object per line:
+
+    {"duration_ms": 812.4, "source": "journal:entry_list", "path": "/entries/",
+     "frame": "journal/views.py:142 in get_queryset", "sql": "SELECT ...",
+     "params": "3f2a9c1e0b7d", "many": false, "suppressed": 0}
+
+`source` is the resolved URL name for requests (see `SlowQueryMiddleware`)
+or `job:<name>` for background jobs. `frame` is the innermost stack frame
+in the journal app, so the query can be traced back to the code that made
+it; it is null for querysets that are only evaluated by Django itself,
+e.g. while a template renders. `params` is a fingerprint of the
+parameters rather than their values, which may be personal data; equal
+fingerprints mean equal parameters.
+
+Logging is rate limited per process to a burst of `BURST` lines refilled
+at `RATE` lines per second; `suppressed` counts the lines dropped since the
+previous one. Only slow queries pay for the stack walk and the JSON.
+"""
+
+import hashlib
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+RATE = 1.0
+BURST = 20
+MAX_SQL_LENGTH = 2000
+
+APP_DIR = Path(__file__).resolve().parent
+# Frames in these files are instrumentation, not the caller.
+SKIPPED_FILES = {
+    str(APP_DIR / "slow_queries.py"),
+    str(APP_DIR / "middleware.py"),
+}
+
+
+class RateLimiter:
+    """Token bucket shared by every thread of the process."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.suppressed = 0
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Return the number of lines suppressed before this one, or None
+        if this line should be suppressed as well."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens < 1:
+                self.suppressed += 1
+                return None
+            self.tokens -= 1
+            suppressed, self.suppressed = self.suppressed, 0
+            return suppressed
+
+
+limiter = RateLimiter(RATE, BURST)
+
+
+def app_frame():
+    """Return `path:line in function` for the innermost journal frame."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(str(APP_DIR)) and filename not in SKIPPED_FILES:
+            path = Path(filename).relative_to(APP_DIR.parent)
+            return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def fingerprint(params):
+    return hashlib.sha256(repr(params).encode()).hexdigest()[:12]
+
+
+class SlowQueryWrapper:
+    """Database execute wrapper logging queries over the threshold."""
+
+    def __init__(self, threshold, source, path=None):
+        self.threshold = threshold
+        self.source = source
+        self.path = path
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            if duration >= self.threshold:
+                self.log(sql, params, many, duration)
+
+    def log(self, sql, params, many, duration):
+        suppressed = limiter.take()
+        if suppressed is None:
+            return
+        source = self.source() if callable(self.source) else self.source
+        record = {
+            "duration_ms": round(duration, 1),
+            "source": source,
+            "path": self.path,
+            "frame": app_frame(),
+            "sql": sql[:MAX_SQL_LENGTH],
+            "params": fingerprint(params),
+            "many": many,
+            "suppressed": suppressed,
+        }
+        logger.warning(json.dumps(record), extra={"slow_query": record})
+
+
+def threshold():
+    """Return the slow query threshold in milliseconds, or None if off."""
+    value = settings.SLOW_QUERY_MS
+    return value if value and value > 0 else None
+
+
+@contextmanager
+def log_slow_queries(source, path=None):
+    """Log slow queries made inside the block, attributed to `source`.
+
+    `source` may be a callable, evaluated when a slow query is logged.
+    """
+    limit = threshold()
+    if limit is None:
+        yield
+        return
+    wrapper = SlowQueryWrapper(limit, source, path)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
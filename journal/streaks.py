@@ -0,0 +1,42 @@
+"""Journaling streaks and milestones shown on the home page.
+
+Everything here reads stored, incrementally maintained rows (`StreakRun`
+for streaks, `EntryCounter` for the entry total), so the cost of the home
+page does not grow with the number of entries.
+"""
+
+from .models import EntryCounter, StreakRun
+
+# Entry totals and streak lengths (in days) that count as milestones.
+ENTRY_MILESTONES = (1, 10, 25, 50, 100, 250, 500, 1000)
+STREAK_MILESTONES = (3, 7, 14, 30, 60, 100, 365)
+
+
+def milestone_progress(value, milestones):
+    """Return `(last_reached, next_milestone)`; either may be None."""
+    reached = [m for m in milestones if m <= value]
+    upcoming = [m for m in milestones if m > value]
+    return (
+        reached[-1] if reached else None,
+        upcoming[0] if upcoming else None,
+    )
+
+
+def journaling_progress(user):
+    """Return the streak and milestone context for `user`'s home page."""
+    streaks = StreakRun.summary(user)
+    entries = EntryCounter.totals_for(user)["entries"]
+    entry_reached, entry_next = milestone_progress(entries, ENTRY_MILESTONES)
+    streak_reached, streak_next = milestone_progress(
+        streaks["longest"], STREAK_MILESTONES
+    )
+    return {
+        "current_streak": streaks["current"],
+        "longest_streak": streaks["longest"],
+        "entries": entries,
+        "entry_milestone": entry_reached,
+        "next_entry_milestone": entry_next,
+        "entries_to_next_milestone": entry_next - entries if entry_next else 0,
+        "streak_milestone": streak_reached,
+        "next_streak_milestone": streak_next,
+    }
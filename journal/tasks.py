@@ -0,0 +1,48 @@
+"""Background tasks runnable through the job queue (see `journal.jobs`).
+
+Imported from `JournalConfig.ready()` so every process (web and worker)
+knows the registered names.
+"""
+
+import datetime
+
+from django.utils import timezone
+
+from . import digests, jobs
+from .models import EntryCounter, EntryTombstone, StreakRun
+
+
+@jobs.task("journal.rebuild_counters")
+def rebuild_counters(user_ids=None):
+    """Rebuild entry counters (all users when `user_ids` is None)."""
+    return {"rows": EntryCounter.rebuild(users=user_ids)}
+
+
+@jobs.task("journal.rebuild_streaks")
+def rebuild_streaks(user_ids=None):
+    """Rebuild journaling streaks (all users when `user_ids` is None)."""
+    return {"rows": StreakRun.rebuild(users=user_ids)}
+
+
+@jobs.task("journal.prune_tombstones")
+def prune_tombstones(older_than_days=90):
+    """Delete delta sync tombstones older than `older_than_days`."""
+    before = timezone.now() - datetime.timedelta(days=older_than_days)
+    return {"deleted": EntryTombstone.prune(before)}
+
+
+@jobs.task("journal.generate_digests")
+def generate_digests(week_start=None, chunk_size=500):
+    """Generate missing weekly digests in this worker (no process pool).
+
+    `week_start` is an ISO date; defaults to the last full week.
+    """
+    week = (
+        datetime.date.fromisoformat(week_start)
+        if week_start
+        else digests.last_complete_week()
+    )
+    written = 0
+    for chunk in digests.pending_user_ids(week, chunk_size):
+        written += digests.generate_chunk(chunk, week)[0]
+    return {"week_start": week.isoformat(), "digests": written}
@@ -0,0 +1,17 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from journal.assets import script_sources
+
+register = template.Library()
+
+
+@register.simple_tag
+def script_bundle(name):
+    """Render `<script>` tags for the bundle `name` (see journal.assets)."""
+    return format_html_join(
+        "\n",
+        '<script src="{}"></script>',
+        ((static(path),) for path in script_sources(name)),
+    )
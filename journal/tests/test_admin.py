@@ -0,0 +1,140 @@
+"""Tests for the journal admin changelists and forms.
+
+Checks that changelist query counts do not grow with the number of rows,
+that no full-table COUNT(*) is issued, and that foreign keys to large
+tables are not rendered as `<select>` lists.
+"""
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from journal.admin import EntryAdmin
+from journal.models import Entry, GratitudeItem, Quote
+
+User = get_user_model()
+
+
+def make_entry(user, **kwargs):
+    defaults = {
+        "date": timezone.now(),
+        "mood": "happy",
+        "mood_rating": 3,
+        "title": "Admin entry",
+        "content": "Some content.",
+    }
+    defaults.update(kwargs)
+    return Entry.objects.create(user=user, **defaults)
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username="admin", password="pw", email="admin@example.com"
+        )
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        start = User.objects.count()
+        for i in range(start, start + count):
+            user = User.objects.create_user(username=f"writer{i}", password="pw")
+            entry = make_entry(user, title=f"Entry {i}")
+            GratitudeItem.objects.create(entry=entry, item_text=f"Thing {i}")
+
+    def changelist_queries(self, model_name, params=None):
+        url = reverse(f"admin:journal_{model_name}_changelist")
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return [q["sql"] for q in ctx.captured_queries]
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        for model_name in ("entry", "gratitudeitem"):
+            self.add_rows(2)
+            small = len(self.changelist_queries(model_name))
+            self.add_rows(8)
+            large = len(self.changelist_queries(model_name))
+            self.assertEqual(small, large, model_name)
+
+    def test_no_unbounded_count(self):
+        self.add_rows(3)
+        queries = self.changelist_queries("entry", {"mood": "happy"})
+        counts = [q for q in queries if "COUNT(" in q.upper()]
+        self.assertTrue(counts)
+        for sql in counts:
+            self.assertIn("LIMIT", sql.upper())
+
+    def test_search_by_content_and_filter_by_username(self):
+        make_entry(self.admin, title="Needle", content="haystack with a needle")
+        make_entry(self.admin, title="Other", content="nothing here")
+        url = reverse("admin:journal_entry_changelist")
+        response = self.client.get(url, {"q": "needle"})
+        self.assertEqual(response.context["cl"].result_count, 1)
+        writer = User.objects.create_user(username="writer", password="pw")
+        make_entry(writer, title="Theirs")
+        self.assertContains(self.client.get(url), "?username=writer")
+        response = self.client.get(url, {"username": "admin"})
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+    def test_entry_search_does_not_join_users(self):
+        # An OR across the join would stop PostgreSQL combining the title
+        # and content trigram indexes (see test_query_plans).
+        request = RequestFactory().get("/")
+        request.user = self.admin
+        queryset, _ = EntryAdmin(Entry, admin.site).get_search_results(
+            request, Entry.objects.all(), "needle"
+        )
+        self.assertNotIn("auth_user", str(queryset.query))
+
+    def test_gratitude_form_does_not_list_every_entry(self):
+        self.add_rows(3)
+        response = self.client.get(reverse("admin:journal_gratitudeitem_add"))
+        self.assertNotContains(response, "<select name=\"entry\"")
+        self.assertContains(response, "vForeignKeyRawIdAdminField")
+
+    def test_entry_form_uses_user_autocomplete(self):
+        response = self.client.get(reverse("admin:journal_entry_add"))
+        self.assertContains(response, "admin-autocomplete")
+
+    def test_duplicate_quote_is_a_form_error(self):
+        Quote.objects.create(text="Keep going.", author="Someone")
+        count = Quote.objects.count()
+        url = reverse("admin:journal_quote_add")
+        response = self.client.post(
+            url,
+            {
+                "text": "  keep   GOING. ",
+                "author": "Someone else",
+                "moods-TOTAL_FORMS": "0",
+                "moods-INITIAL_FORMS": "0",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(
+            response.context["adminform"], "text", "This quote already exists."
+        )
+        self.assertEqual(Quote.objects.count(), count)
+
+    def test_editing_quote_does_not_clash_with_itself(self):
+        quote = Quote.objects.create(text="Keep going.")
+        url = reverse("admin:journal_quote_change", args=[quote.pk])
+        response = self.client.post(
+            url,
+            {
+                "text": "Keep going.",
+                "author": "Someone",
+                "moods-TOTAL_FORMS": "0",
+                "moods-INITIAL_FORMS": "0",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        quote.refresh_from_db()
+        self.assertEqual(quote.author, "Someone")
+
+    def test_entry_admin_options(self):
+        self.assertEqual(EntryAdmin.date_hierarchy, "date")
+        self.assertFalse(EntryAdmin.show_full_result_count)
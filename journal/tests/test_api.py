@@ -0,0 +1,449 @@
+"""Tests for the JSON entry API in journal.api.
+
+Covers authentication, ownership, sparse fieldsets, cursor pagination,
+create/update/delete with embedded gratitude items, validation errors,
+gzip compression, the batch endpoint and delta sync.
+"""
+
+import datetime
+import gzip
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from journal.models import (
+    ChangeSequence,
+    Entry,
+    EntryCounter,
+    EntryTombstone,
+    GratitudeItem,
+    StreakRun,
+)
+
+User = get_user_model()
+
+
+def make_entry(user, **kwargs):
+    defaults = {
+        "date": timezone.now(),
+        "mood": "happy",
+        "mood_rating": 3,
+        "title": "My Entry",
+        "content": "Some content.",
+    }
+    defaults.update(kwargs)
+    return Entry.objects.create(user=user, **defaults)
+
+
+def valid_payload(**overrides):
+    data = {
+        "date": "2026-01-15T10:00:00+00:00",
+        "mood": "calm",
+        "mood_rating": 4,
+        "title": "Good Day",
+        "content": "Felt pretty good.",
+        "gratitude": ["Sunshine", "", "Tea"],
+    }
+    data.update(overrides)
+    return data
+
+
+class ApiTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="api", password="pw")
+        self.other = User.objects.create_user(username="other", password="pw")
+        self.client.force_login(self.user)
+        self.list_url = reverse("journal:api_entry_list")
+
+    def detail_url(self, entry):
+        return reverse("journal:api_entry_detail", kwargs={"pk": entry.pk})
+
+    def send(self, method, url, data):
+        return getattr(self.client, method)(
+            url, json.dumps(data), content_type="application/json"
+        )
+
+
+class EntryListApiTests(ApiTestCase):
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_lists_only_own_entries(self):
+        make_entry(self.user, title="Mine")
+        make_entry(self.other, title="Theirs")
+        results = self.client.get(self.list_url).json()["results"]
+        self.assertEqual([r["title"] for r in results], ["Mine"])
+
+    def test_default_list_fields_omit_content(self):
+        make_entry(self.user)
+        result = self.client.get(self.list_url).json()["results"][0]
+        self.assertNotIn("content", result)
+        self.assertIn("excerpt", result)
+
+    def test_sparse_fields(self):
+        make_entry(self.user, title="Sparse")
+        response = self.client.get(self.list_url, {"fields": "id,title"})
+        self.assertEqual(
+            list(response.json()["results"][0].keys()), ["id", "title"]
+        )
+
+    def test_unknown_field_rejected(self):
+        response = self.client.get(self.list_url, {"fields": "title,password"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pagination_walks_all_entries(self):
+        now = timezone.now()
+        for i in range(5):
+            make_entry(
+                self.user, title=f"E{i}", date=now - timezone.timedelta(days=i)
+            )
+        titles, cursor = [], None
+        while True:
+            params = {"limit": 2, "fields": "title"}
+            if cursor:
+                params["cursor"] = cursor
+            body = self.client.get(self.list_url, params).json()
+            titles += [r["title"] for r in body["results"]]
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(titles, ["E0", "E1", "E2", "E3", "E4"])
+
+    def test_invalid_cursor_rejected(self):
+        response = self.client.get(self.list_url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_is_single_entry_query(self):
+        for i in range(3):
+            make_entry(self.user, title=f"E{i}")
+        # Session + user lookups, then one query for the page of entries.
+        with self.assertNumQueries(3):
+            self.client.get(self.list_url)
+
+    def test_gzip_when_accepted(self):
+        for i in range(10):
+            make_entry(self.user, title=f"Entry number {i}")
+        response = self.client.get(self.list_url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        body = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(body["results"]), 10)
+
+
+class EntryCreateApiTests(ApiTestCase):
+    def test_create_entry_with_gratitude(self):
+        response = self.send("post", self.list_url, valid_payload())
+        self.assertEqual(response.status_code, 201)
+        entry = Entry.objects.get(user=self.user)
+        self.assertEqual(entry.gratitude, ["Sunshine", "Tea"])
+        self.assertEqual(
+            list(entry.gratitude_items.values_list("item_text", flat=True)),
+            ["Sunshine", "Tea"],
+        )
+        totals = EntryCounter.totals_for(self.user)
+        self.assertEqual((totals["entries"], totals["gratitude_items"]), (1, 2))
+
+    def test_form_validation_errors_returned(self):
+        response = self.send("post", self.list_url, valid_payload(title=" "))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("title", response.json()["errors"])
+        self.assertFalse(Entry.objects.exists())
+
+    def test_gratitude_must_be_strings(self):
+        payload = valid_payload(gratitude=["ok", 5])
+        response = self.send("post", self.list_url, payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("1", response.json()["errors"]["gratitude"])
+
+    def test_invalid_json_rejected(self):
+        response = self.client.post(
+            self.list_url, "{", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class EntryDetailApiTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.entry = make_entry(self.user, title="Original", mood="sad")
+        GratitudeItem.objects.create(entry=self.entry, item_text="Old")
+
+    def test_get_detail_includes_content(self):
+        body = self.client.get(self.detail_url(self.entry)).json()
+        self.assertEqual(body["content"], "Some content.")
+        self.assertEqual(body["gratitude"], ["Old"])
+
+    def test_other_users_entry_is_404(self):
+        entry = make_entry(self.other)
+        self.assertEqual(self.client.get(self.detail_url(entry)).status_code, 404)
+        response = self.client.delete(self.detail_url(entry))
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Entry.objects.filter(pk=entry.pk).exists())
+
+    def test_patch_updates_only_given_fields(self):
+        response = self.send("patch", self.detail_url(self.entry), {"title": "New"})
+        self.assertEqual(response.status_code, 200)
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.title, "New")
+        self.assertEqual(self.entry.mood, "sad")
+        self.assertEqual(self.entry.gratitude, ["Old"])
+
+    def test_put_replaces_gratitude(self):
+        payload = valid_payload(gratitude=["New one"])
+        response = self.send("put", self.detail_url(self.entry), payload)
+        self.assertEqual(response.status_code, 200)
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.gratitude, ["New one"])
+        self.assertEqual(self.entry.gratitude_items.count(), 1)
+        totals = EntryCounter.totals_for(self.user)
+        self.assertEqual(totals["moods"], {"calm": 1})
+        self.assertEqual(totals["gratitude_items"], 1)
+
+    def test_put_requires_all_fields(self):
+        response = self.send("put", self.detail_url(self.entry), {"title": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_delete(self):
+        response = self.client.delete(self.detail_url(self.entry))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Entry.objects.filter(pk=self.entry.pk).exists())
+
+
+class EntryBatchApiTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("journal:api_entry_batch")
+
+    def creates(self, n):
+        return [
+            {"op": "create", "client_id": f"c{i}", "data": valid_payload(title=f"T{i}")}
+            for i in range(n)
+        ]
+
+    def test_mixed_batch_applies_all_operations(self):
+        to_update = make_entry(self.user, mood="sad")
+        to_delete = make_entry(self.user, mood="happy")
+        GratitudeItem.objects.create(entry=to_delete, item_text="Gone")
+        operations = self.creates(2) + [
+            {"op": "update", "id": to_update.pk, "data": {"mood": "calm"}},
+            {"op": "delete", "id": to_delete.pk},
+        ]
+        response = self.send("post", self.url, {"operations": operations})
+        self.assertEqual(response.status_code, 200)
+        statuses = [r["status"] for r in response.json()["results"]]
+        self.assertEqual(statuses, ["created", "created", "updated", "deleted"])
+        self.assertEqual(response.json()["results"][0]["client_id"], "c0")
+
+        self.assertFalse(Entry.objects.filter(pk=to_delete.pk).exists())
+        to_update.refresh_from_db()
+        self.assertEqual(to_update.mood, "calm")
+        created = Entry.objects.filter(title__in=["T0", "T1"])
+        self.assertEqual(created.count(), 2)
+        self.assertEqual(created[0].gratitude, ["Sunshine", "Tea"])
+        self.assertEqual(created[0].word_count, 3)
+        self.assertEqual(GratitudeItem.objects.count(), 4)
+
+        totals = EntryCounter.totals_for(self.user)
+        self.assertEqual(totals["moods"], {"calm": 3})
+        self.assertEqual(totals["gratitude_items"], 4)
+
+    def test_update_can_replace_gratitude(self):
+        entry = make_entry(self.user)
+        GratitudeItem.objects.create(entry=entry, item_text="Old")
+        operations = [
+            {"op": "update", "id": entry.pk, "data": {"gratitude": ["A", "B"]}}
+        ]
+        self.send("post", self.url, {"operations": operations})
+        entry.refresh_from_db()
+        self.assertEqual(entry.gratitude, ["A", "B"])
+        self.assertEqual(EntryCounter.totals_for(self.user)["gratitude_items"], 2)
+
+    def write_statements(self, operations):
+        with CaptureQueriesContext(connection) as ctx:
+            self.send("post", self.url, {"operations": operations})
+        return [
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+        ]
+
+    def test_write_statements_do_not_grow_with_batch_size(self):
+        # Form validation still checks constraints per item; writes are bulk.
+        # Counter row and streak day already exist for the created entries.
+        make_entry(
+            self.user,
+            mood="calm",
+            date=datetime.datetime(2026, 1, 15, 9, tzinfo=datetime.timezone.utc),
+        )
+        small = self.write_statements(self.creates(2))
+        large = self.write_statements(self.creates(20))
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Entry.objects.count(), 23)
+
+    def test_invalid_and_missing_items_reported_individually(self):
+        other_entry = make_entry(self.other)
+        operations = self.creates(1) + [
+            {"op": "create", "data": valid_payload(title="")},
+            {"op": "delete", "id": other_entry.pk},
+        ]
+        body = self.send("post", self.url, {"operations": operations}).json()
+        statuses = [r["status"] for r in body["results"]]
+        self.assertEqual(statuses, ["created", "error", "not_found"])
+        self.assertIn("title", body["results"][1]["errors"])
+        self.assertTrue(Entry.objects.filter(pk=other_entry.pk).exists())
+
+    def test_atomic_batch_writes_nothing_on_error(self):
+        operations = self.creates(1) + [
+            {"op": "create", "data": valid_payload(mood_rating=9)}
+        ]
+        response = self.send(
+            "post", self.url, {"atomic": True, "operations": operations}
+        )
+        self.assertEqual(response.status_code, 400)
+        statuses = [r["status"] for r in response.json()["results"]]
+        self.assertEqual(statuses, ["skipped", "error"])
+        self.assertFalse(Entry.objects.exists())
+
+    def test_batch_maintains_streaks(self):
+        first = make_entry(self.user, date=timezone.now() - datetime.timedelta(days=2))
+        moved = make_entry(self.user, date=timezone.now())
+        operations = [
+            {
+                "op": "create",
+                "data": valid_payload(
+                    date=(timezone.now() - datetime.timedelta(days=1)).isoformat()
+                ),
+            },
+            {
+                "op": "update",
+                "id": moved.pk,
+                "data": {
+                    "date": (timezone.now() - datetime.timedelta(days=3)).isoformat()
+                },
+            },
+            {"op": "delete", "id": first.pk},
+        ]
+        self.send("post", self.url, {"operations": operations})
+        runs = list(StreakRun.objects.order_by("start").values_list("length", flat=True))
+        self.assertEqual(runs, [1, 1])
+
+    def test_same_entry_twice_rejected(self):
+        entry = make_entry(self.user)
+        operations = [
+            {"op": "update", "id": entry.pk, "data": {"title": "A"}},
+            {"op": "delete", "id": entry.pk},
+        ]
+        body = self.send("post", self.url, {"operations": operations}).json()
+        self.assertEqual([r["status"] for r in body["results"]], ["updated", "error"])
+        self.assertTrue(Entry.objects.filter(pk=entry.pk).exists())
+
+
+class EntryChangesApiTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("journal:api_changes")
+
+    def changes(self, since=None, **params):
+        if since is not None:
+            params["since"] = since
+        return self.client.get(self.url, params).json()
+
+    def test_initial_sync_returns_everything(self):
+        make_entry(self.user, title="A")
+        make_entry(self.user, title="B")
+        make_entry(self.other, title="Theirs")
+        body = self.changes(fields="title")
+        self.assertEqual([e["title"] for e in body["entries"]], ["A", "B"])
+        self.assertEqual(body["deleted"], [])
+        self.assertFalse(body["has_more"])
+
+    def test_only_changes_since_token_are_returned(self):
+        unchanged = make_entry(self.user, title="Unchanged")
+        edited = make_entry(self.user, title="Edited")
+        removed = make_entry(self.user, title="Removed")
+        removed_pk = removed.pk
+        token = self.changes()["next_token"]
+
+        edited.title = "Edited again"
+        edited.save()
+        removed.delete()
+        added = make_entry(self.user, title="Added")
+
+        body = self.changes(token, fields="id")
+        ids = [e["id"] for e in body["entries"]]
+        self.assertEqual(ids, [edited.pk, added.pk])
+        self.assertNotIn(unchanged.pk, ids)
+        self.assertEqual(body["deleted"], [removed_pk])
+        self.assertEqual(self.changes(body["next_token"])["entries"], [])
+
+    def test_gratitude_changes_bump_the_entry(self):
+        entry = make_entry(self.user)
+        token = self.changes()["next_token"]
+        item = GratitudeItem.objects.create(entry=entry, item_text="Tea")
+        body = self.changes(token, fields="id,gratitude")
+        self.assertEqual(body["entries"], [{"id": entry.pk, "gratitude": ["Tea"]}])
+        item.delete()
+        body = self.changes(body["next_token"], fields="gratitude")
+        self.assertEqual(body["entries"], [{"gratitude": []}])
+
+    def test_paging_through_changes(self):
+        entries = [make_entry(self.user, title=f"E{i}") for i in range(3)]
+        removed_pk = entries[0].pk
+        entries[0].delete()
+        seen, deleted, token = [], [], "0"
+        while True:
+            body = self.changes(token, limit=1, fields="title")
+            seen += [e["title"] for e in body["entries"]]
+            deleted += body["deleted"]
+            token = body["next_token"]
+            if not body["has_more"]:
+                break
+        self.assertEqual(seen, ["E1", "E2"])
+        self.assertEqual(deleted, [removed_pk])
+
+    def test_batch_writes_are_tracked(self):
+        kept = make_entry(self.user)
+        removed = make_entry(self.user)
+        token = self.changes()["next_token"]
+        operations = [
+            {"op": "create", "data": valid_payload(title="New")},
+            {"op": "update", "id": kept.pk, "data": {"title": "Kept"}},
+            {"op": "delete", "id": removed.pk},
+        ]
+        self.send("post", reverse("journal:api_entry_batch"), {"operations": operations})
+        body = self.changes(token, fields="title")
+        self.assertEqual([e["title"] for e in body["entries"]], ["New", "Kept"])
+        self.assertEqual(body["deleted"], [removed.pk])
+        seqs = Entry.objects.values_list("change_seq", flat=True)
+        self.assertEqual(len(set(seqs)), 2)
+
+    def test_pruned_tombstones_force_reset(self):
+        entry = make_entry(self.user)
+        token = self.changes()["next_token"]
+        entry.delete()
+        EntryTombstone.objects.update(
+            deleted_at=timezone.now() - datetime.timedelta(days=100)
+        )
+        call_command("prune_tombstones", stdout=StringIO())
+        body = self.changes(token)
+        self.assertTrue(body["reset"])
+        self.assertEqual(body["next_token"], "0")
+        self.assertFalse(self.changes(0)["reset"])
+
+    def test_forced_resync_resets_tokens(self):
+        make_entry(self.user)
+        token = self.changes()["next_token"]
+        ChangeSequence.force_resync([self.user.pk])
+        self.assertTrue(self.changes(token)["reset"])
+
+    def test_invalid_token_rejected(self):
+        self.assertEqual(self.client.get(self.url, {"since": "x"}).status_code, 400)
+        response = self.client.get(self.url, {"since": 999})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,78 @@
+"""Tests for the static asset pipeline (journal.assets)."""
+
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+
+from journal.assets import BUNDLES, bundle, minify_css
+
+ASSET_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "journal.assets.AssetStorage"},
+}
+
+
+class MinifyCssTests(SimpleTestCase):
+    def test_drops_comments_and_whitespace(self):
+        css = "/* theme */\n.card ,\n.panel > a {\n  color : red;\n  margin: 0 auto;\n}"
+        self.assertEqual(minify_css(css), ".card,.panel>a{color :red;margin:0 auto}")
+
+    def test_keeps_meaningful_spaces(self):
+        css = (
+            "a :hover { width: calc(100% + 2px); }\n"
+            "@media (max-width: 576px) and (hover) {}"
+        )
+        self.assertEqual(
+            minify_css(css),
+            "a :hover{width:calc(100% + 2px)}@media (max-width:576px) and (hover){}",
+        )
+
+    def test_strings_are_untouched(self):
+        css = '.quote::before { content: "  /* ;  */  "; }'
+        self.assertEqual(minify_css(css), '.quote::before{content:"  /* ;  */  "}')
+
+
+class BundleTests(SimpleTestCase):
+    def test_sources_cannot_run_together(self):
+        self.assertEqual(bundle(["a()", "// end\n"]), "a()\n;\n// end\n")
+
+
+class CollectstaticTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def render_scripts(self):
+        template = Template("{% load journal_assets %}{% script_bundle 'js/app.js' %}")
+        return template.render(Context())
+
+    def test_builds_hashed_compressed_bundle(self):
+        with override_settings(STORAGES=ASSET_STORAGES, STATIC_ROOT=self.root):
+            call_command("collectstatic", "--noinput", stdout=StringIO())
+            manifest = json.loads((self.root / "staticfiles.json").read_text())["paths"]
+            scripts = self.render_scripts()
+
+        app = manifest["js/app.js"]
+        self.assertRegex(app, r"^js/app\.[0-9a-f]{12}\.js$")
+        self.assertTrue((self.root / f"{app}.gz").exists())
+        text = (self.root / app).read_text()
+        for source in BUNDLES["js/app.js"]:
+            self.assertIn(Path("static", source).read_text().strip(), text)
+        self.assertHTMLEqual(scripts, f'<script src="/static/{app}"></script>')
+
+        styles = self.root / manifest["css/styles.css"]
+        original = Path("static/css/styles.css")
+        self.assertLess(styles.stat().st_size, original.stat().st_size)
+
+    def test_sources_without_collectstatic(self):
+        self.assertHTMLEqual(
+            self.render_scripts(),
+            '<script src="/static/js/toast.js"></script>'
+            '<script src="/static/js/entries.js"></script>',
+        )
@@ -0,0 +1,142 @@
+"""Tests for weekly digest generation (journal.digests, generate_digests).
+
+The multi-process run only happens against PostgreSQL; SQLite test
+databases live in memory and cannot be shared with worker processes. It
+is also skipped inside `manage.py test --parallel` workers, which are
+daemon processes and so cannot start a process pool of their own.
+"""
+
+import datetime
+import multiprocessing
+import unittest
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from journal import digests
+from journal.models import Entry, GratitudeItem, WeeklyDigest
+
+User = get_user_model()
+
+WEEK = datetime.date(2026, 1, 5)  # a Monday
+
+
+def make_entry(user, day, **kwargs):
+    date = timezone.make_aware(
+        datetime.datetime.combine(WEEK + datetime.timedelta(days=day), datetime.time(12))
+    )
+    defaults = {
+        "mood": "happy",
+        "mood_rating": 3,
+        "title": "Entry",
+        "content": "Some content.",
+    }
+    defaults.update(kwargs)
+    return Entry.objects.create(user=user, date=date, **defaults)
+
+
+def generate(*args):
+    out = StringIO()
+    call_command(
+        "generate_digests", "--week", WEEK.isoformat(), *args, stdout=out
+    )
+    return out.getvalue()
+
+
+class WeekHelperTests(TestCase):
+    def test_last_complete_week(self):
+        wednesday = datetime.date(2026, 1, 14)
+        self.assertEqual(digests.last_complete_week(wednesday), WEEK)
+
+    def test_week_option_moves_to_monday(self):
+        from journal.management.commands.generate_digests import parse_week
+
+        self.assertEqual(parse_week("2026-01-08"), WEEK)
+
+
+class GenerateDigestsTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username="alice", password="pw")
+        self.bob = User.objects.create_user(username="bob", password="pw")
+
+    def test_digest_contents(self):
+        first = make_entry(self.alice, 0, mood="calm", mood_rating=4)
+        make_entry(self.alice, 2, mood="calm", mood_rating=5)
+        second = make_entry(self.alice, 6, mood="sad", mood_rating=1)
+        make_entry(self.alice, 7, mood="sad")  # following week
+        for entry, text in ((first, "Tea"), (second, "tea"), (second, "Sun")):
+            GratitudeItem.objects.create(entry=entry, item_text=text)
+
+        generate("--workers", "1")
+        digest = WeeklyDigest.objects.get(user=self.alice)
+        self.assertEqual(digest.week_start, WEEK)
+        self.assertEqual(digest.entries, 3)
+        self.assertAlmostEqual(digest.average_rating, 10 / 3)
+        self.assertEqual(digest.top_moods, [["calm", 2], ["sad", 1]])
+        self.assertEqual(digest.top_gratitude, [["tea", 2], ["sun", 1]])
+        self.assertFalse(WeeklyDigest.objects.filter(user=self.bob).exists())
+
+    def test_chunks_use_constant_queries(self):
+        users = [
+            User.objects.create_user(username=f"u{i}", password="pw")
+            for i in range(6)
+        ]
+        for user in users:
+            make_entry(user, 1)
+        with CaptureQueriesContext(connection) as ctx:
+            digests.generate_chunk([u.pk for u in users], WEEK)
+        statements = [
+            q for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]
+        ]
+        # Three aggregates and one upsert, however many users.
+        self.assertEqual(len(statements), 4)
+
+    def test_rerun_resumes_and_force_regenerates(self):
+        make_entry(self.alice, 0)
+        make_entry(self.bob, 0)
+        WeeklyDigest.objects.create(user=self.alice, week_start=WEEK, entries=99)
+
+        output = generate("--workers", "1", "--chunk-size", "1")
+        self.assertIn("Wrote 1 digest(s)", output)
+        self.assertEqual(WeeklyDigest.objects.get(user=self.alice).entries, 99)
+        self.assertEqual(WeeklyDigest.objects.get(user=self.bob).entries, 1)
+
+        generate("--workers", "1", "--force")
+        self.assertEqual(WeeklyDigest.objects.get(user=self.alice).entries, 1)
+        self.assertEqual(WeeklyDigest.objects.count(), 2)
+
+    def test_home_page_shows_last_weeks_digest(self):
+        WeeklyDigest.objects.create(
+            user=self.alice,
+            week_start=digests.last_complete_week(),
+            entries=4,
+            average_rating=3.5,
+            top_moods=[["calm", 3]],
+        )
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse("journal:home"))
+        self.assertEqual(response.context["digest"].entries, 4)
+        self.assertContains(response, "average mood 3.5/5")
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "worker processes need a shared database"
+)
+class ProcessPoolDigestTests(TransactionTestCase):
+    def setUp(self):
+        if multiprocessing.current_process().daemon:
+            self.skipTest("daemon processes cannot start a process pool")
+
+    def test_workers_generate_every_digest(self):
+        for i in range(10):
+            user = User.objects.create_user(username=f"p{i}", password="pw")
+            make_entry(user, i % 7, mood_rating=i % 5 + 1)
+        output = generate("--workers", "2", "--chunk-size", "3")
+        self.assertIn("Wrote 10 digest(s)", output)
+        self.assertEqual(WeeklyDigest.objects.filter(week_start=WEEK).count(), 10)
@@ -0,0 +1,238 @@
+"""Tests for the database-backed job queue, run_worker and job status views.
+
+The concurrent worker test only runs against PostgreSQL, where
+`SKIP LOCKED` lets several threads share the queue.
+"""
+
+import datetime
+import threading
+import unittest
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from journal import jobs
+from journal.models import EntryCounter, Job
+
+User = get_user_model()
+
+calls = []
+calls_lock = threading.Lock()
+
+
+@jobs.task("tests.record")
+def record(value):
+    with calls_lock:
+        calls.append(value)
+    return {"value": value}
+
+
+@jobs.task("tests.explode")
+def explode():
+    raise RuntimeError("boom")
+
+
+@jobs.task("tests.unserialisable")
+def unserialisable():
+    with calls_lock:
+        calls.append("ran")
+    return object()
+
+
+def run_worker(*args):
+    call_command("run_worker", "--burst", *args, stdout=StringIO())
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_unknown_task_rejected(self):
+        with self.assertRaises(ValueError):
+            jobs.enqueue("tests.missing")
+
+    def test_worker_runs_job_and_stores_result(self):
+        job = jobs.enqueue("tests.record", {"value": 7})
+        run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, {"value": 7})
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(calls, [7])
+
+    def test_jobs_run_in_due_order_and_future_jobs_wait(self):
+        later = timezone.now() + datetime.timedelta(hours=1)
+        jobs.enqueue("tests.record", {"value": "later"}, run_at=later)
+        jobs.enqueue("tests.record", {"value": "first"})
+        jobs.enqueue("tests.record", {"value": "second"})
+        run_worker()
+        self.assertEqual(calls, ["first", "second"])
+
+    def test_failures_back_off_then_fail(self):
+        job = jobs.enqueue("tests.explode", max_attempts=2)
+        run_worker("--backoff", "60")
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn("RuntimeError: boom", job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + datetime.timedelta(seconds=50))
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = jobs.enqueue("tests.record", {"value": 1})
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING,
+            attempts=1,
+            started_at=timezone.now() - datetime.timedelta(hours=2),
+        )
+        run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_running_jobs_with_a_recent_heartbeat_are_left_alone(self):
+        job = jobs.enqueue("tests.record", {"value": 1})
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING,
+            attempts=1,
+            started_at=timezone.now() - datetime.timedelta(hours=2),
+            heartbeat_at=timezone.now() - datetime.timedelta(seconds=10),
+        )
+        run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertEqual(calls, [])
+
+    def test_unstorable_result_fails_job_without_retry(self):
+        job = jobs.enqueue("tests.unserialisable", max_attempts=3)
+        run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNone(job.result)
+        self.assertIn("TypeError", job.last_error)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(calls, ["ran"])
+
+    def test_builtin_rebuild_task(self):
+        user = User.objects.create_user(username="jobs", password="pw")
+        jobs.enqueue("journal.rebuild_counters", {"user_ids": [user.pk]})
+        run_worker()
+        self.assertEqual(Job.objects.get().status, Job.SUCCEEDED)
+        self.assertEqual(EntryCounter.totals_for(user)["entries"], 0)
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "SKIP LOCKED requires PostgreSQL"
+)
+class ConcurrentWorkerTests(TransactionTestCase):
+    def test_each_job_runs_exactly_once(self):
+        calls.clear()
+        for i in range(30):
+            jobs.enqueue("tests.record", {"value": i})
+        run_worker("--concurrency", "4")
+        self.assertEqual(sorted(calls), list(range(30)))
+        self.assertEqual(
+            Job.objects.filter(status=Job.SUCCEEDED).count(), 30
+        )
+        self.assertGreater(
+            Job.objects.values("worker").distinct().count(), 1
+        )
+
+
+class HeartbeatTests(TransactionTestCase):
+    # The heartbeat thread has its own connection, so the job row must be
+    # committed for it to see it.
+    def test_heartbeat_stamps_running_job(self):
+        jobs.enqueue("tests.record", {"value": 1})
+        job = jobs.claim("test-worker")
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=None)
+        with jobs.heartbeat(job, interval=0.01):
+            deadline = timezone.now() + datetime.timedelta(seconds=5)
+            while timezone.now() < deadline:
+                job.refresh_from_db()
+                if job.heartbeat_at is not None:
+                    break
+        self.assertIsNotNone(job.heartbeat_at)
+
+
+class JobStatusViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", password="pw")
+        self.other = User.objects.create_user(username="other", password="pw")
+        self.job = jobs.enqueue("tests.explode", user=self.user)
+        Job.objects.filter(pk=self.job.pk).update(last_error="Traceback ...")
+        self.detail_url = reverse("journal:api_job_detail", kwargs={"pk": self.job.pk})
+
+    def test_list_shows_only_own_jobs(self):
+        jobs.enqueue("tests.record", {"value": 1}, user=self.other)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("journal:job_list"))
+        self.assertEqual([j.pk for j in response.context["jobs"]], [self.job.pk])
+
+    def test_detail_for_owner_hides_error(self):
+        self.client.force_login(self.user)
+        body = self.client.get(self.detail_url).json()
+        self.assertEqual(body["status"], Job.QUEUED)
+        self.assertNotIn("last_error", body)
+
+    def test_detail_404_for_other_user(self):
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+
+    def test_staff_see_any_job_and_its_error(self):
+        self.other.is_staff = True
+        self.other.save()
+        self.client.force_login(self.other)
+        body = self.client.get(self.detail_url).json()
+        self.assertEqual(body["last_error"], "Traceback ...")
+
+
+class JobAdminTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser(
+            username="admin", password="pw", email="admin@example.com"
+        )
+        self.client.force_login(admin)
+
+    def retry(self, *selected):
+        return self.client.post(
+            reverse("admin:journal_job_changelist"),
+            {"action": "retry_jobs", "_selected_action": [j.pk for j in selected]},
+        )
+
+    def test_retry_requeues_only_failed_jobs(self):
+        failed = jobs.enqueue("tests.explode")
+        Job.objects.filter(pk=failed.pk).update(
+            status=Job.FAILED,
+            attempts=3,
+            last_error="Traceback ...",
+            finished_at=timezone.now(),
+        )
+        succeeded = jobs.enqueue("tests.record", {"value": 1})
+        Job.objects.filter(pk=succeeded.pk).update(
+            status=Job.SUCCEEDED, attempts=1, result={"value": 1}
+        )
+        running = jobs.enqueue("tests.record", {"value": 2})
+        Job.objects.filter(pk=running.pk).update(status=Job.RUNNING, attempts=1)
+
+        self.retry(failed, succeeded, running)
+
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, Job.QUEUED)
+        self.assertEqual(failed.attempts, 0)
+        self.assertEqual(failed.last_error, "")
+        self.assertIsNone(failed.finished_at)
+        statuses = Job.objects.in_bulk([succeeded.pk, running.pk])
+        self.assertEqual(statuses[succeeded.pk].status, Job.SUCCEEDED)
+        self.assertEqual(statuses[succeeded.pk].result, {"value": 1})
+        self.assertEqual(statuses[running.pk].status, Job.RUNNING)
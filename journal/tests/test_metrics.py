@@ -0,0 +1,115 @@
+"""Tests for the Prometheus metrics endpoint and its multi-process store."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from journal import metrics
+
+User = get_user_model()
+
+HOME = ("journal_http_requests_total", (("status", "200"), ("view", "journal:home")))
+
+
+def counter(key):
+    return metrics.collect()["counters"].get(key, 0)
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+class MetricsEndpointTests(TestCase):
+    def test_scrape_reports_requests(self):
+        before = counter(HOME)
+        self.client.get(reverse("journal:home"))
+        self.client.get(reverse("journal:home"))
+        self.assertEqual(counter(HOME), before + 2)
+
+        with override_settings(METRICS_TRUST_LOCALHOST=True):
+            response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn("# TYPE journal_http_request_duration_seconds histogram", body)
+        self.assertIn(
+            'journal_http_request_duration_seconds_bucket{view="journal:home",le="+Inf"}',
+            body,
+        )
+        self.assertIn('journal_db_queries_per_request_count{view="journal:home"}', body)
+        self.assertIn("journal_db_connections_opened_total", body)
+
+    def test_cache_hits_and_misses(self):
+        user = User.objects.create_user(username="metrics", password="pw")
+        self.client.force_login(user)
+        hit = ("journal_cache_requests_total", (("cache", "heatmap"), ("result", "hit")))
+        before = counter(hit)
+        self.client.get(reverse("journal:calendar"))
+        self.client.get(reverse("journal:calendar"))
+        self.assertEqual(counter(hit), before + 1)
+
+    def test_remote_scrape_needs_token_or_staff(self):
+        remote = {"REMOTE_ADDR": "203.0.113.9"}
+        self.assertEqual(self.client.get("/metrics", **remote).status_code, 403)
+        with override_settings(METRICS_TOKEN="s3cret"):
+            response = self.client.get(
+                "/metrics", HTTP_AUTHORIZATION="Bearer s3cret", **remote
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+        staff = User.objects.create_user(username="ops", password="pw", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get("/metrics", **remote).status_code, 200)
+
+    def test_localhost_is_trusted_only_when_enabled(self):
+        # The test client's REMOTE_ADDR is 127.0.0.1, as it is for every
+        # request a local reverse proxy forwards.
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        with override_settings(METRICS_TRUST_LOCALHOST=True):
+            self.assertEqual(self.client.get("/metrics").status_code, 200)
+            remote = {"REMOTE_ADDR": "203.0.113.9"}
+            self.assertEqual(self.client.get("/metrics", **remote).status_code, 403)
+
+
+class MultiProcessMetricsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        override = override_settings(METRICS_DIR=self.directory)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def write_snapshot(self, pid, requests):
+        snapshot = {
+            "counters": [[HOME[0], dict(HOME[1]), requests]],
+            "histograms": [
+                [
+                    "journal_db_queries_per_request",
+                    {"view": "journal:home"},
+                    [0, 1, 1, 1, 1, 1, 1, 1, 2, 1],
+                ]
+            ],
+        }
+        with open(os.path.join(self.directory, f"{pid}.json"), "w") as handle:
+            json.dump(snapshot, handle)
+
+    def test_processes_are_added_and_exited_ones_archived(self):
+        own = counter(HOME)
+        self.write_snapshot(os.getppid(), 5)
+        self.write_snapshot(dead_pid(), 7)
+        self.assertEqual(counter(HOME), own + 12)
+        files = sorted(os.listdir(self.directory))
+        self.assertIn("archived.json", files)
+        self.assertIn(f"{os.getppid()}.json", files)
+        self.assertIn(f"{os.getpid()}.json", files)
+        # Archiving is idempotent: the dead process is not counted twice.
+        self.assertEqual(counter(HOME), own + 12)
@@ -1,15 +1,34 @@
 """Unit tests for journal models: Entry, GratitudeItem, and Quote.
 
 Tests cover string representations, field validators, Meta ordering,
-and cascade-delete behaviour.
+cascade-delete behaviour, and the denormalised fields and counters kept
+in sync on write.
 """
 
+import datetime
+import threading
+import unittest
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase
 from django.utils import timezone
 
-from journal.models import Entry, GratitudeItem, Quote
+from journal.models import (
+    ChangeSequence,
+    Entry,
+    EntryCounter,
+    EntryTombstone,
+    GratitudeItem,
+    Quote,
+    StreakRun,
+    quote_text_hash,
+)
 
 User = get_user_model()
 
@@ -159,6 +178,344 @@ class GratitudeItemCascadeDeleteTests(TestCase):
         self.assertEqual(GratitudeItem.objects.get().item_text, "Keep this")
 
 
+class EntryGratitudeSyncTests(TestCase):
+    """Entry.gratitude should mirror the entry's GratitudeItem rows."""
+
+    def setUp(self):
+        self.entry = make_entry(make_user())
+
+    def test_defaults_to_empty_list(self):
+        self.assertEqual(self.entry.gratitude, [])
+
+    def test_item_create_appends_text(self):
+        GratitudeItem.objects.create(entry=self.entry, item_text="Tea")
+        GratitudeItem.objects.create(entry=self.entry, item_text="Rain")
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.gratitude, ["Tea", "Rain"])
+
+    def test_item_update_replaces_text(self):
+        item = GratitudeItem.objects.create(entry=self.entry, item_text="Tea")
+        item.item_text = "Coffee"
+        item.save()
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.gratitude, ["Coffee"])
+
+    def test_item_moved_to_another_entry_updates_both(self):
+        other = make_entry(make_user("other"))
+        item = GratitudeItem.objects.create(entry=self.entry, item_text="Tea")
+        self.entry.refresh_from_db()
+        before = self.entry.change_seq
+        item.entry = other
+        item.save()
+        self.entry.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.entry.gratitude, [])
+        self.assertGreater(self.entry.change_seq, before)
+        self.assertEqual(other.gratitude, ["Tea"])
+        self.assertEqual(
+            EntryCounter.totals_for(self.entry.user)["gratitude_items"], 0
+        )
+        self.assertEqual(EntryCounter.totals_for(other.user)["gratitude_items"], 1)
+
+    def test_item_delete_removes_text(self):
+        item = GratitudeItem.objects.create(entry=self.entry, item_text="Tea")
+        GratitudeItem.objects.create(entry=self.entry, item_text="Rain")
+        item.delete()
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.gratitude, ["Rain"])
+
+
+class ChangeSequenceTransactionTests(TestCase):
+    """A reserved change_seq must be written in the same transaction."""
+
+    def setUp(self):
+        self.user = make_user()
+        self.entry = make_entry(self.user)
+
+    def sequence(self):
+        return ChangeSequence.current(self.user)[0]
+
+    def test_reserve_and_save_share_a_transaction(self):
+        blocks = []
+        reserve = ChangeSequence.reserve
+
+        def spy(user_id, count=1):
+            blocks.append(transaction.get_connection().savepoint_ids[-1])
+            return reserve(user_id, count)
+
+        with mock.patch.object(ChangeSequence, "reserve", side_effect=spy):
+            before = list(transaction.get_connection().savepoint_ids)
+            self.entry.save()
+        # reserve() ran inside a savepoint opened by save() itself.
+        self.assertEqual(len(blocks), 1)
+        self.assertNotIn(blocks[0], before)
+
+    def test_failed_save_does_not_consume_a_value(self):
+        before = self.sequence()
+        self.entry.title = ""
+        with self.assertRaises(IntegrityError):
+            self.entry.save()
+        self.assertEqual(self.sequence(), before)
+
+    def test_failed_gratitude_sync_does_not_consume_a_value(self):
+        before = self.sequence()
+        update = QuerySet.update
+
+        def fail_entry_update(queryset, **kwargs):
+            if queryset.model is Entry:
+                raise DatabaseError("write failed")
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, "update", fail_entry_update):
+            with self.assertRaises(DatabaseError):
+                self.entry.sync_gratitude()
+        self.assertEqual(self.sequence(), before)
+
+
+class EntryExcerptTests(TestCase):
+    """Entry.excerpt and Entry.word_count are derived from content on save."""
+
+    def setUp(self):
+        self.user = make_user()
+
+    def test_short_content_copied_verbatim(self):
+        entry = make_entry(self.user, content="A quiet morning.")
+        self.assertEqual(entry.excerpt, "A quiet morning.")
+        self.assertEqual(entry.word_count, 3)
+
+    def test_long_content_truncated_to_30_words(self):
+        content = " ".join(f"w{i}" for i in range(100))
+        entry = make_entry(self.user, content=content)
+        self.assertEqual(len(entry.excerpt.split()), 31)  # 30 words + "…"
+        self.assertTrue(entry.excerpt.endswith(" …"))
+        self.assertEqual(entry.word_count, 100)
+
+    def test_content_update_refreshes_excerpt(self):
+        entry = make_entry(self.user, content="Before.")
+        entry.content = "After the update."
+        entry.save(update_fields=["content"])
+        entry.refresh_from_db()
+        self.assertEqual(entry.excerpt, "After the update.")
+        self.assertEqual(entry.word_count, 3)
+
+    def test_backfill_command_repairs_stale_excerpts(self):
+        entry = make_entry(self.user, content="Fresh words here.")
+        Entry.objects.filter(pk=entry.pk).update(excerpt="", word_count=0)
+        call_command("backfill_excerpts", stdout=StringIO())
+        entry.refresh_from_db()
+        self.assertEqual(entry.excerpt, "Fresh words here.")
+        self.assertEqual(entry.word_count, 3)
+
+
+class EntryCounterTests(TestCase):
+    """EntryCounter rows should track entry and gratitude item writes."""
+
+    def setUp(self):
+        self.user = make_user()
+
+    def totals(self):
+        return EntryCounter.totals_for(self.user)
+
+    def test_new_user_has_zero_totals(self):
+        self.assertEqual(
+            self.totals(),
+            {"entries": 0, "gratitude_items": 0, "moods": {}},
+        )
+
+    def test_entry_create_increments_mood_count(self):
+        make_entry(self.user, mood="calm")
+        make_entry(self.user, mood="calm")
+        make_entry(self.user, mood="sad")
+        totals = self.totals()
+        self.assertEqual(totals["entries"], 3)
+        self.assertEqual(totals["moods"], {"calm": 2, "sad": 1})
+
+    def test_mood_change_moves_counts(self):
+        entry = make_entry(self.user, mood="calm")
+        GratitudeItem.objects.create(entry=entry, item_text="Tea")
+        entry.refresh_from_db()
+        entry.mood = "happy"
+        entry.save()
+        happy = EntryCounter.objects.get(user=self.user, mood="happy")
+        calm = EntryCounter.objects.get(user=self.user, mood="calm")
+        self.assertEqual((happy.entries, happy.gratitude_items), (1, 1))
+        self.assertEqual((calm.entries, calm.gratitude_items), (0, 0))
+
+    def test_gratitude_items_counted(self):
+        entry = make_entry(self.user)
+        item = GratitudeItem.objects.create(entry=entry, item_text="Tea")
+        GratitudeItem.objects.create(entry=entry, item_text="Rain")
+        self.assertEqual(self.totals()["gratitude_items"], 2)
+        item.delete()
+        self.assertEqual(self.totals()["gratitude_items"], 1)
+
+    def test_entry_delete_decrements_entry_and_items(self):
+        entry = make_entry(self.user)
+        GratitudeItem.objects.create(entry=entry, item_text="Tea")
+        entry.refresh_from_db()
+        entry.delete()
+        totals = self.totals()
+        self.assertEqual(totals["entries"], 0)
+        self.assertEqual(totals["gratitude_items"], 0)
+
+    def test_user_delete_removes_counters(self):
+        make_entry(self.user)
+        self.user.delete()
+        self.assertFalse(EntryCounter.objects.exists())
+
+    def test_rebuild_repairs_drift(self):
+        entry = make_entry(self.user, mood="calm")
+        GratitudeItem.objects.create(entry=entry, item_text="Tea")
+        EntryCounter.objects.update(entries=99, gratitude_items=99)
+        EntryCounter.rebuild()
+        totals = self.totals()
+        self.assertEqual(totals["entries"], 1)
+        self.assertEqual(totals["gratitude_items"], 1)
+
+
+class EntryReassignmentTests(TestCase):
+    """Moving an entry to another user moves its derived rows too."""
+
+    def setUp(self):
+        self.old = make_user("old")
+        self.new = make_user("new")
+        self.entry = make_entry(self.old, mood="calm")
+        GratitudeItem.objects.create(entry=self.entry, item_text="Tea")
+        self.entry.refresh_from_db()
+        self.entry.user = self.new
+        self.entry.save()
+
+    def test_counters_move_to_new_user(self):
+        self.assertEqual(
+            EntryCounter.totals_for(self.old),
+            {"entries": 0, "gratitude_items": 0, "moods": {}},
+        )
+        self.assertEqual(
+            EntryCounter.totals_for(self.new),
+            {"entries": 1, "gratitude_items": 1, "moods": {"calm": 1}},
+        )
+
+    def test_streak_day_moves_to_new_user(self):
+        self.assertFalse(StreakRun.objects.filter(user=self.old).exists())
+        self.assertEqual(StreakRun.objects.filter(user=self.new).count(), 1)
+
+    def test_old_user_gets_a_tombstone(self):
+        tombstone = EntryTombstone.objects.get(user=self.old)
+        self.assertEqual(tombstone.entry_id, self.entry.pk)
+        self.assertFalse(EntryTombstone.objects.filter(user=self.new).exists())
+        self.assertEqual(ChangeSequence.current(self.new)[0], self.entry.change_seq)
+
+
+class StreakRunTests(TestCase):
+    """Tests for incrementally maintained journaling streaks."""
+
+    def setUp(self):
+        self.user = make_user()
+        self.today = timezone.localdate()
+
+    def on(self, days_ago, **kwargs):
+        """Create an entry at noon `days_ago` days before today."""
+        day = self.today - datetime.timedelta(days=days_ago)
+        date = timezone.make_aware(datetime.datetime.combine(day, datetime.time(12)))
+        return make_entry(self.user, date=date, **kwargs)
+
+    def runs(self):
+        return list(
+            StreakRun.objects.filter(user=self.user)
+            .order_by("start")
+            .values_list("length", flat=True)
+        )
+
+    def test_consecutive_days_form_one_run(self):
+        for days_ago in (2, 1, 0, 0):
+            self.on(days_ago)
+        self.assertEqual(self.runs(), [3])
+        self.assertEqual(
+            StreakRun.summary(self.user), {"current": 3, "longest": 3}
+        )
+
+    def test_back_dated_entry_merges_runs(self):
+        for days_ago in (5, 4, 2, 1):
+            self.on(days_ago)
+        self.assertEqual(self.runs(), [2, 2])
+        self.on(3)
+        self.assertEqual(self.runs(), [5])
+
+    def test_current_streak_survives_until_a_full_day_is_missed(self):
+        self.on(1)
+        self.assertEqual(StreakRun.summary(self.user)["current"], 1)
+        self.on(5)
+        summary = StreakRun.summary(
+            self.user, today=self.today + datetime.timedelta(days=1)
+        )
+        self.assertEqual(summary, {"current": 0, "longest": 1})
+
+    def test_delete_splits_run_unless_day_has_other_entries(self):
+        entries = [self.on(days_ago) for days_ago in (4, 3, 2, 1, 0)]
+        spare = self.on(2)
+        entries[2].delete()
+        self.assertEqual(self.runs(), [5])
+        spare.delete()
+        self.assertEqual(self.runs(), [2, 2])
+        entries[0].delete()
+        entries[4].delete()
+        self.assertEqual(self.runs(), [1, 1])
+
+    def test_moving_entry_to_another_day(self):
+        self.on(2)
+        moved = self.on(1)
+        moved.date -= datetime.timedelta(days=5)
+        moved.save()
+        self.assertEqual(self.runs(), [1, 1])
+
+    def test_rebuild_matches_incremental_runs(self):
+        for days_ago in (9, 8, 6, 3, 2, 1):
+            self.on(days_ago)
+        self.on(0).delete()
+        expected = list(
+            StreakRun.objects.order_by("start").values_list("start", "end", "length")
+        )
+        StreakRun.objects.all().delete()
+        call_command("recompute_streaks", stdout=StringIO())
+        rebuilt = list(
+            StreakRun.objects.order_by("start").values_list("start", "end", "length")
+        )
+        self.assertEqual(rebuilt, expected)
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "row locking requires PostgreSQL"
+)
+class ConcurrentStreakRunTests(TransactionTestCase):
+    def test_concurrent_adjacent_days_form_one_run(self):
+        user = make_user()
+        start = datetime.date(2025, 3, 1)
+        days = [start + datetime.timedelta(days=i) for i in range(12)]
+        barrier = threading.Barrier(len(days))
+        errors = []
+
+        def add(day):
+            try:
+                barrier.wait()
+                StreakRun.add_day(user.pk, day)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=add, args=(day,)) for day in days]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        runs = StreakRun.objects.filter(user=user).values_list(
+            "start", "end", "length"
+        )
+        self.assertEqual(list(runs), [(days[0], days[-1], len(days))])
+
+
 class QuoteStrTests(TestCase):
     """Tests for Quote.__str__."""
 
@@ -187,3 +544,56 @@ class QuoteStrTests(TestCase):
     def test_str_contains_author(self):
         quote = Quote(text="Wisdom.", author="Plato")
         self.assertIn("Plato", str(quote))
+
+
+class QuoteTextHashTests(TestCase):
+    """Tests for Quote.text_hash deduplication."""
+
+    def test_hash_set_on_save(self):
+        quote = Quote.objects.create(text="Breathe.", author="")
+        self.assertEqual(quote.text_hash, quote_text_hash("Breathe."))
+
+    def test_hash_ignores_case_and_whitespace(self):
+        self.assertEqual(
+            quote_text_hash("Keep  going.\n"), quote_text_hash("keep going.")
+        )
+
+    def test_duplicate_text_rejected(self):
+        Quote.objects.create(text="Same words.")
+        with self.assertRaises(IntegrityError):
+            Quote.objects.create(text="same  WORDS.")
+
+
+class DatabaseConstraintTests(TestCase):
+    """The CHECK constraints from migration 0004 hold at the database level.
+
+    Updates go through `QuerySet.update()`, which skips model validation,
+    so only the database can reject them. Runs on PostgreSQL and SQLite.
+    """
+
+    def setUp(self):
+        self.user = make_user()
+        self.entry = make_entry(self.user)
+        self.item = GratitudeItem.objects.create(entry=self.entry, item_text="Tea")
+        self.quote = Quote.objects.create(text="Be here now.")
+
+    def assertRejected(self, queryset, **values):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            queryset.update(**values)
+
+    def test_entry_constraints(self):
+        entries = Entry.objects.filter(pk=self.entry.pk)
+        self.assertRejected(entries, mood_rating=0)
+        self.assertRejected(entries, mood_rating=6)
+        self.assertRejected(entries, mood="ecstatic")
+        self.assertRejected(entries, title="")
+        self.assertRejected(entries, content="")
+        entries.update(mood_rating=5, mood="calm")
+
+    def test_gratitude_item_text_not_empty(self):
+        self.assertRejected(
+            GratitudeItem.objects.filter(pk=self.item.pk), item_text=""
+        )
+
+    def test_quote_text_not_empty(self):
+        self.assertRejected(Quote.objects.filter(pk=self.quote.pk), text="")
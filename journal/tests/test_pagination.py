@@ -0,0 +1,53 @@
+"""Tests for the count-avoiding paginators in journal.pagination."""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from journal.models import Entry
+from journal.pagination import EstimatedCountPaginator, KnownCountPaginator
+
+User = get_user_model()
+
+
+def make_entries(n):
+    user = User.objects.create_user(username="pager", password="pw")
+    for i in range(n):
+        Entry.objects.create(
+            user=user,
+            date=timezone.now(),
+            mood="calm",
+            mood_rating=3,
+            title=f"Entry {i}",
+            content="Content.",
+        )
+    return Entry.objects.filter(user=user)
+
+
+class KnownCountPaginatorTests(TestCase):
+    def test_uses_supplied_count_without_querying(self):
+        paginator = KnownCountPaginator(Entry.objects.all(), 10, count=25)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 25)
+            self.assertEqual(paginator.num_pages, 3)
+        self.assertFalse(paginator.count_is_estimate)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        self.queryset = make_entries(3)
+
+    def test_exact_count_below_limit(self):
+        paginator = EstimatedCountPaginator(self.queryset, 1, count_limit=5)
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.count_is_estimate)
+
+    def test_count_equal_to_limit_is_exact(self):
+        paginator = EstimatedCountPaginator(self.queryset, 1, count_limit=3)
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.count_is_estimate)
+
+    def test_count_capped_at_limit(self):
+        paginator = EstimatedCountPaginator(self.queryset, 1, count_limit=2)
+        self.assertEqual(paginator.count, 2)
+        self.assertTrue(paginator.count_is_estimate)
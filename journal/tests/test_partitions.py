@@ -0,0 +1,143 @@
+"""Tests for journal.partitions and the manage_partitions command.
+
+Date arithmetic is tested on every backend; the partition DDL tests only
+run against PostgreSQL, where migration 0008 partitions journal_entry.
+"""
+
+import datetime
+import importlib
+import unittest
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from journal import partitions
+from journal.models import Entry, GratitudeItem
+
+User = get_user_model()
+
+requires_postgres = unittest.skipUnless(
+    connection.vendor == "postgresql", "partitioning requires PostgreSQL"
+)
+
+migration_0008 = importlib.import_module("journal.migrations.0008_partition_entry")
+
+
+class MonthHelperTests(TestCase):
+    def test_add_months_rolls_over_year(self):
+        start = datetime.date(2025, 11, 1)
+        self.assertEqual(partitions.add_months(start, 2), datetime.date(2026, 1, 1))
+
+    def test_add_months_negative(self):
+        start = datetime.date(2026, 1, 1)
+        self.assertEqual(partitions.add_months(start, -1), datetime.date(2025, 12, 1))
+
+    def test_migration_window_ignores_stray_old_dates(self):
+        today = datetime.date(2026, 10, 19)
+        months = migration_0008._partition_months(datetime.datetime(1, 1, 1), today)
+        self.assertEqual(len(months), migration_0008.MONTHS_BACK + 1 + 3)
+        self.assertEqual(months[0], datetime.date(2024, 10, 1))
+        self.assertEqual(months[-1], datetime.date(2027, 1, 1))
+
+    def test_migration_window_starts_at_oldest_entry(self):
+        today = datetime.date(2026, 10, 19)
+        first = datetime.datetime(2026, 9, 30)
+        months = migration_0008._partition_months(first, today)
+        self.assertEqual(months[0], datetime.date(2026, 9, 1))
+        empty = migration_0008._partition_months(None, today)
+        self.assertEqual(empty[0], datetime.date(2026, 10, 1))
+
+    def test_partition_name(self):
+        name = partitions.partition_name(datetime.date(2026, 3, 1))
+        self.assertEqual(name, "journal_entry_p2026_03")
+
+
+@requires_postgres
+class PartitionedEntryTableTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="part", password="pw")
+
+    def make_entry(self, date):
+        return Entry.objects.create(
+            user=self.user,
+            date=date,
+            mood="calm",
+            mood_rating=3,
+            title="Partitioned",
+            content="Some content.",
+        )
+
+    def test_entry_table_is_partitioned(self):
+        self.assertTrue(partitions.is_partitioned())
+
+    def test_ensure_partitions_creates_current_month(self):
+        partitions.ensure_partitions(months_ahead=1)
+        names = {name for name, _, _ in partitions.list_partitions()}
+        today = datetime.date.today()
+        self.assertIn(partitions.partition_name(partitions.month_start(today)), names)
+
+    def test_create_partition_moves_rows_out_of_default(self):
+        old = datetime.datetime(2001, 2, 3, tzinfo=datetime.timezone.utc)
+        entry = self.make_entry(old)
+        created = partitions.create_partition(datetime.date(2001, 2, 1))
+        self.assertTrue(created)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id FROM journal_entry_p2001_02")
+            self.assertEqual(cursor.fetchall(), [(entry.pk,)])
+        self.assertTrue(Entry.objects.filter(pk=entry.pk).exists())
+
+    def test_backfill_moves_old_rows_into_monthly_partitions(self):
+        old = datetime.datetime(2001, 3, 9, tzinfo=datetime.timezone.utc)
+        older = datetime.datetime(2001, 1, 20, tzinfo=datetime.timezone.utc)
+        entries = [self.make_entry(old), self.make_entry(older)]
+        created = partitions.backfill_partitions(
+            datetime.date(2001, 1, 15), today=datetime.date(2001, 4, 2)
+        )
+        self.assertEqual(
+            created,
+            [
+                "journal_entry_p2001_01",
+                "journal_entry_p2001_02",
+                "journal_entry_p2001_03",
+            ],
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id FROM journal_entry_p2001_03")
+            self.assertEqual(cursor.fetchall(), [(entries[0].pk,)])
+            cursor.execute("SELECT id FROM journal_entry_p2001_01")
+            self.assertEqual(cursor.fetchall(), [(entries[1].pk,)])
+            cursor.execute(
+                f"SELECT count(*) FROM {partitions.DEFAULT_PARTITION} "
+                "WHERE date < '2001-12-01'"
+            )
+            self.assertEqual(cursor.fetchone(), (0,))
+        detached, _ = partitions.detach_partitions(datetime.date(2001, 4, 1))
+        self.assertIn("journal_entry_p2001_03", detached)
+        self.assertFalse(Entry.objects.filter(pk=entries[0].pk).exists())
+
+    def test_command_rejects_bad_schema_name(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                "manage_partitions",
+                detach_before=datetime.date(2000, 1, 1),
+                archive_schema="bad-name;",
+                stdout=StringIO(),
+            )
+
+    def test_detach_moves_gratitude_items_with_partition(self):
+        old = datetime.datetime(2001, 5, 3, tzinfo=datetime.timezone.utc)
+        entry = self.make_entry(old)
+        GratitudeItem.objects.create(entry=entry, item_text="Archived")
+        partitions.create_partition(datetime.date(2001, 5, 1))
+        detached, _ = partitions.detach_partitions(datetime.date(2001, 6, 1))
+        self.assertEqual(detached, ["journal_entry_p2001_05"])
+        self.assertFalse(GratitudeItem.objects.filter(entry_id=entry.pk).exists())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT item_text FROM journal_entry_p2001_05_gratitudeitem"
+            )
+            self.assertEqual(cursor.fetchall(), [("Archived",)])
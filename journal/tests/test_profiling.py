@@ -0,0 +1,97 @@
+"""Tests for the request profiling middleware and the staff profile browser."""
+
+import pstats
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from journal import profiling
+from journal.middleware import ProfilingMiddleware
+
+User = get_user_model()
+
+
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        settings_override = override_settings(
+            PROFILE_DIR=self.profile_dir, PROFILE_SAMPLE_RATE=1.0, PROFILE_KEEP=3
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class ProfilingMiddlewareTests(ProfilingTestCase):
+    def test_disabled_middleware_is_removed(self):
+        with override_settings(PROFILE_SAMPLE_RATE=0):
+            with self.assertRaises(MiddlewareNotUsed):
+                ProfilingMiddleware(lambda request: HttpResponse())
+
+    def test_sampled_request_is_saved(self):
+        self.client.get(reverse("journal:home"))
+        [profile] = profiling.list_profiles()
+        self.assertEqual(profile["url_name"], "journal.home")
+        stats = pstats.Stats(f"{self.profile_dir}/{profile['name']}")
+        self.assertTrue(stats.total_calls)
+
+    def test_unsampled_requests_are_not_profiled(self):
+        with override_settings(PROFILE_SAMPLE_RATE=0.5):
+            with mock.patch("journal.middleware.random.random", return_value=0.9):
+                self.client.get(reverse("journal:home"))
+        self.assertEqual(profiling.list_profiles(), [])
+
+    def test_only_newest_profiles_are_kept(self):
+        for _ in range(5):
+            self.client.get(reverse("journal:home"))
+        self.assertEqual(len(profiling.list_profiles()), 3)
+
+
+class ProfileBrowserTests(ProfilingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = User.objects.create_user(
+            username="staff", password="pw", is_staff=True
+        )
+        self.user = User.objects.create_user(username="user", password="pw")
+        for ms, name in ((120, "journal.home"), (900, "journal.entry_list")):
+            path = f"{self.profile_dir}/{ms}ms-{name}-20260101T120000000000-42.prof"
+            with open(path, "wb") as handle:
+                handle.write(b"profile")
+
+    def test_staff_see_slowest_first(self):
+        self.client.force_login(self.staff)
+        with override_settings(PROFILE_SAMPLE_RATE=0):
+            response = self.client.get(reverse("journal:profile_list"))
+        names = [p["url_name"] for p in response.context["profiles"]]
+        self.assertEqual(names, ["journal.entry_list", "journal.home"])
+        self.assertContains(response, "900 ms")
+
+    def test_small_sample_rates_are_not_rounded_away(self):
+        self.client.force_login(self.staff)
+        with override_settings(PROFILE_SAMPLE_RATE=0.001):
+            response = self.client.get(reverse("journal:profile_list"))
+        self.assertContains(response, "Profiling 0.1% of requests.")
+
+    def test_download(self):
+        self.client.force_login(self.staff)
+        name = "120ms-journal.home-20260101T120000000000-42.prof"
+        response = self.client.get(reverse("journal:profile_download", args=[name]))
+        self.assertEqual(b"".join(response.streaming_content), b"profile")
+        self.assertIn("attachment", response["Content-Disposition"])
+
+    def test_invalid_name_is_404(self):
+        self.client.force_login(self.staff)
+        url = reverse("journal:profile_download", args=["..settings.py"])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_non_staff_forbidden(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("journal:profile_list"))
+        self.assertEqual(response.status_code, 403)
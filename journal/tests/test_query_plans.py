@@ -0,0 +1,201 @@
+"""Query plan regression tests for the hot queries (PostgreSQL only).
+
+Each test runs `EXPLAIN (FORMAT JSON)` on a queryset built the way the
+view builds it, against a seeded and analysed table, and checks that the
+plan uses the specific index meant to serve it. The planner runs with its
+normal settings on a table large enough (a year of daily entries for each
+of 30 users) that a sequential scan or a worse index loses on cost, so a
+model or migration change that drops or breaks an index fails here rather
+than in production. `journal_entry` is partitioned, so partition indexes
+are mapped back to the index they were created from; partitions with no
+rows are skipped by the sequential scan check, since scanning an empty
+table is the cheapest plan there is.
+"""
+
+import datetime
+import json
+import unittest
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from journal import quotes
+from journal.admin import EntryAdmin
+from journal.models import MOOD_CHOICES, Entry, Quote
+from journal.views import EntryDetailView, EntryListView
+
+User = get_user_model()
+
+
+def plan_nodes(plan):
+    """Yield every node of an EXPLAIN JSON plan tree."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def root_index(name):
+    """Return the partitioned-table index that `name` belongs to, if any."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT parent.relname FROM pg_class child "
+            "JOIN pg_inherits ON pg_inherits.inhrelid = child.oid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE child.relname = %s",
+            [name],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else name
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "query plans are PostgreSQL-specific"
+)
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(username=f"planner{i}", password="pw")
+            for i in range(30)
+        ]
+        start = timezone.now() - datetime.timedelta(days=365)
+        Entry.objects.bulk_create(
+            Entry(
+                user=user,
+                date=start + datetime.timedelta(days=day, hours=index),
+                mood=MOOD_CHOICES[day % len(MOOD_CHOICES)][0],
+                mood_rating=day % 5 + 1,
+                title=f"Entry {day}",
+                content="Quiet day.",
+            )
+            for index, user in enumerate(cls.users)
+            for day in range(365)
+        )
+        cls.user = cls.users[0]
+        cls.entry = Entry.objects.filter(user=cls.user).first()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE journal_entry")
+            cursor.execute(
+                "SELECT relname FROM pg_class "
+                "WHERE relname LIKE 'journal_entry%' AND relkind = 'r' "
+                "AND reltuples <= 0"
+            )
+            cls.empty_tables = {row[0] for row in cursor.fetchall()}
+
+    def explain(self, queryset):
+        """Return the plan nodes of `queryset`."""
+        [result] = json.loads(queryset.explain(format="json"))
+        return list(plan_nodes(result["Plan"]))
+
+    def explain_sql(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            [result] = cursor.fetchone()[0]
+        return list(plan_nodes(result["Plan"]))
+
+    def assertNoEntrySeqScan(self, nodes):
+        scanned = [
+            node["Relation Name"]
+            for node in nodes
+            if node["Node Type"] == "Seq Scan"
+            and node["Relation Name"].startswith("journal_entry")
+            and node["Relation Name"] not in self.empty_tables
+        ]
+        self.assertEqual(scanned, [], "sequential scan on journal_entry")
+
+    def indexes_used(self, nodes):
+        return {
+            root_index(node["Index Name"]) for node in nodes if "Index Name" in node
+        }
+
+    def view_queryset(self, view_class, query=None, **kwargs):
+        request = RequestFactory().get("/", query or {})
+        request.user = self.user
+        view = view_class()
+        view.setup(request, **kwargs)
+        return view.get_queryset()
+
+    def test_entry_list_page(self):
+        queryset = self.view_queryset(EntryListView)
+        nodes = self.explain(queryset[:10])
+        self.assertNoEntrySeqScan(nodes)
+        self.assertIn("entry_user_date_idx", self.indexes_used(nodes))
+
+    def test_entry_list_search(self):
+        queryset = self.view_queryset(EntryListView, {"search": "quiet"})
+        nodes = self.explain(queryset[:10])
+        self.assertNoEntrySeqScan(nodes)
+        # The user's newest rows are read in date order until ten match.
+        self.assertIn("entry_user_date_idx", self.indexes_used(nodes))
+
+    def test_entry_list_mood_filter(self):
+        queryset = self.view_queryset(EntryListView, {"search": "mood:calm"})
+        nodes = self.explain(queryset[:10])
+        self.assertNoEntrySeqScan(nodes)
+        self.assertIn("entry_user_mood_date_idx", self.indexes_used(nodes))
+
+    def test_entry_list_rating_filter(self):
+        queryset = self.view_queryset(EntryListView, {"search": "rating:5"})
+        nodes = self.explain(queryset[:10])
+        self.assertNoEntrySeqScan(nodes)
+        self.assertIn("entry_user_rating_date_idx", self.indexes_used(nodes))
+
+    def test_entry_list_date_range(self):
+        queryset = self.view_queryset(
+            EntryListView, {"search": "date:2020-01..2099-12 mood:sad"}
+        )
+        nodes = self.explain(queryset[:10])
+        self.assertNoEntrySeqScan(nodes)
+        self.assertIn("entry_user_mood_date_idx", self.indexes_used(nodes))
+
+    def test_admin_entry_search(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                self.skipTest("pg_trgm is not installed")
+        request = RequestFactory().get("/")
+        request.user = self.user
+        model_admin = EntryAdmin(Entry, admin.site)
+        queryset, _ = model_admin.get_search_results(
+            request, Entry.objects.all(), "needle"
+        )
+        nodes = self.explain(queryset.order_by())
+        self.assertNoEntrySeqScan(nodes)
+        self.assertTrue(
+            {"journal_entry_title_trgm", "journal_entry_content_trgm"}
+            <= self.indexes_used(nodes)
+        )
+
+    def test_entry_detail(self):
+        queryset = self.view_queryset(EntryDetailView, pk=self.entry.pk)
+        nodes = self.explain(queryset.filter(pk=self.entry.pk))
+        self.assertNoEntrySeqScan(nodes)
+        self.assertIn("journal_entry_pkey", self.indexes_used(nodes))
+
+    def test_home_quote_of_the_day(self):
+        Quote.objects.create(text="Plans are nothing; planning is everything.")
+        cache.clear()
+        quotes.get_pool()  # pools are loaded once per process, not per request
+        nodes = []
+        for sql, params in captured_queries(quotes.quote_of_the_day, self.user):
+            nodes += self.explain_sql(sql, params)
+        self.assertNoEntrySeqScan(nodes)
+        # The quote table is tiny, so reading it directly is fine.
+        self.assertIn("entry_user_date_idx", self.indexes_used(nodes))
+
+
+def captured_queries(func, *args):
+    """Return the `(sql, params)` of every query `func(*args)` runs."""
+    captured = []
+
+    def capture(execute, sql, params, many, context):
+        captured.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(capture):
+        func(*args)
+    return captured
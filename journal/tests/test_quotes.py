@@ -0,0 +1,204 @@
+"""Tests for the load_quotes command and mood-aware quote selection."""
+
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from journal import quotes
+from journal.models import Entry, Quote, QuoteMood
+
+User = get_user_model()
+
+
+class LoadQuotesTests(TestCase):
+    def write(self, suffix, content):
+        handle = tempfile.NamedTemporaryFile(
+            "w", suffix=suffix, delete=False, encoding="utf-8", newline=""
+        )
+        with handle:
+            handle.write(content)
+        self.addCleanup(os.unlink, handle.name)
+        return handle.name
+
+    def load(self, path, *args):
+        out = StringIO()
+        call_command("load_quotes", path, *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def tags(self, text):
+        return set(
+            QuoteMood.objects.filter(quote__text=text).values_list("mood", flat=True)
+        )
+
+    def test_csv_load_is_idempotent(self):
+        Quote.objects.all().delete()
+        path = self.write(
+            ".csv",
+            "text,author,moods\n"
+            "Rest is productive.,Someone,calm;sad\n"
+            "Small steps count.,,\n"
+            "rest is   productive.,Copycat,happy\n"
+            ",Nobody,\n",
+        )
+        output = self.load(path)
+        self.assertIn("added 2 quote(s), 1 duplicate(s), 1 skipped", output)
+        self.assertEqual(Quote.objects.get(text="Rest is productive.").author, "Someone")
+        self.assertEqual(self.tags("Rest is productive."), {"calm", "sad", "happy"})
+
+        output = self.load(path)
+        self.assertIn("added 0 quote(s)", output)
+        self.assertEqual(Quote.objects.count(), 2)
+        self.assertEqual(QuoteMood.objects.count(), 3)
+
+    def test_jsonl_with_default_mood(self):
+        existing = Quote.objects.create(text="Already here.")
+        lines = [
+            {"text": "Already here.", "moods": ["anxious"]},
+            {"text": "New one.", "author": "A", "mood": "unknown"},
+        ]
+        path = self.write(".jsonl", "\n".join(json.dumps(r) for r in lines) + "\n\n")
+        self.load(path, "--mood", "stressed")
+        self.assertEqual(self.tags(existing.text), {"anxious", "stressed"})
+        self.assertEqual(self.tags("New one."), {"stressed"})
+
+    def test_queries_per_batch_not_per_quote(self):
+        rows = "".join(f"Quote number {i}.,Author\n" for i in range(50))
+        path = self.write(".csv", "text,author\n" + rows)
+        with CaptureQueriesContext(connection) as ctx:
+            self.load(path, "--batch-size", "25", "--mood", "calm")
+        statements = [
+            q for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]
+        ]
+        # Two counts, then an insert, an id lookup and a tag insert per batch.
+        self.assertLessEqual(len(statements), 2 + 2 * 3)
+        self.assertEqual(QuoteMood.objects.filter(mood="calm").count(), 50)
+
+    def test_jsonl_values_of_the_wrong_type_are_skipped(self):
+        lines = [
+            {"text": 5},
+            {"text": ["a list"]},
+            {"text": "Bad author.", "author": {"name": "A"}},
+            {"text": "Bad moods.", "moods": 3},
+            {"text": None},
+            {"text": "Good one.", "author": None},
+        ]
+        path = self.write(".jsonl", "\n".join(json.dumps(r) for r in lines) + "\n")
+        output = self.load(path)
+        self.assertIn("Read 6 record(s): added 1 quote(s)", output)
+        self.assertIn("5 skipped", output)
+        self.assertEqual(Quote.objects.get(text="Good one.").author, "")
+
+    def test_invalid_jsonl_reports_line(self):
+        path = self.write(".jsonl", '{"text": "ok"}\nnot json\n')
+        with self.assertRaisesMessage(CommandError, "Line 2"):
+            self.load(path)
+
+    def test_unknown_extension_needs_format(self):
+        path = self.write(".txt", "text\nHello.\n")
+        with self.assertRaises(CommandError):
+            self.load(path)
+        self.load(path, "--format", "csv")
+        self.assertTrue(Quote.objects.filter(text="Hello.").exists())
+
+
+class QuoteOfTheDayTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Quote.objects.all().delete()
+        self.user = User.objects.create_user(username="reader", password="pw")
+        self.calm = Quote.objects.create(text="Be still.")
+        QuoteMood.objects.create(quote=self.calm, mood="calm")
+        self.sad = Quote.objects.create(text="This too shall pass.")
+        QuoteMood.objects.create(quote=self.sad, mood="sad")
+        self.general = Quote.objects.create(text="Keep going.")
+
+    def write_entry(self, mood):
+        Entry.objects.create(
+            user=self.user,
+            date=timezone.now(),
+            mood=mood,
+            mood_rating=3,
+            title="Today",
+            content="Words.",
+        )
+
+    def test_pools_include_untagged_quotes(self):
+        self.assertEqual(quotes.get_pool("calm"), (self.calm.pk, self.general.pk))
+        self.assertEqual(len(quotes.get_pool()), 3)
+        self.assertEqual(len(quotes.get_pool("happy")), 3)
+
+    def test_quote_matches_latest_mood(self):
+        self.write_entry("sad")
+        quote = quotes.quote_of_the_day(self.user)
+        self.assertIn(quote, [self.sad, self.general])
+
+    def test_deterministic_per_user_and_day(self):
+        day = datetime.date(2026, 3, 1)
+        first = quotes.quote_of_the_day(self.user, day)
+        cache.clear()
+        self.assertEqual(quotes.quote_of_the_day(self.user, day), first)
+        picks = {
+            quotes.quote_of_the_day(self.user, day + datetime.timedelta(days=n)).pk
+            for n in range(20)
+        }
+        self.assertGreater(len(picks), 1)
+
+    def test_pick_survives_pool_changes_until_deleted(self):
+        day = datetime.date(2026, 3, 1)
+        first = quotes.quote_of_the_day(self.user, day)
+        for n in range(5):
+            Quote.objects.create(text=f"Another {n}.")
+        self.assertEqual(quotes.quote_of_the_day(self.user, day), first)
+
+        Quote.objects.filter(pk=first.pk).update(text="Edited.")
+        quotes.invalidate_pools()
+        self.assertEqual(quotes.quote_of_the_day(self.user, day).text, "Edited.")
+
+        first_pk = first.pk
+        first.delete()
+        replacement = quotes.quote_of_the_day(self.user, day)
+        self.assertIsNotNone(replacement)
+        self.assertNotEqual(replacement.pk, first_pk)
+
+    def test_new_tags_refresh_pools(self):
+        quotes.get_pool("calm")
+        QuoteMood.objects.create(quote=self.sad, mood="calm")
+        self.assertIn(self.sad.pk, quotes.get_pool("calm"))
+        self.sad.delete()
+        self.assertNotIn(self.sad.pk, quotes.get_pool("calm"))
+
+    def test_invalidate_after_bulk_insert(self):
+        quotes.get_pool()
+        Quote.objects.bulk_create([Quote(text="Bulk.", text_hash="x")])
+        quotes.invalidate_pools()
+        self.assertEqual(len(quotes.get_pool()), 4)
+
+    def test_home_page_caches_and_adds_one_query_on_miss(self):
+        self.write_entry("calm")
+        self.client.force_login(self.user)
+        url = reverse("journal:home")
+        self.client.get(url)  # warm the pools and the day's quote
+        with CaptureQueriesContext(connection) as cached:
+            response = self.client.get(url)
+        self.assertIn(response.context["quote"], [self.calm, self.general])
+        self.assertFalse(
+            [q for q in cached.captured_queries if "journal_quote" in q["sql"]]
+        )
+
+        quotes.get_pool("calm")
+        with CaptureQueriesContext(connection) as ctx:
+            quotes.quote_of_the_day(self.user, datetime.date(2030, 1, 1))
+        # The latest-mood lookup and the quote's primary key fetch.
+        self.assertEqual(len(ctx.captured_queries), 2)
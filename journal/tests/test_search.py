@@ -0,0 +1,113 @@
+"""Tests for the entry search query language (journal.search)."""
+
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from journal.models import Entry, GratitudeItem
+from journal.search import SearchError, parse_search
+
+User = get_user_model()
+
+
+def at(*args):
+    return timezone.make_aware(datetime.datetime(*args))
+
+
+class ParseSearchTests(TestCase):
+    def test_filters_and_text(self):
+        parsed = parse_search('Mood:Calm walk "long day" gratitude:"hot tea"')
+        self.assertEqual(parsed.moods, ["calm"])
+        self.assertEqual(parsed.text, ["walk", "long day"])
+        self.assertEqual(len(parsed.predicates), 1)
+
+    def test_unknown_keys_are_text(self):
+        self.assertEqual(parse_search("note:x").text, ["note:x"])
+        self.assertEqual(parse_search("mood:").text, ["mood:"])
+
+    def test_invalid_values_raise(self):
+        for search in (
+            "mood:ecstatic",
+            "rating:6",
+            "rating:>=x",
+            "date:2025-13",
+            "date:yesterday",
+            "date:..",
+        ):
+            with self.subTest(search), self.assertRaises(SearchError):
+                parse_search(search)
+
+
+@override_settings(TIME_ZONE="UTC")
+class SearchQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="seeker", password="pw")
+        rows = [
+            ("Winter walk", "calm", 4, at(2025, 1, 10, 9)),
+            ("Deadline", "stressed", 2, at(2025, 2, 28, 23, 30)),
+            ("Spring", "calm", 5, at(2025, 4, 1, 0, 0)),
+            ("New year", "happy", 3, at(2024, 12, 31, 12)),
+        ]
+        cls.entries = {
+            title: Entry.objects.create(
+                user=cls.user,
+                title=title,
+                content=f"{title} notes.",
+                mood=mood,
+                mood_rating=rating,
+                date=date,
+            )
+            for title, mood, rating, date in rows
+        }
+        GratitudeItem.objects.create(
+            entry=cls.entries["Deadline"], item_text="Strong coffee"
+        )
+        for text in ("Warm tea", "Cake"):
+            GratitudeItem.objects.create(entry=cls.entries["Spring"], item_text=text)
+
+    def titles(self, search):
+        q = parse_search(search).to_q()
+        entries = Entry.objects.filter(user=self.user).filter(q)
+        return set(entries.values_list("title", flat=True))
+
+    def test_mood(self):
+        self.assertEqual(self.titles("mood:calm"), {"Winter walk", "Spring"})
+        self.assertEqual(
+            self.titles("mood:calm mood:happy"), {"Winter walk", "Spring", "New year"}
+        )
+
+    def test_rating(self):
+        self.assertEqual(self.titles("rating:>=4"), {"Winter walk", "Spring"})
+        self.assertEqual(self.titles("rating:<3"), {"Deadline"})
+        self.assertEqual(self.titles("rating:3"), {"New year"})
+        self.assertEqual(
+            self.titles("rating:4..2"), {"Winter walk", "Deadline", "New year"}
+        )
+
+    def test_dates(self):
+        self.assertEqual(self.titles("date:2025-02"), {"Deadline"})
+        self.assertEqual(
+            self.titles("date:2025-01..2025-03"), {"Winter walk", "Deadline"}
+        )
+        self.assertEqual(self.titles("date:2025-04.."), {"Spring"})
+        self.assertEqual(self.titles("date:..2024"), {"New year"})
+        self.assertEqual(self.titles("date:2025-01-10"), {"Winter walk"})
+
+    def test_gratitude_and_text(self):
+        self.assertEqual(self.titles('gratitude:"coffee"'), {"Deadline"})
+        self.assertEqual(self.titles("coffee"), {"Deadline"})
+        self.assertEqual(self.titles("walk notes"), {"Winter walk"})
+        self.assertEqual(self.titles("mood:calm spring rating:5"), {"Spring"})
+
+    def test_gratitude_matches_items_not_their_json(self):
+        # Every entry's list serialises with `[`, `]` and (with two items)
+        # `", "`; `["Warm tea", "Cake"]` also contains `tea"`.
+        searches = (",", "[", "]", 'tea"', 'tea",', "gratitude:[", "gratitude:,")
+        for search in searches:
+            with self.subTest(search):
+                self.assertEqual(self.titles(search), set())
+        self.assertEqual(self.titles('gratitude:"tea, cake"'), set())
+        self.assertEqual(self.titles("gratitude:cake"), {"Spring"})
@@ -0,0 +1,65 @@
+"""Tests for the Server-Timing header added by ServerTimingMiddleware."""
+
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from journal.middleware import ServerTimingMiddleware
+from journal.models import Entry
+
+User = get_user_model()
+
+METRIC = re.compile(r'(\w+);dur=([\d.]+);desc="([^"]*)"')
+
+
+def parse(header):
+    return {name: (float(dur), desc) for name, dur, desc in METRIC.findall(header)}
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="timed", password="pw")
+        Entry.objects.create(
+            user=self.user,
+            date=timezone.now(),
+            mood="calm",
+            mood_rating=4,
+            title="Timed",
+            content="Searchable words.",
+        )
+        self.client.force_login(self.user)
+
+    def test_entry_list_breakdown(self):
+        response = self.client.get(
+            reverse("journal:entry_list"), {"search": "words"}
+        )
+        metrics = parse(response["Server-Timing"])
+        self.assertEqual(
+            set(metrics), {"mw", "view", "tpl", "db", "total"}
+        )
+        self.assertEqual(metrics["tpl"][1], "journal/entry_list.html")
+        self.assertRegex(metrics["db"][1], r"^[1-9]\d* queries$")
+        parts = metrics["mw"][0] + metrics["view"][0] + metrics["tpl"][0]
+        self.assertLessEqual(parts, metrics["total"][0] + 0.5)
+
+    def test_non_template_response(self):
+        response = self.client.get(reverse("journal:api_entry_list"))
+        metrics = parse(response["Server-Timing"])
+        self.assertIn("view", metrics)
+        self.assertNotIn("tpl", metrics)
+
+    def test_redirect_before_view_has_no_view_metric(self):
+        self.client.logout()
+        response = self.client.get("/entries")  # APPEND_SLASH redirect
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(set(parse(response["Server-Timing"])), {"mw", "db", "total"})
+
+    def test_can_be_disabled(self):
+        with override_settings(SERVER_TIMING=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                ServerTimingMiddleware(lambda request: HttpResponse())
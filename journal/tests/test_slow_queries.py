@@ -0,0 +1,93 @@
+"""Tests for the slow query log (journal.slow_queries)."""
+
+import json
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from journal import jobs, slow_queries
+from journal.middleware import SlowQueryMiddleware
+from journal.models import Entry
+
+User = get_user_model()
+
+# Every query counts as slow.
+EVERYTHING = 1e-9
+
+
+def records(logs):
+    return [json.loads(message.split(":", 2)[2]) for message in logs.output]
+
+
+@override_settings(SLOW_QUERY_MS=EVERYTHING)
+class SlowQueryLogTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(
+            slow_queries, "limiter", slow_queries.RateLimiter(rate=0, burst=1000)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(username="slow", password="pw")
+
+    def test_request_queries_carry_url_name_and_path(self):
+        self.client.force_login(self.user)
+        with self.assertLogs("journal.slow_queries", "WARNING") as logs:
+            self.client.get(reverse("journal:entry_list"), {"search": "needle"})
+        logged = records(logs)
+        self.assertTrue(logged)
+        for record in logged:
+            self.assertEqual(record["source"], "journal:entry_list")
+            self.assertEqual(record["path"], "/entries/")
+        self.assertTrue(any("journal_entry" in r["sql"] for r in logged))
+        # Parameters are fingerprinted, never logged.
+        self.assertFalse(any("needle" in json.dumps(r) for r in logged))
+
+    def test_frame_points_at_calling_code(self):
+        with self.assertLogs("journal.slow_queries", "WARNING") as logs:
+            with slow_queries.log_slow_queries("shell"):
+                Entry.objects.filter(user=self.user).count()
+        [record] = records(logs)
+        self.assertEqual(record["source"], "shell")
+        self.assertRegex(
+            record["frame"],
+            r"^journal/tests/test_slow_queries\.py:\d+ in test_frame_points_at_calling_code$",
+        )
+        self.assertEqual(len(record["params"]), 12)
+
+    def test_jobs_are_attributed(self):
+        jobs.enqueue("journal.rebuild_counters", {"user_ids": [self.user.pk]})
+        with self.assertLogs("journal.slow_queries", "WARNING") as logs:
+            call_command("run_worker", "--burst", stdout=StringIO())
+        sources = {record["source"] for record in records(logs)}
+        self.assertIn("job:journal.rebuild_counters", sources)
+
+    def test_fast_queries_are_not_logged(self):
+        with override_settings(SLOW_QUERY_MS=60_000):
+            with self.assertNoLogs("journal.slow_queries"):
+                with slow_queries.log_slow_queries("shell"):
+                    Entry.objects.count()
+
+    def test_disabled(self):
+        with override_settings(SLOW_QUERY_MS=0):
+            with self.assertRaises(MiddlewareNotUsed):
+                SlowQueryMiddleware(lambda request: HttpResponse())
+
+
+class RateLimiterTests(TestCase):
+    def test_burst_then_refill_reports_suppressed(self):
+        clock = mock.Mock(return_value=100.0)
+        with mock.patch("journal.slow_queries.time.monotonic", clock):
+            limiter = slow_queries.RateLimiter(rate=1, burst=2)
+            self.assertEqual(limiter.take(), 0)
+            self.assertEqual(limiter.take(), 0)
+            self.assertIsNone(limiter.take())
+            self.assertIsNone(limiter.take())
+            clock.return_value = 101.0
+            self.assertEqual(limiter.take(), 2)
+            self.assertIsNone(limiter.take())
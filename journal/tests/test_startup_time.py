@@ -0,0 +1,65 @@
+"""Tests for the startup_time command and the lean settings profiles."""
+
+import importlib
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from journal.management.commands.startup_time import by_package, parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     django.utils.version
+import time:       300 |        420 |   django.utils
+import time:       500 |        920 | django
+Some other output on stderr
+import time:        80 |         80 | journal.models
+"""
+
+
+class ImportTimeParsingTests(SimpleTestCase):
+    def test_parse(self):
+        rows = parse_importtime(IMPORTTIME)
+        self.assertEqual(rows[0], ("django.utils.version", 120, 120, 2))
+        self.assertEqual(rows[2], ("django", 500, 920, 0))
+        self.assertEqual(len(rows), 4)
+
+    def test_self_time_is_summed_per_package(self):
+        packages = by_package(parse_importtime(IMPORTTIME))
+        self.assertEqual(packages, {"django": 920, "journal": 80})
+
+
+class StartupTimeCommandTests(SimpleTestCase):
+    def test_wsgi_with_lean_profile(self):
+        out = StringIO()
+        call_command(
+            "startup_time",
+            "--profile",
+            "MoodJournal.settings_worker",
+            "--repeat",
+            "1",
+            "--top",
+            "3",
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertIn("wsgi with MoodJournal.settings_worker", lines[0])
+        self.assertRegex(lines[1], r"wall time: median \d+ ms")
+        self.assertRegex(lines[2], r"imports: \d+ ms in \d+ modules")
+        self.assertEqual(len(lines), 6)
+
+    def test_failing_target(self):
+        with self.assertRaisesMessage(CommandError, "no_such_command"):
+            call_command("startup_time", "no_such_command", "--repeat", "1")
+
+
+class LeanSettingsTests(SimpleTestCase):
+    def test_profiles_drop_unused_apps(self):
+        full = importlib.import_module("MoodJournal.settings").INSTALLED_APPS
+        web = importlib.import_module("MoodJournal.settings_web").INSTALLED_APPS
+        worker = importlib.import_module("MoodJournal.settings_worker")
+        self.assertEqual(set(full) - set(web), {"allauth.socialaccount"})
+        self.assertNotIn("django.contrib.admin", worker.INSTALLED_APPS)
+        self.assertIn("allauth.account", worker.INSTALLED_APPS)
+        self.assertEqual(worker.INSTALLED_APPS[-1], "journal")
@@ -13,11 +13,17 @@ EntryDetailView     GET /entries/<pk>/
 EntryCreateView     GET|POST /entries/create/
 EntryUpdateView     GET|POST /entries/<pk>/edit/
 EntryDeleteView     GET|POST /entries/<pk>/delete/
+MoodCalendarView    GET /calendar/[<year>/]
 create_success      GET /entries/create/success/
 """
 
+import datetime
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -84,6 +90,23 @@ class HomeViewTests(TestCase):
         response = self.client.get(reverse("journal:home"))
         self.assertEqual(response.status_code, 200)
 
+    def test_anonymous_home_has_no_progress(self):
+        response = self.client.get(reverse("journal:home"))
+        self.assertNotIn("progress", response.context)
+
+    def test_progress_shown_for_logged_in_user(self):
+        user = make_user()
+        make_entry(user, date=timezone.now() - timezone.timedelta(days=1))
+        make_entry(user)
+        self.client.force_login(user)
+        response = self.client.get(reverse("journal:home"))
+        progress = response.context["progress"]
+        self.assertEqual(progress["current_streak"], 2)
+        self.assertEqual(progress["entries"], 2)
+        self.assertEqual(progress["entry_milestone"], 1)
+        self.assertEqual(progress["entries_to_next_milestone"], 8)
+        self.assertContains(response, "2 days")
+
     def test_uses_correct_template(self):
         response = self.client.get(reverse("journal:home"))
         self.assertTemplateUsed(response, "journal/home.html")
@@ -170,11 +193,24 @@ class EntryListViewTests(TestCase):
         make_entry(self.user, mood="excited")
         make_entry(self.user, mood="sad")
         self.client.force_login(self.user)
-        response = self.client.get(self.url, {"search": "excited"})
+        response = self.client.get(self.url, {"search": "mood:excited"})
         entries = list(response.context["entries"])
         self.assertEqual(len(entries), 1)
         self.assertEqual(entries[0].mood, "excited")
 
+    def test_free_text_does_not_match_mood(self):
+        make_entry(self.user, mood="calm", title="Busy", content="Work.")
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, {"search": "calm"})
+        self.assertEqual(len(response.context["entries"]), 0)
+
+    def test_invalid_filter_shows_error(self):
+        make_entry(self.user)
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, {"search": "rating:9"})
+        self.assertEqual(len(response.context["entries"]), 0)
+        self.assertContains(response, "Cannot read rating")
+
     def test_search_by_gratitude_item(self):
         entry = make_entry(self.user)
         GratitudeItem.objects.create(entry=entry, item_text="Coffee")
@@ -183,12 +219,56 @@ class EntryListViewTests(TestCase):
         response = self.client.get(self.url, {"search": "Coffee"})
         self.assertEqual(len(response.context["entries"]), 1)
 
+    def test_search_matching_several_gratitude_items_returns_entry_once(self):
+        entry = make_entry(self.user)
+        GratitudeItem.objects.create(entry=entry, item_text="Coffee beans")
+        GratitudeItem.objects.create(entry=entry, item_text="Iced coffee")
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, {"search": "coffee"})
+        self.assertEqual(len(response.context["entries"]), 1)
+
+    def test_gratitude_items_rendered_on_cards(self):
+        entry = make_entry(self.user)
+        GratitudeItem.objects.create(entry=entry, item_text="Sunshine")
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertContains(response, "Sunshine")
+
     def test_search_no_match_returns_empty(self):
         make_entry(self.user, title="Normal Entry")
         self.client.force_login(self.user)
         response = self.client.get(self.url, {"search": "zzznomatch"})
         self.assertEqual(len(response.context["entries"]), 0)
 
+    def test_unfiltered_list_does_not_count_entries(self):
+        for i in range(12):
+            make_entry(self.user, title=f"Entry {i}")
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.context["paginator"].count, 12)
+        self.assertEqual(response.context["paginator"].num_pages, 2)
+        counts = [
+            q["sql"] for q in ctx.captured_queries
+            if "COUNT(" in q["sql"].upper() and "journal_entry" in q["sql"]
+        ]
+        self.assertEqual(counts, [])
+
+    def test_list_defers_full_content(self):
+        make_entry(self.user, content="Long text " * 50)
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        entry = response.context["entries"][0]
+        self.assertIn("content", entry.get_deferred_fields())
+        self.assertContains(response, entry.excerpt)
+
+    def test_entry_totals_in_context(self):
+        make_entry(self.user, mood="calm")
+        make_entry(self.other, mood="calm")
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["entry_totals"]["entries"], 1)
+
     def test_search_term_present_in_context(self):
         self.client.force_login(self.user)
         response = self.client.get(self.url, {"search": "hello"})
@@ -199,6 +279,37 @@ class EntryListViewTests(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.context["search"], "")
 
+    def test_fragment_renders_only_cards(self):
+        for i in range(25):
+            make_entry(self.user, title=f"Entry {i}")
+        self.client.force_login(self.user)
+        page = self.client.get(self.url)
+        self.assertContains(page, 'data-next-page="?page=2"')
+
+        response = self.client.get(self.url, {"page": 2, "fragment": 1})
+        self.assertTemplateUsed(response, "journal/_entry_cards.html")
+        self.assertTemplateNotUsed(response, "base.html")
+        self.assertEqual(response.content.decode().count('class="card h-100"'), 10)
+        self.assertEqual(response["X-Next-Page"], "?page=3")
+        for chrome in ("<html", "<nav", 'id="deleteEntryModal"', "toastContainer"):
+            self.assertContains(page, chrome)
+            self.assertNotContains(response, chrome)
+
+    def test_last_fragment_has_no_next_page(self):
+        for i in range(12):
+            make_entry(self.user, title=f"Entry {i}")
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, {"page": 2, "fragment": 1})
+        self.assertEqual(len(response.context["entries"]), 2)
+        self.assertNotIn("X-Next-Page", response)
+
+    def test_next_page_keeps_search(self):
+        for i in range(11):
+            make_entry(self.user, title=f"Walk & talk {i}")
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, {"search": "walk & talk", "fragment": 1})
+        self.assertEqual(response["X-Next-Page"], "?page=2&search=walk+%26+talk")
+
 
 # ---------------------------------------------------------------------------
 # EntryDetailView  GET /entries/<pk>/
@@ -504,6 +615,90 @@ class EntryDeleteViewTests(TestCase):
         self.assertTrue(Entry.objects.filter(pk=self.entry.pk).exists())
 
 
+# ---------------------------------------------------------------------------
+# MoodCalendarView  GET /calendar/
+# ---------------------------------------------------------------------------
+
+
+def aware(year, month, day, hour=12):
+    return datetime.datetime(year, month, day, hour, tzinfo=datetime.timezone.utc)
+
+
+class MoodCalendarViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.url = reverse("journal:calendar_year", kwargs={"year": 2025})
+
+    def cell(self, response, month, day):
+        date = datetime.date(2025, month, day)
+        return response.context["cells"][date.timetuple().tm_yday - 1]
+
+    def test_redirect_if_not_logged_in(self):
+        response = self.client.get(self.url)
+        expected = f"{LOGIN_URL}?next={self.url}"
+        self.assertRedirects(response, expected, fetch_redirect_response=False)
+
+    def test_one_cell_per_day_with_daily_aggregates(self):
+        make_entry(self.user, date=aware(2025, 3, 1, 9), mood_rating=2)
+        make_entry(self.user, date=aware(2025, 3, 1, 18), mood_rating=5)
+        make_entry(self.user, date=aware(2025, 7, 4), mood_rating=4)
+        make_entry(self.user, date=aware(2024, 3, 1), mood_rating=1)
+        make_entry(make_user(username="bob"), date=aware(2025, 7, 4))
+        self.client.force_login(self.user)
+        response = self.client.get(self.url)
+
+        self.assertEqual(len(response.context["cells"]), 365)
+        # 1 January 2025 was a Wednesday.
+        self.assertEqual(len(response.context["leading_blanks"]), 2)
+        march_first = self.cell(response, 3, 1)
+        self.assertEqual(march_first["entries"], 2)
+        self.assertEqual(march_first["average"], 3.5)
+        self.assertEqual(march_first["level"], 4)
+        self.assertEqual(self.cell(response, 7, 4)["entries"], 1)
+        self.assertEqual(self.cell(response, 1, 1)["level"], 0)
+        self.assertEqual(response.context["total_entries"], 3)
+        self.assertEqual(response.context["days_journaled"], 2)
+
+    def test_aggregate_is_one_query_and_cached(self):
+        for day in range(1, 29):
+            make_entry(self.user, date=aware(2025, 2, day))
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(self.url)
+        entry_queries = [
+            q for q in first.captured_queries if "journal_entry" in q["sql"]
+        ]
+        self.assertEqual(len(entry_queries), 1)
+        with CaptureQueriesContext(connection) as second:
+            self.client.get(self.url)
+        self.assertFalse(
+            any("journal_entry" in q["sql"] for q in second.captured_queries)
+        )
+
+    def test_writes_invalidate_cached_year(self):
+        entry = make_entry(self.user, date=aware(2025, 5, 5), mood_rating=2)
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        entry.mood_rating = 5
+        entry.save()
+        response = self.client.get(self.url)
+        self.assertEqual(self.cell(response, 5, 5)["level"], 5)
+        Entry.objects.get(pk=entry.pk).delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["total_entries"], 0)
+
+    def test_defaults_to_current_year(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("journal:calendar"))
+        self.assertEqual(response.context["year"], timezone.localdate().year)
+
+    def test_out_of_range_year_is_404(self):
+        self.client.force_login(self.user)
+        url = reverse("journal:calendar_year", kwargs={"year": 99999})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
 # ---------------------------------------------------------------------------
 # entry_create_success  GET /entries/create/success/
 # ---------------------------------------------------------------------------
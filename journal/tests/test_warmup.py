@@ -0,0 +1,95 @@
+"""Tests for the gunicorn warm-up (journal.warmup and gunicorn.conf.py)."""
+
+import runpy
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.template import engines
+from django.test import SimpleTestCase
+from django.urls import get_resolver
+
+from journal import warmup
+
+GUNICORN_CONF = Path(settings.BASE_DIR) / "gunicorn.conf.py"
+
+
+class WarmupTests(SimpleTestCase):
+    def test_template_names_cover_project_and_apps(self):
+        names = list(warmup.template_names(engines["django"]))
+        self.assertIn("journal/entry_list.html", names)
+        self.assertIn("admin/base.html", names)
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_templates_are_cached_after_warm_up(self):
+        [loader] = engines["django"].engine.template_loaders  # cached loader
+        loader.reset()
+        self.assertGreater(warmup.warm_templates(), 0)
+        self.assertIn("journal/entry_list.html", loader.get_template_cache)
+
+    def test_every_url_pattern_is_counted(self):
+        def count(resolver):
+            return sum(
+                count(p) if hasattr(p, "url_patterns") else 1
+                for p in resolver.url_patterns
+            )
+
+        self.assertEqual(warmup.warm_urls(), count(get_resolver()))
+
+
+class GunicornConfigTests(SimpleTestCase):
+    def load(self, **environ):
+        with mock.patch.dict("os.environ", environ):
+            return runpy.run_path(str(GUNICORN_CONF))
+
+    def test_threads_switch_worker_class(self):
+        self.assertEqual(self.load()["worker_class"], "sync")
+        config = self.load(GUNICORN_THREADS="4")
+        self.assertEqual(config["worker_class"], "gthread")
+        self.assertEqual(config["threads"], 4)
+
+    def test_preloaded_master_warms_and_sync_workers_connect(self):
+        config = self.load()
+        server = SimpleNamespace(
+            cfg=SimpleNamespace(preload_app=True, worker_class_str="sync", threads=1)
+        )
+        with mock.patch.multiple(
+            warmup,
+            warm_process=mock.DEFAULT,
+            warm_connections=mock.DEFAULT,
+            close_connections=mock.DEFAULT,
+        ) as mocks:
+            config["when_ready"](server)
+            config["post_worker_init"](server)
+        mocks["warm_process"].assert_called_once_with()
+        mocks["close_connections"].assert_called_once_with()
+        mocks["warm_connections"].assert_called_once_with()
+
+    def test_threaded_workers_do_not_connect_ahead(self):
+        config = self.load(GUNICORN_THREADS="4")
+        worker = SimpleNamespace(
+            cfg=SimpleNamespace(
+                preload_app=True,
+                worker_class_str=config["worker_class"],
+                threads=config["threads"],
+            )
+        )
+        with mock.patch.object(warmup, "warm_connections") as warm_connections:
+            config["post_worker_init"](worker)
+        warm_connections.assert_not_called()
+
+    def test_workers_warm_themselves_without_preload(self):
+        config = self.load(GUNICORN_PRELOAD="False")
+        self.assertFalse(config["preload_app"])
+        worker = SimpleNamespace(
+            cfg=SimpleNamespace(preload_app=False, worker_class_str="sync", threads=1)
+        )
+        with mock.patch.multiple(
+            warmup, warm_process=mock.DEFAULT, warm_connections=mock.DEFAULT
+        ) as mocks:
+            config["when_ready"](worker)
+            mocks["warm_process"].assert_not_called()
+            config["post_worker_init"](worker)
+        mocks["warm_process"].assert_called_once_with()
+        mocks["warm_connections"].assert_called_once_with()
@@ -1,10 +1,19 @@
 """URL routes for the journal app.
 
 Defines named URL patterns for creating, listing, viewing, editing,
-and deleting journal entries, and the home view.
+and deleting journal entries, the mood calendar, background job status,
+the home view, staff request profiles, the JSON API and Prometheus
+metrics.
 """
 
 from django.urls import path
+from .api import (
+    EntryBatchApiView,
+    EntryChangesApiView,
+    EntryDetailApiView,
+    EntryListApiView,
+    JobDetailApiView,
+)
 from .views import (
     EntryCreateView,
     EntryDeleteView,
@@ -12,6 +21,11 @@ from .views import (
     EntryListView,
     EntryUpdateView,
     HomeView,
+    JobListView,
+    MetricsView,
+    MoodCalendarView,
+    ProfileDownloadView,
+    ProfileListView,
 )
 from django.views.generic import TemplateView
 
@@ -39,4 +53,32 @@ urlpatterns = [
         ),
         name="entry_create_success",
     ),
+    path("calendar/", MoodCalendarView.as_view(), name="calendar"),
+    path(
+        "calendar/<int:year>/",
+        MoodCalendarView.as_view(),
+        name="calendar_year",
+    ),
+    path("jobs/", JobListView.as_view(), name="job_list"),
+    path("profiles/", ProfileListView.as_view(), name="profile_list"),
+    path(
+        "profiles/<str:name>/",
+        ProfileDownloadView.as_view(),
+        name="profile_download",
+    ),
+    path("api/entries/", EntryListApiView.as_view(), name="api_entry_list"),
+    path(
+        "api/entries/batch/",
+        EntryBatchApiView.as_view(),
+        name="api_entry_batch",
+    ),
+    path(
+        "api/entries/<int:pk>/",
+        EntryDetailApiView.as_view(),
+        name="api_entry_detail",
+    ),
+    path("api/changes/", EntryChangesApiView.as_view(), name="api_changes"),
+    path("api/jobs/<int:pk>/", JobDetailApiView.as_view(), name="api_job_detail"),
+    # No trailing slash: /metrics is Prometheus's default scrape path.
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
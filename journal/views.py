@@ -1,21 +1,29 @@
 """Views for the journal application.
 
 Provides CRUD operations for journal entries along with search functionality,
-gratitude item management via inline formsets,
-and a home page with random quotes.
+gratitude item management via inline formsets, a yearly mood calendar,
+background job status, a staff-only browser for request profiles, the
+Prometheus metrics endpoint, and a home page with a quote of the day.
 
 All entry-related views require user authentication and ensure users can only
 access their own entries.
 """
 
+import datetime
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
 from django.urls import reverse_lazy
 from django.views import View
 from django.views.generic import DeleteView, DetailView, ListView, TemplateView
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.db import transaction
 from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.utils.crypto import constant_time_compare
 
 from .forms import (
     EntryForm,
@@ -23,7 +31,17 @@ from .forms import (
     GratitudeFormSet,
     make_gratitude_edit_formset,
 )
-from .models import Entry, Quote
+from . import metrics, profiling
+from .heatmap import year_heatmap
+from .digests import last_complete_week
+from .models import Entry, EntryCounter, Job, WeeklyDigest
+from .quotes import quote_of_the_day
+from .streaks import journaling_progress
+from .pagination import EstimatedCountPaginator, KnownCountPaginator
+from .search import SearchError, parse_search
+
+# Rows counted for a search before its total is shown as an estimate.
+SEARCH_COUNT_LIMIT = 500
 
 
 class EntryCreateView(LoginRequiredMixin, View):
@@ -93,49 +111,120 @@ class EntryCreateView(LoginRequiredMixin, View):
 class EntryListView(LoginRequiredMixin, ListView):
     """Display a paginated list of the current user's journal entries.
 
-    Supports search across entry title, content, mood, and gratitude items.
+    Supports search across entry title, content and gratitude items, with
+    `mood:`, `rating:`, `date:` and `gratitude:` filters (see
+    `journal.search`).
     Results are ordered by date (newest first) and paginated at 10 per page.
+
+    The unfiltered list takes its total from the user's `EntryCounter` rows
+    instead of COUNT(*); searches count at most `SEARCH_COUNT_LIMIT` rows
+    beyond the requested page.
     """
 
     model = Entry
     template_name = "journal/entry_list.html"
+    fragment_template_name = "journal/_entry_cards.html"
     context_object_name = "entries"
     paginate_by = 10
 
+    def is_fragment(self):
+        """Whether to render only the cards (`?fragment=1`).
+
+        Infinite scroll in entries.js loads later pages this way; the URL
+        of the page after that comes back in the `X-Next-Page` header.
+        """
+        return self.request.GET.get("fragment") == "1"
+
+    def get_template_names(self):
+        if self.is_fragment():
+            return [self.fragment_template_name]
+        return super().get_template_names()
+
+    def get_search(self):
+        """Return the stripped search term from the query string."""
+        return self.request.GET.get("search", "").strip()
+
+    def get_entry_totals(self):
+        """Return (and memoise) the user's counter totals."""
+        if not hasattr(self, "_entry_totals"):
+            self._entry_totals = EntryCounter.totals_for(self.request.user)
+        return self._entry_totals
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Use counter totals for the plain list, bounded counts for search."""
+        if self.get_search():
+            try:
+                page = int(self.request.GET.get(self.page_kwarg, 1))
+            except ValueError:
+                page = 1
+            limit = max(SEARCH_COUNT_LIMIT, (page + 1) * per_page)
+            return EstimatedCountPaginator(
+                queryset, per_page, count_limit=limit, **kwargs
+            )
+        return KnownCountPaginator(
+            queryset,
+            per_page,
+            count=self.get_entry_totals()["entries"],
+            **kwargs,
+        )
+
     def get_queryset(self):
         """Filter entries for current user and apply optional search.
 
-        Uses prefetch_related for gratitude_items to minimise database queries.
-        Search term is matched against title, content, mood, and
-        gratitude text.
+        Gratitude items are read from the denormalised `Entry.gratitude`
+        column, so the page needs no join. Cards render the stored
+        `excerpt`, so the full `content` is deferred. The search is parsed
+        by `journal.search`: filters such as `mood:calm` or `rating:>=4`
+        become exact predicates, and the remaining words are matched
+        against title, content and individual gratitude items. A search
+        that cannot be parsed matches nothing and its error is shown
+        instead.
         """
-        queryset = Entry.objects.filter(
-            user=self.request.user,
-        ).prefetch_related("gratitude_items")
-        # Apply search filter if a search term is provided,
-        # matching across multiple fields.
-        search = self.request.GET.get("search", "").strip()
+        queryset = Entry.objects.filter(user=self.request.user).defer(
+            "content"
+        )
+        self.search_error = None
+        search = self.get_search()
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search)
-                | Q(content__icontains=search)
-                | Q(mood__icontains=search)
-                | Q(gratitude_items__item_text__icontains=search)
-            ).distinct()
+            try:
+                queryset = queryset.filter(parse_search(search).to_q())
+            except SearchError as error:
+                self.search_error = str(error)
+                queryset = queryset.none()
         return queryset
 
     def get_context_data(self, **kwargs):
-        """Add the search term to context for template rendering."""
+        """Add the search term, entry totals and next page URL."""
         context = super().get_context_data(**kwargs)
         context["search"] = self.request.GET.get("search", "")
+        context["search_error"] = self.search_error
+        context["next_page_url"] = self.get_next_page_url(context["page_obj"])
+        context["entry_totals"] = self.get_entry_totals()
         return context
 
+    def get_next_page_url(self, page):
+        """Return the query string of the page after `page`, or None."""
+        if page is None or not page.has_next():
+            return None
+        query = {"page": page.next_page_number()}
+        search = self.get_search()
+        if search:
+            query["search"] = search
+        return "?" + urlencode(query)
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        if self.is_fragment() and context["next_page_url"]:
+            response["X-Next-Page"] = context["next_page_url"]
+        return response
+
 
 class EntryDetailView(LoginRequiredMixin, DetailView):
     """Display a single journal entry with its gratitude items.
 
-    Only shows entries belonging to the current user. Uses prefetch_related
-    to efficiently load associated gratitude items in a single query.
+    Only shows entries belonging to the current user. Gratitude items come
+    from the denormalised `Entry.gratitude` column, so the page is a single
+    query.
     """
 
     model = Entry
@@ -143,10 +232,8 @@ class EntryDetailView(LoginRequiredMixin, DetailView):
     context_object_name = "entry"
 
     def get_queryset(self):
-        """Restrict to current user's entries and prefetch gratitude items."""
-        return Entry.objects.filter(user=self.request.user).prefetch_related(
-            "gratitude_items"
-        )
+        """Restrict to current user's entries."""
+        return Entry.objects.filter(user=self.request.user)
 
 
 class EntryDeleteView(LoginRequiredMixin, DeleteView):
@@ -198,7 +285,7 @@ class EntryUpdateView(LoginRequiredMixin, View):
         """Render form populated with existing entry and gratitude items."""
         entry = self.get_object(pk)
         form = EntryForm(instance=entry)
-        existing_count = entry.gratitude_items.count()
+        existing_count = len(entry.gratitude)
         extra = max(0, 3 - existing_count)
         EditFormSet = make_gratitude_edit_formset(extra=extra)
         formset = EditFormSet(instance=entry)
@@ -217,15 +304,17 @@ class EntryUpdateView(LoginRequiredMixin, View):
         """Process form submission to update the entry.
 
         Validates both the entry form and gratitude formset. Only saves if
-        both are valid. Since the entry already exists in the database,
-        no transaction is needed (formset is bound to existing instance).
+        both are valid, writing the entry and its items in one transaction
+        so the counters maintained by `journal.signals` never drift.
         """
         entry = self.get_object(pk)
         form = EntryForm(request.POST, instance=entry)
         formset = GratitudeEditFormSet(request.POST, instance=entry)
         if form.is_valid() and formset.is_valid():
-            entry = form.save()
-            formset.save()
+            # Keep the entry, its items and the counters consistent.
+            with transaction.atomic():
+                entry = form.save()
+                formset.save()
             msg = f'Entry "{entry.title}" updated successfully!'
             messages.success(request, msg)
             return redirect("journal:entry_detail", pk=entry.pk)
@@ -243,26 +332,140 @@ class EntryUpdateView(LoginRequiredMixin, View):
         )
 
 
+class MoodCalendarView(LoginRequiredMixin, TemplateView):
+    """Year-at-a-glance heatmap of daily entry counts and mood averages.
+
+    Defaults to the current year; `calendar/<year>/` shows another one.
+    The data comes from one cached aggregate query (see `journal.heatmap`).
+    """
+
+    template_name = "journal/calendar.html"
+
+    def get_context_data(self, **kwargs):
+        """Add the heatmap cells, year summary and neighbouring years."""
+        context = super().get_context_data(**kwargs)
+        year = kwargs.get("year") or timezone.localdate().year
+        if not datetime.MINYEAR < year < datetime.MAXYEAR:
+            raise Http404("Year out of range.")
+        context.update(year_heatmap(self.request.user, year))
+        context["year"] = year
+        context["previous_year"] = year - 1
+        context["next_year"] = year + 1
+        return context
+
+
+class JobListView(LoginRequiredMixin, ListView):
+    """Status of the current user's background jobs, newest first.
+
+    Staff users see every job in the queue.
+    """
+
+    template_name = "journal/job_list.html"
+    context_object_name = "jobs"
+    paginate_by = 20
+
+    def get_queryset(self):
+        """Restrict to the user's own jobs unless they are staff."""
+        jobs = Job.objects.defer("payload", "result", "last_error")
+        if not self.request.user.is_staff:
+            jobs = jobs.filter(user=self.request.user)
+        return jobs.order_by("-created_at", "-id")
+
+
+class StaffRequiredMixin(UserPassesTestMixin):
+    """Limit a view to signed-in staff users."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+
+class ProfileListView(StaffRequiredMixin, TemplateView):
+    """The slowest request profiles saved by `ProfilingMiddleware`."""
+
+    template_name = "journal/profile_list.html"
+    limit = 50
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["profiles"] = profiling.slowest_profiles(self.limit)
+        context["sample_rate"] = settings.PROFILE_SAMPLE_RATE
+        # Formatted here: {% widthratio %} rounds 0.1% down to "0".
+        percent = f"{settings.PROFILE_SAMPLE_RATE * 100:.6f}"
+        context["sample_percent"] = percent.rstrip("0").rstrip(".")
+        return context
+
+
+class ProfileDownloadView(StaffRequiredMixin, View):
+    """Download one saved profile as a `.prof` file."""
+
+    def get(self, request, name):
+        path = profiling.profile_path(name)
+        if path is None:
+            raise Http404("No such profile.")
+        return FileResponse(
+            open(path, "rb"),
+            as_attachment=True,
+            filename=name,
+            content_type="application/octet-stream",
+        )
+
+
+class MetricsView(View):
+    """Request, database and cache metrics for Prometheus to scrape.
+
+    Scrapers send `METRICS_TOKEN` as a bearer token; staff users may also
+    open it. Unauthenticated requests from localhost are served only when
+    `METRICS_TRUST_LOCALHOST` is set, since behind a proxy every request
+    appears to come from localhost.
+    """
+
+    def get(self, request):
+        if not self.allowed(request):
+            raise PermissionDenied
+        return HttpResponse(
+            metrics.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    def allowed(self, request):
+        token = settings.METRICS_TOKEN
+        if token:
+            header = request.headers.get("Authorization", "")
+            if constant_time_compare(header, f"Bearer {token}"):
+                return True
+        if settings.METRICS_TRUST_LOCALHOST and request.META.get(
+            "REMOTE_ADDR"
+        ) in ("127.0.0.1", "::1"):
+            return True
+        return request.user.is_staff
+
+
 class HomeView(TemplateView):
-    """Display the application home page with a random inspirational quote.
+    """Display the application home page with a quote of the day.
 
-    Accessible to all users (authenticated and anonymous). Shows a randomly
-    selected quote from the database, or None if no quotes exist.
+    Accessible to all users (authenticated and anonymous). Shows a quote
+    chosen by `journal.quotes.quote_of_the_day` (matched to a signed-in
+    user's latest mood), or None if no quotes exist. Signed-in users also
+    see their journaling streaks and milestones and last week's digest.
     """
 
     template_name = "journal/home.html"
 
     def get_context_data(self, **kwargs):
-        """Add a random quote to the template context.
+        """Add the quote of the day (and the user's progress) to the context.
 
-        Uses order_by('?') for random selection. Gracefully handles cases
-        where no quotes exist in the database.
+        Gracefully handles cases where no quotes exist in the database.
         """
         context = super().get_context_data(**kwargs)
+        user = self.request.user if self.request.user.is_authenticated else None
         try:
-            # Select a random quote from the database
-            context["quote"] = Quote.objects.order_by("?").first()
+            context["quote"] = quote_of_the_day(user)
         except Exception:
-            # No quotes available or database error
+            # Database or cache error
             context["quote"] = None
+        if user is not None:
+            context["progress"] = journaling_progress(self.request.user)
+            context["digest"] = WeeklyDigest.objects.filter(
+                user=self.request.user, week_start=last_complete_week()
+            ).first()
         return context
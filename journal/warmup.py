@@ -0,0 +1,83 @@
+"""Warm-up run by gunicorn before a worker serves traffic.
+
+Without it the first requests a new worker handles compile the templates
+they render and compile URL pattern regexes as the resolver reaches them.
+`warm_process` does both up front; with `preload_app` it runs once in the
+gunicorn master, and forked workers inherit the cached templates and
+compiled patterns. Connections must not be shared across a fork, so
+`warm_connections` runs in each sync worker after it starts; Django keeps
+them per thread, so threaded workers leave them to the first request on
+each thread. See gunicorn.conf.py.
+"""
+
+import logging
+from pathlib import Path
+
+from django.db import connections
+from django.template import engines
+from django.urls import URLPattern, URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = {".html", ".txt"}
+
+
+def template_names(engine):
+    """Yield the name of every template `engine` can load."""
+    seen = set()
+    for directory in engine.template_dirs:
+        root = Path(directory)
+        for path in sorted(root.rglob("*")):
+            if path.suffix in TEMPLATE_SUFFIXES and path.is_file():
+                name = path.relative_to(root).as_posix()
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+
+def warm_templates():
+    """Compile every template into the cached loader; return the count."""
+    compiled = 0
+    for engine in engines.all():
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except Exception:
+                # Third-party apps ship templates for features that are
+                # not configured here; they are never rendered.
+                logger.debug("Could not compile template %s", name, exc_info=True)
+            else:
+                compiled += 1
+    return compiled
+
+
+def warm_urls(resolver=None):
+    """Compile the regex of every URL pattern; return the count."""
+    resolver = resolver or get_resolver()
+    # Builds the reverse lookup tables used by reverse() and {% url %}.
+    resolver.reverse_dict
+    count = 0
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            count += warm_urls(pattern)
+        elif isinstance(pattern, URLPattern):
+            count += 1
+    return count
+
+
+def warm_process():
+    templates = warm_templates()
+    urls = warm_urls()
+    logger.info("Warmed %d templates and %d URL patterns", templates, urls)
+
+
+def warm_connections():
+    """Open this thread's connection to every configured database."""
+    for connection in connections.all():
+        connection.ensure_connection()
+
+
+def close_connections():
+    for connection in connections.all():
+        connection.close()
@@ -1,4 +1,9 @@
 document.addEventListener('DOMContentLoaded', function () {
+  setUpDeleteModal();
+  setUpInfiniteScroll();
+});
+
+function setUpDeleteModal() {
   // Delete modal functionality
   var deleteModalEl = document.getElementById('deleteEntryModal');
   if (!deleteModalEl) return;
@@ -8,16 +13,18 @@ document.addEventListener('DOMContentLoaded', function () {
   var deleteTitle = document.getElementById('deleteEntryTitle');
   var confirmBtn = document.getElementById('confirmDeleteBtn');
 
-  document.querySelectorAll('.btn-delete-entry').forEach(function (btn) {
-    btn.addEventListener('click', function () {
-      var url = btn.getAttribute('data-delete-url');
-      var title = btn.getAttribute('data-entry-title') || 'this entry';
+  // Delegated, so cards added by infinite scroll work too.
+  document.addEventListener('click', function (event) {
+    var btn = event.target.closest('.btn-delete-entry');
+    if (!btn) return;
 
-      if (deleteForm) deleteForm.setAttribute('action', url);
-      if (deleteTitle) deleteTitle.textContent = title;
+    var url = btn.getAttribute('data-delete-url');
+    var title = btn.getAttribute('data-entry-title') || 'this entry';
 
-      deleteModal.show();
-    });
+    if (deleteForm) deleteForm.setAttribute('action', url);
+    if (deleteTitle) deleteTitle.textContent = title;
+
+    deleteModal.show();
   });
 
   if (deleteForm) {
@@ -28,4 +35,61 @@ document.addEventListener('DOMContentLoaded', function () {
       }
     });
   }
-});
+}
+
+function setUpInfiniteScroll() {
+  // Replaces the pagination links with a sentinel; when it scrolls into
+  // view, the next page's cards are fetched as an HTML fragment
+  // (?fragment=1) and appended. The server sends the URL of the page
+  // after that in the X-Next-Page header.
+  var list = document.getElementById('entryList');
+  if (!list || !list.dataset.nextPage || !('IntersectionObserver' in window)) return;
+
+  var nextPage = list.dataset.nextPage;
+  var loading = false;
+  var pagination = document.getElementById('entryPagination');
+  var sentinel = document.createElement('div');
+  sentinel.className = 'text-center text-subtext small py-4';
+  sentinel.setAttribute('role', 'status');
+  list.after(sentinel);
+  if (pagination) pagination.hidden = true;
+
+  function stop(message) {
+    observer.disconnect();
+    sentinel.textContent = message || '';
+  }
+
+  function loadNextPage() {
+    if (loading || !nextPage) return;
+    loading = true;
+    sentinel.textContent = 'Loading more entries…';
+
+    var url = new URL(nextPage, window.location.href);
+    url.searchParams.set('fragment', '1');
+    fetch(url, { credentials: 'same-origin' })
+      .then(function (response) {
+        if (!response.ok) throw new Error(response.status);
+        nextPage = response.headers.get('X-Next-Page');
+        return response.text();
+      })
+      .then(function (html) {
+        list.insertAdjacentHTML('beforeend', html);
+        loading = false;
+        sentinel.textContent = '';
+        if (!nextPage) return stop();
+        // Re-observe so a sentinel that is still in view loads again.
+        observer.unobserve(sentinel);
+        observer.observe(sentinel);
+      })
+      .catch(function () {
+        // Fall back to the links, which still work without scripts.
+        stop();
+        if (pagination) pagination.hidden = false;
+      });
+  }
+
+  var observer = new IntersectionObserver(function (observed) {
+    if (observed[0].isIntersecting) loadNextPage();
+  }, { rootMargin: '400px 0px' });
+  observer.observe(sentinel);
+}
@@ -1,6 +1,5 @@
 from django.test.runner import DiscoverRunner
 from django.db import connections
-from testcontainers.postgres import PostgresContainer
 from django.db.backends.postgresql.creation import DatabaseCreation
 
 
@@ -14,6 +13,10 @@ class NoCreateDatabaseCreation(DatabaseCreation):
 
 class TestContainerRunner(DiscoverRunner):
     def setup_databases(self, **kwargs):
+        # Imported here so that selecting this runner is the only thing that
+        # needs testcontainers installed.
+        from testcontainers.postgres import PostgresContainer
+
         self.postgres = PostgresContainer("postgres:15-alpine")
         self.postgres.start()
 